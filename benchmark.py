@@ -0,0 +1,628 @@
+# File: benchmark.py
+# Deskripsi: Benchmark pipeline segmentasi lengkap (DataProcessor -> Segmenter ->
+# SistemRekomendasi -> database) pada data sintetis berskema bank.csv. Setiap tahap
+# diukur waktu dan puncak memorinya, hasil ditulis ke JSON agar dapat dibandingkan
+# antar versi. Berjalan offline; data sintetis dibuat deterministik dari seed.
+#
+# Contoh:
+#   python benchmark.py --ukuran 10000 100000 --output hasil_benchmark.json
+#   python benchmark.py --ukuran 10000 --output baru.json --bandingkan hasil_benchmark.json
+#   python benchmark.py --suite db --output hasil_db.json   (baca/tulis SQLite bersamaan)
+#   python benchmark.py --suite rekomendasi --output hasil_rekomendasi.json   (pemetaan segmen -> produk)
+#   python benchmark.py --suite regresi   (cek regresi kecil; kode keluar 1 jika ada yang gagal)
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UKURAN_DEFAULT = (10_000, 100_000, 1_000_000, 10_000_000)
+# Data sintetis ditulis per blok agar 10 juta baris tidak perlu berada di memori sekaligus
+UKURAN_BLOK_SINTETIS = 1_000_000
+VERSI_FORMAT = 1
+TAHAP = ('muat_csv', 'bersihkan', 'transformasi', 'fit', 'silhouette', 'rekomendasi', 'simpan_db', 'muat_db')
+# Benchmark SQLite bersamaan: koneksi baru per panggilan (perilaku lama) vs pool koneksi WAL
+MODE_DB = ('koneksi_per_panggilan', 'pool_wal')
+KONFIG_DB_DEFAULT = {'n_pembaca': 4, 'n_penulis': 2, 'durasi': 5.0, 'n_baris': 20_000, 'baris_per_tulis': 500}
+# Benchmark rekomendasi per segmen: apply per baris dengan kolom string (perilaku lama) vs pemetaan vektor ke kolom kategori
+MODE_REKOMENDASI = ('apply_per_baris', 'vektor_kategori')
+UKURAN_REKOMENDASI_DEFAULT = (1_000_000, 5_000_000)
+
+# Distribusi kolom kategorikal bank.csv (proporsi dari 11.162 baris)
+DISTRIBUSI_KATEGORI = {
+    'job': {'management': 0.2299, 'blue-collar': 0.1742, 'technician': 0.1633, 'admin.': 0.1195, 'services': 0.0827,
+            'retired': 0.0697, 'self-employed': 0.0363, 'student': 0.0323, 'unemployed': 0.032,
+            'entrepreneur': 0.0294, 'housemaid': 0.0245, 'unknown': 0.0063},
+    'marital': {'married': 0.569, 'single': 0.3152, 'divorced': 0.1158},
+    'education': {'secondary': 0.4906, 'tertiary': 0.3305, 'primary': 0.1344, 'unknown': 0.0445},
+    'default': {'no': 0.9849, 'yes': 0.0151},
+    'housing': {'no': 0.5269, 'yes': 0.4731},
+    'loan': {'no': 0.8692, 'yes': 0.1308},
+    'contact': {'cellular': 0.7205, 'unknown': 0.2102, 'telephone': 0.0693},
+    'month': {'may': 0.253, 'aug': 0.1361, 'jul': 0.1356, 'jun': 0.1095, 'nov': 0.0845, 'apr': 0.0827,
+              'feb': 0.0695, 'oct': 0.0351, 'jan': 0.0308, 'sep': 0.0286, 'mar': 0.0247, 'dec': 0.0099},
+    'deposit': {'no': 0.5262, 'yes': 0.4738},
+}
+# Hasil kampanye sebelumnya hanya ada untuk nasabah yang pernah dihubungi (pdays != -1)
+DISTRIBUSI_POUTCOME = {'failure': 0.4331, 'success': 0.378, 'other': 0.1889}
+RASIO_BELUM_DIHUBUNGI = 0.746
+URUTAN_KOLOM = ['age', 'job', 'marital', 'education', 'default', 'balance', 'housing', 'loan', 'contact',
+                'day', 'month', 'duration', 'campaign', 'pdays', 'previous', 'poutcome', 'deposit']
+
+# Konfigurasi pipeline: sama dengan pilihan default di aplikasi
+KONFIG_DEFAULT = {
+    'missing_value_method': 'Isi dengan Mean/Modus',
+    'outlier_method': 'Hapus Outlier (IQR)',
+    'fitur': ['age', 'job', 'marital', 'education', 'balance', 'housing', 'loan'],
+    'scaler': 'StandardScaler (Z-score)',
+    'sparse': False,
+    'metode': 'K-Means',
+    'n_clusters': 4,
+}
+
+
+def _pilih(rng: np.random.Generator, distribusi: Dict[str, float], n: int) -> np.ndarray:
+    nilai = np.array(list(distribusi))
+    peluang = np.array(list(distribusi.values()))
+    return nilai[rng.choice(len(nilai), size=n, p=peluang / peluang.sum())]
+
+
+def buat_blok_sintetis(n_baris: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Membuat `n_baris` nasabah sintetis dengan skema dan sebaran yang mendekati bank.csv."""
+    kolom = {nama: _pilih(rng, distribusi, n_baris) for nama, distribusi in DISTRIBUSI_KATEGORI.items()}
+    kolom['age'] = np.clip(np.rint(rng.normal(41.2, 11.9, n_baris)), 18, 95).astype(np.int64)
+    kolom['balance'] = np.clip(np.rint(rng.lognormal(6.3, 1.5, n_baris) - 150), -6847, 81204).astype(np.int64)
+    kolom['day'] = rng.integers(1, 32, n_baris)
+    kolom['duration'] = np.clip(np.rint(rng.lognormal(5.55, 0.8, n_baris)), 2, 3881).astype(np.int64)
+    kolom['campaign'] = np.minimum(rng.geometric(0.4, n_baris), 63)
+    dihubungi = rng.random(n_baris) >= RASIO_BELUM_DIHUBUNGI
+    kolom['pdays'] = np.where(dihubungi, np.clip(np.rint(rng.lognormal(5.2, 0.6, n_baris)), 1, 854), -1).astype(np.int64)
+    kolom['previous'] = np.where(dihubungi, np.minimum(1 + rng.poisson(2.0, n_baris), 58), 0)
+    kolom['poutcome'] = np.where(dihubungi, _pilih(rng, DISTRIBUSI_POUTCOME, n_baris), 'unknown')
+    return pd.DataFrame({nama: kolom[nama] for nama in URUTAN_KOLOM})
+
+
+def tulis_csv_sintetis(path: str, n_baris: int, seed: int = 42) -> str:
+    """
+    Menulis CSV sintetis per blok. Setiap blok memakai seed turunan (seed, nomor blok)
+    sehingga isi file identik untuk n_baris dan seed yang sama.
+    """
+    mulai = time.perf_counter()
+    for i, awal in enumerate(range(0, n_baris, UKURAN_BLOK_SINTETIS)):
+        blok = buat_blok_sintetis(min(UKURAN_BLOK_SINTETIS, n_baris - awal), np.random.default_rng([seed, i]))
+        blok.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    logger.info(f"Data sintetis {n_baris:,} baris ditulis ke '{path}' dalam {time.perf_counter() - mulai:.2f} detik.")
+    return path
+
+
+class _BerkasCsv:
+    """Berkas lokal dengan atribut `name` dan `size` seperti UploadedFile Streamlit."""
+    def __init__(self, path: str):
+        self.name = os.path.basename(path)
+        self.size = os.path.getsize(path)
+        self._berkas = open(path, 'rb')
+
+    def read(self, *args):
+        return self._berkas.read(*args)
+
+    def __iter__(self):
+        return iter(self._berkas)
+
+    def close(self):
+        self._berkas.close()
+
+
+class PemantauMemori:
+    """
+    Mengukur puncak RSS proses per tahap. Di Linux, penanda puncak (VmHWM) direset
+    lewat /proc/self/clear_refs sebelum setiap tahap; jika tidak tersedia, dipakai
+    ru_maxrss yang hanya dapat naik (puncak kumulatif sejak proses dimulai).
+    """
+    def __init__(self):
+        self.dapat_reset = os.path.exists('/proc/self/clear_refs') and self._reset()
+
+    @staticmethod
+    def _reset() -> bool:
+        try:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _status_kb(nama: str) -> Optional[int]:
+        try:
+            with open('/proc/self/status') as f:
+                cocok = re.search(rf'^{nama}:\s+(\d+) kB', f.read(), re.MULTILINE)
+            return int(cocok.group(1)) if cocok else None
+        except OSError:
+            return None
+
+    def mulai(self):
+        if self.dapat_reset:
+            self._reset()
+
+    def rss_mb(self) -> Optional[float]:
+        kb = self._status_kb('VmRSS')
+        return None if kb is None else kb / 1024
+
+    def puncak_mb(self) -> float:
+        kb = self._status_kb('VmHWM') if self.dapat_reset else None
+        # ru_maxrss dalam kB di Linux
+        return (kb if kb is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) / 1024
+
+
+def jalankan_pipeline(path_csv: str, konfig: Dict, db_path: str) -> List[Dict]:
+    """
+    Menjalankan seluruh tahap pipeline pada satu file CSV dan mengembalikan satu
+    baris hasil per tahap: detik, puncak RSS (MB), RSS setelah tahap (MB), dan jumlah baris.
+    """
+    import database
+    from clustering import Segmenter
+    from dataload import DataProcessor
+    from evaluasi import evaluasi_klaster, nilai_metrik
+    from rekomendasi import SistemRekomendasi
+
+    pemantau = PemantauMemori()
+    hasil, konteks = [], {}
+
+    def ukur(tahap: str, fungsi):
+        pemantau.mulai()
+        mulai = time.perf_counter()
+        baris = fungsi()
+        detik = time.perf_counter() - mulai
+        hasil.append({'tahap': tahap, 'detik': detik, 'puncak_rss_mb': pemantau.puncak_mb(),
+                      'rss_mb': pemantau.rss_mb(), 'baris': baris})
+        logger.info(f"[{os.path.basename(path_csv)}] {tahap}: {detik:.2f} detik, puncak {hasil[-1]['puncak_rss_mb']:.0f} MB.")
+
+    def periksa(ok_pesan):
+        ok, pesan = ok_pesan[0], ok_pesan[-1]
+        if not ok:
+            raise RuntimeError(pesan)
+
+    processor = DataProcessor(cache=None)
+
+    def muat_csv():
+        berkas = _BerkasCsv(path_csv)
+        try:
+            periksa(processor.load_data(berkas))
+        finally:
+            berkas.close()
+        return len(processor.raw_data)
+
+    def bersihkan():
+        periksa(processor.clean_data(konfig['missing_value_method'], konfig['outlier_method']))
+        periksa(processor.select_features(konfig['fitur']))
+        return len(processor.processed_data)
+
+    def transformasi():
+        periksa(processor.transform_data(konfig['scaler'], sparse=konfig['sparse']))
+        return len(processor.processed_data)
+
+    def fit():
+        data_asli = processor.raw_data.loc[processor.processed_data.index]
+        segmenter = Segmenter(data_asli, processor.processed_data)
+        # Evaluasi dipisah ke tahap silhouette
+        params = {'n_clusters': konfig['n_clusters'], 'evaluasi': {'metrik': ()}}
+        ok, df, pesan, _ = segmenter.jalankan_segmentasi(konfig['metode'], params)
+        periksa((ok, pesan))
+        konteks['segmenter'], konteks['hasil'] = segmenter, df
+        return len(df)
+
+    def silhouette():
+        segmenter = konteks['segmenter']
+        tabel = evaluasi_klaster(segmenter.matriks_fitur, segmenter.label_klaster, metrik=('silhouette',))
+        konteks['silhouette'] = nilai_metrik(tabel, 'Silhouette')
+        return len(segmenter.label_klaster)
+
+    def rekomendasi():
+        ok, df, pesan = SistemRekomendasi(konteks['hasil']).buat_rekomendasi()
+        periksa((ok, pesan))
+        konteks['hasil'] = df
+        return len(df)
+
+    def simpan_db():
+        database.save_dataframe(konteks['hasil'], 'clustered_data')
+        return len(konteks['hasil'])
+
+    def muat_db():
+        df = database.load_dataframe('clustered_data')
+        if df is None:
+            raise RuntimeError("Tabel clustered_data gagal dimuat.")
+        return len(df)
+
+    db_lama = database.DB_FILE
+    database.DB_FILE = db_path
+    try:
+        for tahap, fungsi in zip(TAHAP, (muat_csv, bersihkan, transformasi, fit, silhouette,
+                                         rekomendasi, simpan_db, muat_db)):
+            ukur(tahap, fungsi)
+    finally:
+        database.DB_FILE = db_lama
+    if konteks.get('silhouette') is not None:
+        hasil[TAHAP.index('silhouette')]['nilai'] = konteks['silhouette']
+    return hasil
+
+
+def _jalankan_satu_ukuran(n_baris: int, seed: int, data_dir: str, konfig: Dict) -> List[Dict]:
+    """Dijalankan di proses terpisah agar puncak memori tiap ukuran tidak saling memengaruhi."""
+    logging.basicConfig(level=logging.INFO)
+    path_csv = os.path.join(data_dir, f"bank_sintetis_{n_baris}_{seed}.csv")
+    if not os.path.exists(path_csv):
+        tulis_csv_sintetis(path_csv, n_baris, seed)
+    with tempfile.TemporaryDirectory(dir=data_dir) as tmp:
+        hasil = jalankan_pipeline(path_csv, konfig, os.path.join(tmp, 'benchmark.db'))
+    for baris in hasil:
+        baris.update({'ukuran': n_baris, 'ukuran_csv_mb': os.path.getsize(path_csv) / (1024 * 1024)})
+    return hasil
+
+
+def _versi_kode() -> Optional[str]:
+    """Commit git kode yang di-benchmark (None jika bukan repositori git)."""
+    try:
+        keluaran = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return keluaran.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def info_lingkungan() -> Dict:
+    import scipy
+    import sklearn
+    return {
+        'versi_kode': _versi_kode(), 'waktu': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(), 'platform': platform.platform(), 'cpu': os.cpu_count(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'scipy': scipy.__version__, 'sklearn': sklearn.__version__,
+    }
+
+
+def jalankan_benchmark(ukuran: Sequence[int] = UKURAN_DEFAULT, seed: int = 42, data_dir: Optional[str] = None,
+                       konfig: Optional[Dict] = None) -> Dict:
+    """Menjalankan benchmark untuk setiap ukuran data dan mengembalikan hasil lengkap beserta metadata."""
+    konfig = {**KONFIG_DEFAULT, **(konfig or {})}
+    data_dir = data_dir or tempfile.mkdtemp(prefix='benchmark_segmenku_')
+    os.makedirs(data_dir, exist_ok=True)
+    hasil = []
+    for n_baris in ukuran:
+        # Proses baru per ukuran (spawn): memori dan cache pustaka tidak terbawa antar ukuran
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            hasil.extend(executor.submit(_jalankan_satu_ukuran, n_baris, seed, data_dir, konfig).result())
+    return {'versi_format': VERSI_FORMAT, 'lingkungan': info_lingkungan(), 'seed': seed,
+            'konfig': konfig, 'hasil': hasil}
+
+
+def _siapkan_db_konkuren(path: str, n_baris: int, baris_per_tulis: int, seed: int) -> List[list]:
+    """Membuat tabel nasabah berlabel (dibaca per klaster) dan tabel riwayat kosong; mengembalikan satu batch baris tulis."""
+    data = buat_blok_sintetis(n_baris, np.random.default_rng(seed))[['age', 'balance', 'duration', 'campaign']]
+    data['Klaster'] = np.random.default_rng(seed + 1).integers(0, 4, n_baris)
+    with sqlite3.connect(path) as conn:
+        data.to_sql('nasabah', conn, index=False)
+        conn.execute("CREATE TABLE riwayat (age REAL, balance REAL, duration REAL, campaign REAL, Klaster INTEGER)")
+    conn.close()
+    return data.head(baris_per_tulis).to_numpy().tolist()
+
+
+def benchmark_db_konkuren(mode: str, path: str, n_pembaca: int, n_penulis: int, durasi: float,
+                          baris_tulis: List[list], seed: int = 42) -> List[Dict]:
+    """
+    Menjalankan `n_pembaca` thread yang membaca satu klaster dan `n_penulis` thread yang
+    menambah baris riwayat secara bersamaan selama `durasi` detik, lalu mengembalikan
+    throughput, latensi, dan jumlah operasi yang gagal karena database terkunci per jenis operasi.
+    """
+    import database
+
+    if mode == 'koneksi_per_panggilan':
+        # Perilaku lama: koneksi baru (journal default) untuk setiap panggilan, ditutup setelahnya
+        @contextmanager
+        def koneksi_baca():
+            conn = sqlite3.connect(path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+        @contextmanager
+        def koneksi_tulis():
+            conn = sqlite3.connect(path)
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                conn.close()
+    else:
+        pool = database.PoolKoneksi(path, ukuran=n_pembaca + n_penulis)
+        koneksi_baca, koneksi_tulis = pool.pinjam, pool.transaksi
+
+    catatan = {'baca': [], 'tulis': []}
+    gagal = {'baca': 0, 'tulis': 0}
+    kunci = threading.Lock()
+    mulai_bersama = threading.Barrier(n_pembaca + n_penulis)
+
+    def pekerja(operasi: str, indeks: int):
+        rng = np.random.default_rng([seed, indeks])
+        latensi, n_gagal = [], 0
+        mulai_bersama.wait()
+        selesai = time.perf_counter() + durasi
+        while time.perf_counter() < selesai:
+            awal = time.perf_counter()
+            try:
+                if operasi == 'baca':
+                    with koneksi_baca() as conn:
+                        pd.read_sql_query("SELECT * FROM nasabah WHERE Klaster = ?", conn, params=(int(rng.integers(0, 4)),))
+                else:
+                    with koneksi_tulis() as conn:
+                        conn.executemany("INSERT INTO riwayat VALUES (?, ?, ?, ?, ?)", baris_tulis)
+                latensi.append(time.perf_counter() - awal)
+            except sqlite3.OperationalError:
+                n_gagal += 1
+        with kunci:
+            catatan[operasi].extend(latensi)
+            gagal[operasi] += n_gagal
+
+    thread = [threading.Thread(target=pekerja, args=('baca', i)) for i in range(n_pembaca)] + \
+             [threading.Thread(target=pekerja, args=('tulis', n_pembaca + i)) for i in range(n_penulis)]
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+    if mode != 'koneksi_per_panggilan':
+        pool.tutup()
+
+    hasil = []
+    for operasi, latensi in catatan.items():
+        latensi = np.asarray(latensi) * 1000
+        hasil.append({'mode': mode, 'operasi': operasi, 'ops': len(latensi), 'ops_per_detik': len(latensi) / durasi,
+                      'gagal_lock': gagal[operasi],
+                      'p50_ms': float(np.percentile(latensi, 50)) if len(latensi) else None,
+                      'p95_ms': float(np.percentile(latensi, 95)) if len(latensi) else None})
+        logger.info(f"[{mode}] {operasi}: {hasil[-1]['ops_per_detik']:.1f} ops/detik, {gagal[operasi]} gagal karena lock.")
+    return hasil
+
+
+def jalankan_benchmark_db(seed: int = 42, data_dir: Optional[str] = None, konfig: Optional[Dict] = None) -> Dict:
+    """Membandingkan semua MODE_DB pada database terpisah dengan isi yang sama."""
+    konfig = {**KONFIG_DB_DEFAULT, **(konfig or {})}
+    data_dir = data_dir or tempfile.mkdtemp(prefix='benchmark_segmenku_')
+    os.makedirs(data_dir, exist_ok=True)
+    hasil = []
+    with tempfile.TemporaryDirectory(dir=data_dir) as tmp:
+        for mode in MODE_DB:
+            path = os.path.join(tmp, f"{mode}.db")
+            baris_tulis = _siapkan_db_konkuren(path, konfig['n_baris'], konfig['baris_per_tulis'], seed)
+            hasil.extend(benchmark_db_konkuren(mode, path, konfig['n_pembaca'], konfig['n_penulis'],
+                                               konfig['durasi'], baris_tulis, seed))
+    return {'versi_format': VERSI_FORMAT, 'suite': 'db', 'lingkungan': info_lingkungan(), 'seed': seed,
+            'konfig': konfig, 'hasil': hasil}
+
+
+def _rekomendasi_apply_per_baris(data: pd.DataFrame, konfig_produk: Dict) -> pd.DataFrame:
+    """Implementasi lama SistemRekomendasi.buat_rekomendasi: lookup dict per baris dan dua list string."""
+    from rekomendasi import REKOMENDASI_DEFAULT
+
+    rekomendasi = data['Klaster'].apply(lambda klaster: konfig_produk.get(klaster, REKOMENDASI_DEFAULT))
+    data['Produk_Rekomendasi'] = [item['produk'] for item in rekomendasi]
+    data['Alasan_Rekomendasi'] = [item['alasan'] for item in rekomendasi]
+    return data
+
+
+def benchmark_rekomendasi(mode: str, n_baris: int, seed: int = 42) -> Dict:
+    """
+    Membuat kolom rekomendasi untuk `n_baris` label klaster (int32 seperti hasil segmentasi,
+    termasuk klaster tanpa konfigurasi) dan mengukur waktu per baris, memori kolom hasil,
+    serta tambahan puncak RSS proses.
+    """
+    logging.basicConfig(level=logging.INFO)
+    from rekomendasi import SistemRekomendasi
+
+    data = pd.DataFrame({'Klaster': np.random.default_rng(seed).integers(-1, 6, n_baris).astype(np.int32)})
+    sistem = SistemRekomendasi(data)
+    pemantau = PemantauMemori()
+    rss_awal = pemantau.rss_mb()
+    pemantau.mulai()
+    mulai = time.perf_counter()
+    if mode == 'apply_per_baris':
+        _rekomendasi_apply_per_baris(data, sistem.konfig_produk)
+    else:
+        ok, data, pesan = sistem.buat_rekomendasi()
+        if not ok:
+            raise RuntimeError(pesan)
+    detik = time.perf_counter() - mulai
+    memori_kolom = data[['Produk_Rekomendasi', 'Alasan_Rekomendasi']].memory_usage(deep=True, index=False).sum()
+    hasil = {'mode': mode, 'ukuran': n_baris, 'detik': detik, 'ns_per_baris': detik / n_baris * 1e9,
+             'memori_kolom_mb': memori_kolom / (1024 * 1024), 'tambahan_puncak_rss_mb': pemantau.puncak_mb() - rss_awal}
+    logger.info(f"[{mode}] {n_baris:,} baris: {detik:.3f} detik ({hasil['ns_per_baris']:.0f} ns/baris), "
+                f"kolom hasil {hasil['memori_kolom_mb']:.1f} MB.")
+    return hasil
+
+
+def jalankan_benchmark_rekomendasi(ukuran: Sequence[int] = UKURAN_REKOMENDASI_DEFAULT, seed: int = 42) -> Dict:
+    """Membandingkan semua MODE_REKOMENDASI per ukuran; setiap pengukuran di proses baru agar puncak RSS tidak tercampur."""
+    hasil = []
+    for n_baris in ukuran:
+        for mode in MODE_REKOMENDASI:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                hasil.append(executor.submit(benchmark_rekomendasi, mode, n_baris, seed).result())
+    return {'versi_format': VERSI_FORMAT, 'suite': 'rekomendasi', 'lingkungan': info_lingkungan(), 'seed': seed,
+            'hasil': hasil}
+
+
+def _cek_sparse_dengan_boolean():
+    """transform_data(sparse=True) pada data dengan kolom bool (dense int8 di antara kolom sparse)."""
+    from dataload import DataProcessor
+
+    processor = DataProcessor(cache=None)
+    processor.processed_data = pd.DataFrame({'age': [30, 45, 52, 61], 'aktif': [True, False, True, True],
+                                             'job': ['admin.', 'services', 'admin.', 'retired'],
+                                             'balance': [100.0, 2500.0, -40.0, 880.0]})
+    ok, pesan = processor.transform_data('StandardScaler (Z-score)', sparse=True)
+    if not ok:
+        raise AssertionError(pesan)
+    if processor.processed_data['aktif'].tolist() != [1, 0, 1, 1]:
+        raise AssertionError("Kolom boolean tidak diteruskan sebagai 0/1.")
+
+
+def _cek_minibatch_batch_kecil():
+    """MiniBatch streaming dengan batch dan chunk lebih kecil dari jumlah klaster tetap terinisialisasi."""
+    from clustering import iter_chunk_matriks, latih_minibatch_streaming
+
+    X = np.random.default_rng(0).normal(size=(5_000, 4))
+    model = latih_minibatch_streaming(iter_chunk_matriks(X, 30), n_clusters=100, batch_size=64)
+    if model.cluster_centers_.shape != (100, 4):
+        raise AssertionError(f"Bentuk pusat tidak sesuai: {model.cluster_centers_.shape}")
+
+
+
+def _cek_label_model_tersimpan():
+    """Label model tersimpan dicocokkan dengan data baru lewat kunci baris, bukan posisi."""
+    from clustering import Segmenter, LABEL_BARU
+    from model_segmentasi import ModelSegmentasi, PenyimpananModel
+
+    rng = np.random.default_rng(0)
+    indeks = pd.Index([f"N{i:04d}" for i in range(300)])
+    fitur = pd.DataFrame(rng.normal(size=(300, 3)), index=indeks, columns=['a', 'b', 'c'])
+    segmenter = Segmenter(data_asli=fitur, data_proses=fitur)
+    sukses, _, pesan, _ = segmenter.jalankan_segmentasi('K-Means', {'n_clusters': 4})
+    if not sukses:
+        raise AssertionError(pesan)
+    with tempfile.TemporaryDirectory() as folder:
+        penyimpanan = PenyimpananModel(folder)
+        model = penyimpanan.muat(penyimpanan.simpan(ModelSegmentasi.dari_segmenter(segmenter, 'K-Means', {'n_clusters': 4})))
+    # Baris diacak, sebagian terhapus, dan ada nasabah baru di awal
+    baru = pd.DataFrame(rng.normal(size=(5, 3)), index=[f"B{i}" for i in range(5)], columns=fitur.columns)
+    data_baru = pd.concat([baru, fitur.sample(frac=0.9, random_state=1)])
+    label = Segmenter(data_asli=data_baru, data_proses=data_baru)._label_lama_per_baris(model.label_per_baris())
+    harapan = pd.Series(segmenter.label_klaster, index=indeks).reindex(data_baru.index).fillna(LABEL_BARU).to_numpy()
+    if not np.array_equal(label, harapan):
+        raise AssertionError("Label model tersimpan tidak sejajar dengan kunci baris.")
+
+
+
+def _cek_reduksi_satu_fitur():
+    """Reduksi dimensi pada data sparse satu fitur dilewati dengan pesan, bukan galat TruncatedSVD."""
+    from dataload import DataProcessor
+    from pipeline import PreprocessingPipeline
+
+    data = pd.DataFrame({'Pekerjaan': np.random.default_rng(0).choice(['a', 'b'], 200)})
+    processor = DataProcessor()
+    processor.pipeline = PreprocessingPipeline().fit(data, 'MinMaxScaler')
+    processor.processed_data = processor.pipeline.transform(data, sparse=True)
+    sukses, pesan = processor.reduksi_dimensi()
+    if not sukses or processor.processed_data.shape[1] != 1:
+        raise AssertionError(pesan)
+
+
+# Cek regresi: (nama, fungsi yang menimbulkan exception jika gagal)
+CEK_REGRESI = (
+    ('sparse_dengan_boolean', _cek_sparse_dengan_boolean),
+    ('minibatch_batch_kecil', _cek_minibatch_batch_kecil),
+    ('label_model_tersimpan', _cek_label_model_tersimpan),
+    ('reduksi_satu_fitur', _cek_reduksi_satu_fitur),
+)
+
+
+def jalankan_cek_regresi() -> Dict:
+    """Menjalankan CEK_REGRESI dan mengembalikan status, waktu, dan pesan galat setiap cek."""
+    hasil = []
+    for nama, fungsi in CEK_REGRESI:
+        mulai = time.perf_counter()
+        try:
+            fungsi()
+            ok, pesan = True, ''
+        except Exception as e:
+            ok, pesan = False, f"{type(e).__name__}: {e}"
+        hasil.append({'cek': nama, 'ok': ok, 'detik': time.perf_counter() - mulai, 'pesan': pesan})
+        logger.info(f"Cek regresi '{nama}': {'OK' if ok else 'GAGAL ' + pesan}")
+    return {'versi_format': VERSI_FORMAT, 'lingkungan': info_lingkungan(), 'hasil': hasil}
+
+
+def bandingkan(hasil_baru: Dict, hasil_lama: Dict) -> pd.DataFrame:
+    """Tabel rasio waktu dan puncak memori (baru / lama) per ukuran dan tahap."""
+    kunci = ['ukuran', 'tahap']
+    baru = pd.DataFrame(hasil_baru['hasil']).set_index(kunci)
+    lama = pd.DataFrame(hasil_lama['hasil']).set_index(kunci)
+    tabel = baru[['detik', 'puncak_rss_mb']].join(lama[['detik', 'puncak_rss_mb']], how='inner', lsuffix='_baru', rsuffix='_lama')
+    tabel['rasio_waktu'] = tabel['detik_baru'] / tabel['detik_lama']
+    tabel['rasio_memori'] = tabel['puncak_rss_mb_baru'] / tabel['puncak_rss_mb_lama']
+    return tabel.reset_index()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline segmentasi pada data sintetis berskema bank.csv.")
+    parser.add_argument('--suite', choices=['pipeline', 'db', 'rekomendasi', 'regresi'], default='pipeline',
+                        help="'pipeline': semua tahap per ukuran data; 'db': baca/tulis SQLite bersamaan; "
+                             "'rekomendasi': pemetaan segmen -> produk; 'regresi': cek regresi kecil.")
+    parser.add_argument('--ukuran', type=int, nargs='+',
+                        help=f"Jumlah baris yang diuji (default {list(UKURAN_DEFAULT)}, "
+                             f"suite rekomendasi {list(UKURAN_REKOMENDASI_DEFAULT)}).")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', help="Folder data sintetis (dipakai ulang antar run jika sudah ada).")
+    parser.add_argument('--metode', default=KONFIG_DEFAULT['metode'],
+                        choices=['K-Means', 'K-Means (MiniBatch)', 'K-Means (Bisecting)', 'DBSCAN'])
+    parser.add_argument('--n-clusters', type=int, default=KONFIG_DEFAULT['n_clusters'])
+    parser.add_argument('--sparse', action='store_true', help="Transformasi one-hot sebagai kolom sparse.")
+    parser.add_argument('--output', default='hasil_benchmark.json', help="File JSON hasil.")
+    parser.add_argument('--bandingkan', help="File JSON hasil versi sebelumnya untuk dibandingkan.")
+    parser.add_argument('--n-pembaca', type=int, default=KONFIG_DB_DEFAULT['n_pembaca'])
+    parser.add_argument('--n-penulis', type=int, default=KONFIG_DB_DEFAULT['n_penulis'])
+    parser.add_argument('--durasi', type=float, default=KONFIG_DB_DEFAULT['durasi'], help="Durasi per mode (detik).")
+    args = parser.parse_args(argv)
+
+    if args.suite == 'db':
+        hasil = jalankan_benchmark_db(args.seed, args.data_dir, {'n_pembaca': args.n_pembaca,
+                                                                 'n_penulis': args.n_penulis, 'durasi': args.durasi})
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        logger.info(f"Hasil benchmark ditulis ke '{args.output}'.")
+        print(pd.DataFrame(hasil['hasil']).round(2).to_string(index=False))
+        return
+
+    if args.suite == 'regresi':
+        hasil = jalankan_cek_regresi()
+        print(pd.DataFrame(hasil['hasil']).round(3).to_string(index=False))
+        if not all(h['ok'] for h in hasil['hasil']):
+            raise SystemExit(1)
+        return
+
+    if args.suite == 'rekomendasi':
+        hasil = jalankan_benchmark_rekomendasi(args.ukuran or list(UKURAN_REKOMENDASI_DEFAULT), args.seed)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        logger.info(f"Hasil benchmark ditulis ke '{args.output}'.")
+        print(pd.DataFrame(hasil['hasil']).round(2).to_string(index=False))
+        return
+
+    hasil = jalankan_benchmark(args.ukuran or list(UKURAN_DEFAULT), args.seed, args.data_dir,
+                               {'metode': args.metode, 'n_clusters': args.n_clusters, 'sparse': args.sparse})
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+    logger.info(f"Hasil benchmark ditulis ke '{args.output}'.")
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(pd.DataFrame(hasil['hasil']).pivot(index='tahap', columns='ukuran', values='detik').reindex(list(TAHAP)).round(3))
+        if args.bandingkan:
+            with open(args.bandingkan, 'r', encoding='utf-8') as f:
+                print(bandingkan(hasil, json.load(f)).round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
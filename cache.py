@@ -0,0 +1,441 @@
+# File: cache.py
+# Deskripsi: Cache lokal di disk untuk dataset yang sudah diparsing.
+# Setiap dataset disimpan per kolom sebagai file NumPy (.npy) sehingga
+# unggahan ulang file yang sama cukup di-memory-map tanpa parsing CSV lagi.
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from collections import OrderedDict
+from io import StringIO
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_DEFAULT = ".cache_dataset"
+# Batas total ukuran cache di disk sebelum entri terlama dihapus (LRU)
+UKURAN_MAKS_DEFAULT_MB = 1024
+# Batas memori untuk hasil segmentasi yang disimpan di RAM (LRU)
+BATAS_MEMORI_SEGMENTASI_MB = 256
+UKURAN_DISK_SEGMENTASI_MB = 512
+# Parameter yang tidak mengubah hasil segmentasi (eps_maks hanya menentukan ukuran graf tetangga DBSCAN)
+PARAM_TANPA_PENGARUH = ('eps_maks',)
+_UKURAN_BLOK_HASH = 1024 * 1024
+VERSI_STATUS_MODEL = 1
+
+
+def hash_file(uploaded_file) -> str:
+    """Menghitung hash BLAKE2b dari isi file secara bertahap, lalu mengembalikan posisi baca ke awal."""
+    hasher = hashlib.blake2b(digest_size=20)
+    uploaded_file.seek(0)
+    while True:
+        blok = uploaded_file.read(_UKURAN_BLOK_HASH)
+        if not blok:
+            break
+        hasher.update(blok if isinstance(blok, bytes) else blok.encode('utf-8'))
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
+def sidik_matriks(X) -> str:
+    """
+    Sidik jari (hash BLAKE2b) isi matriks fitur: DataFrame (termasuk kolom sparse),
+    array NumPy/memmap, atau matriks sparse. Dua matriks dengan isi, bentuk, dan
+    tipe yang sama menghasilkan sidik yang sama tanpa perlu dibandingkan elemen per elemen.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(repr(X.shape).encode('utf-8'))
+
+    def tambah(arr):
+        arr = np.ascontiguousarray(arr)
+        hasher.update(arr.dtype.str.encode('utf-8'))
+        hasher.update(memoryview(arr).cast('B'))
+
+    if isinstance(X, pd.DataFrame):
+        for col in X.columns:
+            seri = X[col]
+            hasher.update(str(col).encode('utf-8'))
+            if isinstance(seri.dtype, pd.SparseDtype):
+                tambah(seri.sparse.sp_values)
+                tambah(seri.array.sp_index.indices)
+            elif isinstance(seri.dtype, np.dtype) and seri.dtype != object:
+                tambah(seri.to_numpy())
+            else:
+                # Kolom teks/extension: hash per nilai dari pandas
+                tambah(pd.util.hash_pandas_object(seri, index=False).to_numpy())
+    elif sp.issparse(X):
+        X = X.tocsr()
+        for arr in (X.data, X.indices, X.indptr):
+            tambah(arr)
+    else:
+        tambah(np.asarray(X))
+    return hasher.hexdigest()
+
+
+def _daftar_entri(cache_dir: str):
+    """Mengembalikan daftar (path, ukuran_bytes, waktu_akses) untuk setiap entri di folder cache."""
+    entri = []
+    for nama in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, nama)
+        path_meta = os.path.join(path, 'meta.json')
+        if nama.startswith('.') or not os.path.exists(path_meta):
+            continue
+        ukuran = sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+        entri.append((path, ukuran, os.path.getmtime(path_meta)))
+    return entri
+
+
+def _eviksi_lru(cache_dir: str, ukuran_maks_bytes: int):
+    """Menghapus entri yang paling lama tidak diakses hingga total ukuran folder di bawah batas."""
+    entri = sorted(_daftar_entri(cache_dir), key=lambda e: e[2])
+    total = sum(ukuran for _, ukuran, _ in entri)
+    while entri and total > ukuran_maks_bytes:
+        path, ukuran, _ = entri.pop(0)
+        shutil.rmtree(path, ignore_errors=True)
+        total -= ukuran
+        logger.info(f"Entri cache '{os.path.basename(path)}' dihapus (LRU).")
+
+
+class CacheDataset:
+    """
+    Cache kolumnar berbasis hash isi file.
+    Kolom numerik/boolean disimpan apa adanya, kolom kategorikal dan teks disimpan
+    sebagai kode integer + daftar kategori. Saat dimuat, kolom numerik di-memory-map
+    (read-only) sehingga tidak ada penyalinan data ke memori.
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR_DEFAULT, ukuran_maks_mb: float = UKURAN_MAKS_DEFAULT_MB):
+        self.cache_dir = cache_dir
+        self.ukuran_maks_bytes = int(ukuran_maks_mb * 1024 * 1024)
+        self.hit = 0
+        self.miss = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path_entri(self, kunci: str) -> str:
+        return os.path.join(self.cache_dir, kunci)
+
+    def statistik(self) -> Dict[str, int]:
+        """Mengembalikan jumlah hit, miss, entri, dan ukuran cache di disk."""
+        entri = self._daftar_entri()
+        return {
+            'hit': self.hit,
+            'miss': self.miss,
+            'entri': len(entri),
+            'ukuran_bytes': sum(ukuran for _, ukuran, _ in entri),
+        }
+
+    def ambil(self, kunci: str) -> Optional[pd.DataFrame]:
+        """Memuat DataFrame dari cache; mengembalikan None (dan menghitung miss) jika tidak ada."""
+        path = self._path_entri(kunci)
+        path_meta = os.path.join(path, 'meta.json')
+        if not os.path.exists(path_meta):
+            self.miss += 1
+            return None
+        try:
+            with open(path_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            kolom = {}
+            for i, info in enumerate(meta['kolom']):
+                nilai = np.load(os.path.join(path, f"kolom_{i}.npy"), mmap_mode='r')
+                if info['jenis'] == 'numerik':
+                    kolom[info['nama']] = nilai
+                else:
+                    seri = pd.Categorical.from_codes(nilai, categories=info['kategori'])
+                    kolom[info['nama']] = seri if info['jenis'] == 'category' else pd.Series(seri).astype(info['dtype'])
+            df = pd.DataFrame(kolom, copy=False)
+            # Perbarui waktu akses untuk kebijakan LRU
+            os.utime(path_meta, None)
+            self.hit += 1
+            return df
+        except Exception as e:
+            logger.warning(f"Entri cache '{kunci}' rusak dan dihapus: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            self.miss += 1
+            return None
+
+    def simpan(self, kunci: str, df: pd.DataFrame) -> bool:
+        """Menyimpan DataFrame ke cache secara atomik, lalu menjalankan eviksi LRU."""
+        path = self._path_entri(kunci)
+        if os.path.exists(path):
+            return True
+        path_tmp = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(path_tmp)
+            meta = {'kolom': [], 'dibuat': time.time()}
+            for i, col in enumerate(df.columns):
+                seri = df[col]
+                info = {'nama': str(col), 'dtype': str(seri.dtype)}
+                if isinstance(seri.dtype, pd.CategoricalDtype):
+                    info.update(jenis='category', kategori=seri.cat.categories.tolist())
+                    nilai = seri.cat.codes.to_numpy()
+                elif pd.api.types.is_bool_dtype(seri) or (
+                        pd.api.types.is_numeric_dtype(seri) and isinstance(seri.dtype, np.dtype)):
+                    info['jenis'] = 'numerik'
+                    nilai = seri.to_numpy()
+                else:
+                    kode, kategori = pd.factorize(seri)
+                    info.update(jenis='teks', kategori=kategori.tolist())
+                    nilai = kode.astype(np.int32)
+                np.save(os.path.join(path_tmp, f"kolom_{i}.npy"), nilai)
+                meta['kolom'].append(info)
+            with open(os.path.join(path_tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(path_tmp, path)
+        except Exception as e:
+            logger.warning(f"Gagal menyimpan dataset ke cache: {e}")
+            shutil.rmtree(path_tmp, ignore_errors=True)
+            return False
+        self._eviksi()
+        return True
+
+    def _daftar_entri(self):
+        """Mengembalikan daftar (path, ukuran_bytes, waktu_akses) untuk setiap entri cache."""
+        return _daftar_entri(self.cache_dir)
+
+    def _eviksi(self):
+        """Menghapus entri yang paling lama tidak diakses hingga total ukuran di bawah batas."""
+        _eviksi_lru(self.cache_dir, self.ukuran_maks_bytes)
+
+    def hapus_semua(self):
+        """Mengosongkan seluruh cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+def kunci_dataset(uploaded_file, streaming: bool) -> str:
+    """Membuat kunci cache dari hash isi file dan mode pembacaan (skema berbeda per mode)."""
+    return f"{hash_file(uploaded_file)}-{'stream' if streaming else 'penuh'}"
+
+
+def _kelas_model() -> Dict[str, type]:
+    """Kelas model yang boleh dibangun ulang dari status di disk (selain ini ditolak)."""
+    from sklearn.cluster import DBSCAN, KMeans, MiniBatchKMeans
+    from hierarki import PohonSegmen
+    return {kelas.__name__: kelas for kelas in (KMeans, MiniBatchKMeans, DBSCAN, PohonSegmen)}
+
+
+def _kodekan(nilai, folder: str, array: list):
+    """
+    Mengubah satu nilai atribut model menjadi JSON; array numerik/teks ditulis sebagai
+    file .npy terpisah. Tipe di luar yang didukung menimbulkan TypeError.
+    """
+    if isinstance(nilai, np.generic):
+        nilai = nilai.item()
+    if nilai is None or isinstance(nilai, (bool, int, float, str)):
+        return nilai
+    if isinstance(nilai, np.ndarray):
+        if nilai.dtype.kind == 'O' and all(isinstance(v, str) for v in nilai.ravel()):
+            return {'__array_teks__': _kodekan(nilai.astype(str), folder, array)}
+        if nilai.dtype.kind not in 'biufcU':
+            raise TypeError(f"array dengan dtype {nilai.dtype} tidak didukung")
+        nama = f"a{len(array)}.npy"
+        np.save(os.path.join(folder, nama), nilai, allow_pickle=False)
+        array.append(nama)
+        return {'__array__': nama}
+    if sp.issparse(nilai):
+        nilai = nilai.tocsr()
+        return {'__csr__': [_kodekan(getattr(nilai, a), folder, array) for a in ('data', 'indices', 'indptr')],
+                'shape': list(nilai.shape)}
+    if isinstance(nilai, np.random.RandomState):
+        return {'__random_state__': _kodekan(nilai.get_state(), folder, array)}
+    if isinstance(nilai, tuple):
+        return {'__tuple__': [_kodekan(v, folder, array) for v in nilai]}
+    if isinstance(nilai, list):
+        return [_kodekan(v, folder, array) for v in nilai]
+    if isinstance(nilai, dict) and all(isinstance(k, str) for k in nilai):
+        return {'__dict__': {k: _kodekan(v, folder, array) for k, v in nilai.items()}}
+    raise TypeError(f"atribut bertipe {type(nilai).__name__} tidak didukung")
+
+
+def _dekodekan(nilai, folder: str):
+    if isinstance(nilai, list):
+        return [_dekodekan(v, folder) for v in nilai]
+    if not isinstance(nilai, dict):
+        return nilai
+    if '__array__' in nilai:
+        # allow_pickle=False: file .npy tidak dapat menjalankan kode saat dimuat
+        return np.load(os.path.join(folder, os.path.basename(nilai['__array__'])), allow_pickle=False)
+    if '__array_teks__' in nilai:
+        return _dekodekan(nilai['__array_teks__'], folder).astype(object)
+    if '__csr__' in nilai:
+        return sp.csr_matrix(tuple(_dekodekan(v, folder) for v in nilai['__csr__']), shape=tuple(nilai['shape']))
+    if '__random_state__' in nilai:
+        rng = np.random.RandomState()
+        rng.set_state(_dekodekan(nilai['__random_state__'], folder))
+        return rng
+    if '__tuple__' in nilai:
+        return tuple(_dekodekan(v, folder) for v in nilai['__tuple__'])
+    return {k: _dekodekan(v, folder) for k, v in nilai['__dict__'].items()}
+
+
+def simpan_status_model(model, folder: str):
+    """
+    Menulis status model (atribut instance) ke `folder` sebagai model.json + array .npy.
+    Hanya kelas di _kelas_model() dengan atribut bertipe sederhana yang didukung (TypeError jika tidak).
+    """
+    nama_kelas = type(model).__name__
+    if _kelas_model().get(nama_kelas) is not type(model):
+        raise TypeError(f"model {nama_kelas} tidak didukung")
+    array = []
+    status = {'versi': VERSI_STATUS_MODEL, 'kelas': nama_kelas,
+              'atribut': {k: _kodekan(v, folder, array) for k, v in vars(model).items()}}
+    with open(os.path.join(folder, 'model.json'), 'w', encoding='utf-8') as f:
+        json.dump(status, f)
+
+
+def muat_status_model(folder: str):
+    """Membangun ulang model dari model.json + array .npy (tanpa pickle)."""
+    with open(os.path.join(folder, 'model.json'), 'r', encoding='utf-8') as f:
+        status = json.load(f)
+    if status.get('versi') != VERSI_STATUS_MODEL:
+        raise ValueError(f"Versi status model tidak didukung: {status.get('versi')}")
+    kelas = _kelas_model().get(status['kelas'])
+    if kelas is None:
+        raise ValueError(f"Kelas model tidak dikenal: {status['kelas']}")
+    model = kelas.__new__(kelas)
+    model.__dict__.update({k: _dekodekan(v, folder) for k, v in status['atribut'].items()})
+    return model
+
+
+class CacheSegmentasi:
+    """
+    Cache hasil segmentasi (label, tabel evaluasi, dan model) dengan kunci sidik
+    data proses + metode + parameter. Entri disimpan di RAM dengan batas memori
+    dan eviksi LRU; jika `cache_dir` diberikan, entri juga ditulis ke disk
+    (label .npy, evaluasi JSON, status model sebagai array .npy + model.json, bukan
+    pickle) sehingga tetap ada setelah aplikasi dimulai ulang. Model yang statusnya
+    tidak dapat dinyatakan dalam format ini hanya di-cache di RAM.
+    """
+    def __init__(self, batas_memori_mb: float = BATAS_MEMORI_SEGMENTASI_MB, cache_dir: Optional[str] = None,
+                 ukuran_disk_mb: float = UKURAN_DISK_SEGMENTASI_MB):
+        self.batas_memori_bytes = int(batas_memori_mb * 1024 * 1024)
+        self.ukuran_disk_bytes = int(ukuran_disk_mb * 1024 * 1024)
+        self.cache_dir = cache_dir
+        self._entri: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._ukuran: Dict[str, int] = {}
+        self.hit = 0
+        self.hit_disk = 0
+        self.miss = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def kunci(sidik: str, metode: str, params: Dict) -> str:
+        """Kunci deterministik dari sidik data, metode, dan parameter (urutan kunci diabaikan)."""
+        params = {k: v for k, v in params.items() if k not in PARAM_TANPA_PENGARUH}
+        teks = json.dumps([sidik, metode, params], sort_keys=True, default=str)
+        return hashlib.blake2b(teks.encode('utf-8'), digest_size=20).hexdigest()
+
+    @staticmethod
+    def _ukuran_hasil(hasil: Dict) -> int:
+        """Perkiraan ukuran entri: label, tabel evaluasi, dan semua array milik model."""
+        ukuran = hasil['label'].nbytes + int(hasil['tabel_evaluasi'].memory_usage(deep=True).sum())
+        for nilai in vars(hasil['model']).values():
+            if isinstance(nilai, np.ndarray):
+                ukuran += nilai.nbytes
+            elif sp.issparse(nilai):
+                ukuran += nilai.data.nbytes + nilai.indices.nbytes + nilai.indptr.nbytes
+        return int(ukuran)
+
+    @property
+    def ukuran_memori(self) -> int:
+        return sum(self._ukuran.values())
+
+    def statistik(self) -> Dict[str, int]:
+        """Jumlah hit (RAM dan disk), miss, entri, dan pemakaian memori/disk."""
+        return {
+            'hit': self.hit,
+            'hit_disk': self.hit_disk,
+            'miss': self.miss,
+            'entri_memori': len(self._entri),
+            'ukuran_memori_bytes': self.ukuran_memori,
+            'entri_disk': len(_daftar_entri(self.cache_dir)) if self.cache_dir else 0,
+        }
+
+    def ambil(self, kunci: str) -> Optional[Dict]:
+        """Mengembalikan hasil tersimpan (dict label, tabel_evaluasi, model) atau None."""
+        if kunci in self._entri:
+            self._entri.move_to_end(kunci)
+            self.hit += 1
+            return self._entri[kunci]
+        hasil = self._muat_disk(kunci) if self.cache_dir else None
+        if hasil is None:
+            self.miss += 1
+            return None
+        self.hit_disk += 1
+        self._simpan_memori(kunci, hasil)
+        return hasil
+
+    def simpan(self, kunci: str, label: np.ndarray, tabel_evaluasi: pd.DataFrame, model) -> None:
+        hasil = {'label': np.array(label, copy=True), 'tabel_evaluasi': tabel_evaluasi.copy(), 'model': model}
+        self._simpan_memori(kunci, hasil)
+        if self.cache_dir:
+            self._simpan_disk(kunci, hasil)
+
+    def _simpan_memori(self, kunci: str, hasil: Dict):
+        ukuran = self._ukuran_hasil(hasil)
+        if ukuran > self.batas_memori_bytes:
+            logger.info(f"Hasil segmentasi ({ukuran / (1024 * 1024):.1f} MB) melebihi batas memori cache; tidak disimpan di RAM.")
+            return
+        self._entri[kunci] = hasil
+        self._ukuran[kunci] = ukuran
+        self._entri.move_to_end(kunci)
+        while self.ukuran_memori > self.batas_memori_bytes:
+            lama, _ = self._entri.popitem(last=False)
+            del self._ukuran[lama]
+            logger.info(f"Hasil segmentasi '{lama[:12]}' dikeluarkan dari memori (LRU).")
+
+    def _simpan_disk(self, kunci: str, hasil: Dict):
+        path = os.path.join(self.cache_dir, kunci)
+        if os.path.exists(path):
+            return
+        path_tmp = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(path_tmp)
+            np.save(os.path.join(path_tmp, 'label.npy'), hasil['label'])
+            simpan_status_model(hasil['model'], path_tmp)
+            with open(os.path.join(path_tmp, 'evaluasi.json'), 'w', encoding='utf-8') as f:
+                f.write(hasil['tabel_evaluasi'].to_json(orient='split', index=False, double_precision=15))
+            with open(os.path.join(path_tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'dibuat': time.time()}, f)
+            os.replace(path_tmp, path)
+        except TypeError as e:
+            logger.info(f"Hasil segmentasi hanya di-cache di RAM: {e}")
+            shutil.rmtree(path_tmp, ignore_errors=True)
+            return
+        except Exception as e:
+            logger.warning(f"Gagal menyimpan hasil segmentasi ke disk: {e}")
+            shutil.rmtree(path_tmp, ignore_errors=True)
+            return
+        _eviksi_lru(self.cache_dir, self.ukuran_disk_bytes)
+
+    def _muat_disk(self, kunci: str) -> Optional[Dict]:
+        path = os.path.join(self.cache_dir, kunci)
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            return None
+        try:
+            with open(os.path.join(path, 'evaluasi.json'), 'r', encoding='utf-8') as f:
+                tabel = pd.read_json(StringIO(f.read()), orient='split')
+            hasil = {'label': np.load(os.path.join(path, 'label.npy')), 'tabel_evaluasi': tabel,
+                     'model': muat_status_model(path)}
+            os.utime(os.path.join(path, 'meta.json'), None)
+            return hasil
+        except Exception as e:
+            logger.warning(f"Entri cache segmentasi '{kunci}' rusak dan dihapus: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+    def hapus_semua(self):
+        """Mengosongkan cache di memori dan di disk."""
+        self._entri.clear()
+        self._ukuran.clear()
+        if self.cache_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
@@ -1,25 +1,228 @@
-from sklearn.cluster import KMeans, DBSCAN
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import silhouette_score
+from evaluasi import evaluasi_klaster, nilai_metrik
+from sweep import jalankan_sweep, UKURAN_SAMPEL_SWEEP
+from graf_tetangga import GrafTetangga
+from cache import CacheSegmentasi, sidik_matriks
+from hierarki import PohonSegmen
+from profil import ProfilKlaster
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linear_sum_assignment
+import copy
 import logging
-from typing import Tuple, Optional
+import time
+from typing import Iterable, Iterator, Tuple, Optional, Union
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def ke_matriks_fitur(data_proses: Union[pd.DataFrame, sp.spmatrix]):
+    """
+    Menyiapkan matriks fitur untuk scikit-learn. DataFrame dengan kolom one-hot
+    sparse digabung dengan kolom numerik dense menjadi satu matriks CSR, sehingga
+    blok kategorikal tidak pernah diubah menjadi matriks dense.
+    """
+    if sp.issparse(data_proses):
+        return data_proses.tocsr()
+    kolom_sparse = [col for col, tipe in data_proses.dtypes.items() if isinstance(tipe, pd.SparseDtype)]
+    if not kolom_sparse:
+        return data_proses
+    kolom_dense = [col for col in data_proses.columns if col not in kolom_sparse]
+    blok = [data_proses[kolom_sparse].sparse.to_coo()]
+    if kolom_dense:
+        blok.insert(0, sp.csr_matrix(data_proses[kolom_dense].to_numpy(dtype=np.float64)))
+    return sp.hstack(blok, format='csr', dtype=np.float64)
+
+
+# Ukuran mini-batch default untuk K-Means (MiniBatch)
+BATCH_SIZE_DEFAULT = 1024
+# Jumlah baris per chunk saat melatih/memprediksi secara streaming
+UKURAN_CHUNK_DEFAULT = 100_000
+# Jumlah sampel maksimum untuk silhouette pada tabel perbandingan
+SAMPEL_SILHOUETTE_PERBANDINGAN = 10_000
+# Jumlah baris per halaman saat menampilkan anggota klaster
+UKURAN_HALAMAN_DEFAULT = 100
+# Segmentasi inkremental: batas drift pusat (relatif terhadap sebaran RMS klaster) sebelum fit ulang penuh
+AMBANG_DRIFT_DEFAULT = 0.25
+ITERASI_MAKS_INKREMENTAL = 50
+# Penanda baris yang belum ada pada run sebelumnya
+LABEL_BARU = -2
+
+
+def iter_chunk_matriks(matriks, chunksize: int = UKURAN_CHUNK_DEFAULT) -> Iterator:
+    """Membagi DataFrame, array (termasuk memmap), atau matriks sparse menjadi potongan baris."""
+    for mulai in range(0, matriks.shape[0], chunksize):
+        if isinstance(matriks, pd.DataFrame):
+            yield matriks.iloc[mulai:mulai + chunksize]
+        else:
+            yield matriks[mulai:mulai + chunksize]
+
+
+def latih_minibatch_streaming(chunks: Iterable, n_clusters: int, batch_size: int = BATCH_SIZE_DEFAULT,
+                              random_state: int = 42) -> MiniBatchKMeans:
+    """
+    Melatih MiniBatchKMeans dengan partial_fit atas aliran chunk fitur. Matriks penuh
+    hanya tidak berada di memori jika chunk dibaca dari disk (mis. potongan memmap hasil
+    out-of-core, lihat DataProcessor.proses_out_of_core); untuk matriks yang sudah
+    di memori tidak ada penghematan. Setiap chunk dipotong menjadi mini-batch berukuran `batch_size`.
+    """
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=random_state)
+    # partial_fit pertama membutuhkan minimal n_clusters sampel untuk inisialisasi pusat, jadi chunk
+    # awal ditampung sampai ada max(n_clusters, batch_size) baris; sisanya dilatih per mini-batch
+    n_awal = max(n_clusters, batch_size)
+    tampungan, n_tampungan = [], 0
+    for chunk in chunks:
+        chunk = ke_matriks_fitur(chunk) if isinstance(chunk, pd.DataFrame) else chunk
+        mulai = 0
+        if not hasattr(model, 'cluster_centers_'):
+            tampungan.append(chunk)
+            n_tampungan += chunk.shape[0]
+            if n_tampungan < n_awal:
+                continue
+            chunk = _gabung_baris(tampungan)
+            tampungan = []
+            model.partial_fit(chunk[:n_awal])
+            mulai = n_awal
+        for mulai in range(mulai, chunk.shape[0], batch_size):
+            model.partial_fit(chunk[mulai:mulai + batch_size])
+    if not hasattr(model, 'cluster_centers_'):
+        if n_tampungan < n_clusters:
+            raise ValueError(f"Data terlalu sedikit untuk {n_clusters} klaster ({n_tampungan} baris)."
+                             if n_tampungan else "Tidak ada data untuk dilatih.")
+        model.partial_fit(_gabung_baris(tampungan))
+    return model
+
+
+def _gabung_baris(blok: list):
+    """Menumpuk beberapa potongan baris (dense, DataFrame, atau sparse) menjadi satu matriks."""
+    if len(blok) == 1:
+        return blok[0]
+    if any(sp.issparse(b) for b in blok):
+        return sp.vstack(blok, format='csr')
+    return np.vstack([np.asarray(b) for b in blok])
+
+
+def prediksi_streaming(model, chunks: Iterable) -> np.ndarray:
+    """Memberi label klaster per chunk dengan model yang sudah dilatih."""
+    label = [model.predict(ke_matriks_fitur(c) if isinstance(c, pd.DataFrame) else c) for c in chunks]
+    return np.concatenate(label) if label else np.empty(0, dtype=np.int32)
+
+
+def bandingkan_kmeans(X, n_clusters: int, batch_size: int = BATCH_SIZE_DEFAULT,
+                      sampel_silhouette: int = SAMPEL_SILHOUETTE_PERBANDINGAN) -> pd.DataFrame:
+    """
+    Membandingkan K-Means penuh, MiniBatch K-Means, dan MiniBatch streaming
+    (partial_fit) pada data yang sama: inersia, silhouette (sampel), dan waktu fit.
+    Inersia dihitung ulang pada seluruh data agar ketiganya sebanding.
+    """
+    X = ke_matriks_fitur(X) if isinstance(X, pd.DataFrame) else X
+    kandidat = {
+        'K-Means': lambda: KMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit(X),
+        'K-Means (MiniBatch)': lambda: MiniBatchKMeans(
+            n_clusters=n_clusters, batch_size=batch_size, random_state=42, n_init=3).fit(X),
+        'K-Means (MiniBatch, streaming)': lambda: latih_minibatch_streaming(
+            iter_chunk_matriks(X), n_clusters, batch_size),
+    }
+    n_sampel = min(sampel_silhouette, X.shape[0])
+    hasil = []
+    for nama, latih in kandidat.items():
+        mulai = time.perf_counter()
+        model = latih()
+        waktu = time.perf_counter() - mulai
+        label = model.predict(X)
+        skor = silhouette_score(X, label, sample_size=n_sampel, random_state=42) if len(np.unique(label)) > 1 else None
+        hasil.append({'Metode': nama, 'Inersia': -model.score(X), 'Silhouette': skor, 'Waktu Fit (s)': waktu})
+    tabel = pd.DataFrame(hasil)
+    tabel['Inersia Relatif'] = tabel['Inersia'] / tabel['Inersia'].iloc[0]
+    return tabel
+
+
+class IndeksKlaster:
+    """
+    Indeks klaster -> posisi baris yang dibangun sekali dari array label
+    (argsort stabil + offset per klaster). Pencarian anggota, jumlah, dan
+    halaman anggota sebuah klaster sebanding dengan ukuran klaster, bukan
+    jumlah seluruh baris. Posisi anggota tetap terurut menaik.
+    """
+    def __init__(self, label: np.ndarray):
+        label = np.asarray(label)
+        self.n_baris = len(label)
+        self.urutan = np.argsort(label, kind='stable')
+        klaster, awal, jumlah = np.unique(label[self.urutan], return_index=True, return_counts=True)
+        self.klaster = klaster
+        self._rentang = {k.item(): (int(a), int(a + n)) for k, a, n in zip(klaster, awal, jumlah)}
+        self._jumlah = pd.Series(jumlah, index=pd.Index(klaster, name='Klaster'), name='Jumlah')
+
+    def posisi(self, id_klaster) -> np.ndarray:
+        """Posisi baris (untuk .iloc) anggota klaster; array kosong jika klaster tidak ada."""
+        awal, akhir = self._rentang.get(id_klaster, (0, 0))
+        return self.urutan[awal:akhir]
+
+    def jumlah(self) -> pd.Series:
+        """Jumlah anggota per klaster (termasuk noise -1 jika ada)."""
+        return self._jumlah
+
+    def jumlah_halaman(self, id_klaster, ukuran_halaman: int = UKURAN_HALAMAN_DEFAULT) -> int:
+        awal, akhir = self._rentang.get(id_klaster, (0, 0))
+        return max(1, -(-(akhir - awal) // ukuran_halaman))
+
+    def halaman(self, id_klaster, nomor: int = 1, ukuran_halaman: int = UKURAN_HALAMAN_DEFAULT) -> np.ndarray:
+        """Posisi baris untuk halaman ke-`nomor` (mulai dari 1) dari anggota klaster."""
+        anggota = self.posisi(id_klaster)
+        mulai = (max(nomor, 1) - 1) * ukuran_halaman
+        return anggota[mulai:mulai + ukuran_halaman]
+
+
 class Segmenter:
-    def __init__(self, data_asli: pd.DataFrame, data_proses: pd.DataFrame):
-        if not isinstance(data_asli, pd.DataFrame) or not isinstance(data_proses, pd.DataFrame):
-            raise TypeError("Data input harus berupa pandas DataFrame.")
+    def __init__(self, data_asli: pd.DataFrame, data_proses: Union[pd.DataFrame, sp.spmatrix],
+                 graf_dbscan: Optional[GrafTetangga] = None, cache_hasil: Optional[CacheSegmentasi] = None):
+        if not isinstance(data_asli, pd.DataFrame) or not (isinstance(data_proses, pd.DataFrame) or sp.issparse(data_proses)):
+            raise TypeError("Data input harus berupa pandas DataFrame (data proses boleh berupa matriks sparse).")
 
-        self.data_asli = data_asli.copy()
+        # Salinan dangkal: kolom 'Klaster' ditambahkan tanpa menyalin atau mengubah frame asal
+        self.data_asli = data_asli.copy(deep=False)
         self.data_proses = data_proses
+        # Matriks yang diberikan ke algoritma: CSR jika ada kolom sparse, selain itu DataFrame apa adanya
+        self.matriks_fitur = ke_matriks_fitur(data_proses)
         self.model = None
         self.label_klaster = None
+        self.tabel_evaluasi: Optional[pd.DataFrame] = None
+        self.indeks_klaster: Optional[IndeksKlaster] = None
+        # Graf tetangga DBSCAN dapat dibawa dari segmenter sebelumnya; dipakai ulang hanya jika datanya sama
+        self.graf_dbscan = graf_dbscan
+        # Cache hasil (label, evaluasi, model) per sidik data + metode + parameter
+        self.cache_hasil = cache_hasil
+        self._sidik: Optional[str] = None
+        self.dari_cache = False
+        # Profil klaster dihitung sekali per hasil segmentasi (saat pertama diminta)
+        self._profil: Optional[ProfilKlaster] = None
+
+    @property
+    def sidik(self) -> str:
+        """Sidik isi matriks fitur (dihitung sekali per segmenter)."""
+        if self._sidik is None:
+            self._sidik = self.graf_dbscan.sidik if self.graf_dbscan is not None and self.graf_dbscan.X is self.matriks_fitur \
+                else sidik_matriks(self.matriks_fitur)
+        return self._sidik
 
     def jalankan_segmentasi(self, metode: str, params: dict) -> Tuple[bool, Optional[pd.DataFrame], str, Optional[float]]:
         try:
+            self.dari_cache = False
+            kunci_cache = self.cache_hasil.kunci(self.sidik, metode, params) if self.cache_hasil is not None else None
+            hasil_cache = self.cache_hasil.ambil(kunci_cache) if kunci_cache else None
+            if hasil_cache is not None:
+                self.model, self.tabel_evaluasi = hasil_cache['model'], hasil_cache['tabel_evaluasi']
+                self.label_klaster = hasil_cache['label'].copy()
+                self.data_asli['Klaster'] = self.label_klaster
+                self.indeks_klaster = IndeksKlaster(self.label_klaster)
+                self._profil = None
+                self.dari_cache = True
+                logger.info(f"Hasil {metode} diambil dari cache.")
+                return True, self.data_asli, f"Segmentasi dengan {metode} berhasil (dari cache).", nilai_metrik(self.tabel_evaluasi, 'Silhouette')
+
             # SN-001: Memilih metode segmentasi
             if metode == 'K-Means':
                 n_clusters = params.get('n_clusters', 3)
@@ -28,25 +231,60 @@ class Segmenter:
                 self.model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
                 logger.info(f"Menjalankan K-Means dengan {n_clusters} klaster.")
 
+            elif metode == 'K-Means (MiniBatch)':
+                n_clusters = params.get('n_clusters', 3)
+                if n_clusters < 2: # SN-002-01 Validasi
+                    return False, None, "Jumlah cluster tidak valid (harus >= 2).", None
+                batch_size = params.get('batch_size', BATCH_SIZE_DEFAULT)
+                if params.get('streaming'):
+                    # Latih dengan partial_fit per chunk, lalu beri label per chunk; untuk data out-of-core
+                    # matriks_fitur adalah DataFrame memmap sehingga hanya satu chunk yang dibaca ke memori
+                    chunksize = params.get('chunksize', UKURAN_CHUNK_DEFAULT)
+                    logger.info(f"Melatih MiniBatch K-Means secara streaming (chunk={chunksize}, batch={batch_size}).")
+                    self.model = latih_minibatch_streaming(
+                        iter_chunk_matriks(self.matriks_fitur, chunksize), n_clusters, batch_size)
+                else:
+                    self.model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=42, n_init=3)
+                logger.info(f"Menjalankan MiniBatch K-Means dengan {n_clusters} klaster (batch={batch_size}).")
+
+            elif metode == 'K-Means (Bisecting)':
+                n_clusters = params.get('n_clusters', 3)
+                if n_clusters < 2: # SN-002-01 Validasi
+                    return False, None, "Jumlah cluster tidak valid (harus >= 2).", None
+                # Pohon dapat dibangun lebih besar dari n_clusters agar k lain dapat dibaca tanpa fit ulang
+                ukuran_pohon = max(n_clusters, params.get('ukuran_pohon', n_clusters))
+                self.model = PohonSegmen(k_maks=ukuran_pohon, random_state=42)
+                logger.info(f"Menjalankan Bisecting K-Means dengan {n_clusters} klaster (pohon {ukuran_pohon} daun).")
+
             elif metode == 'DBSCAN':
-                # Parameter default untuk DBSCAN, bisa dibuat dinamis di UI jika perlu
                 eps = params.get('eps', 0.5)
                 min_samples = params.get('min_samples', 5)
-                self.model = DBSCAN(eps=eps, min_samples=min_samples)
+                if eps <= 0 or min_samples < 1:
+                    return False, None, "Parameter DBSCAN tidak valid (eps > 0 dan min_samples >= 1).", None
                 logger.info(f"Menjalankan DBSCAN dengan eps={eps} dan min_samples={min_samples}.")
+                # Graf tetangga dibangun sekali pada eps_maks, lalu dipakai ulang untuk eps <= eps_maks
+                if self.graf_dbscan is None or not self.graf_dbscan.cocok(self.matriks_fitur):
+                    self.graf_dbscan = GrafTetangga(self.matriks_fitur, eps_maks=max(eps, params.get('eps_maks', eps)),
+                                                     eps_minimum=eps)
+                self.model = self.graf_dbscan.jalankan(eps, min_samples)
 
             else:
                 return False, None, "Metode segmentasi tidak valid.", None
 
             # Menjalankan model dan menghitung skor
-            self.label_klaster = self.model.fit_predict(self.data_proses)
-            self.data_asli['Klaster'] = self.label_klaster
-
-            skor_silhouette = None
-            unique_labels = np.unique(self.label_klaster)
-            # Silhouette score hanya bisa dihitung jika ada lebih dari 1 klaster
-            if len(unique_labels) > 1:
-                skor_silhouette = silhouette_score(self.data_proses, self.label_klaster)
+            if metode == 'DBSCAN':
+                self.label_klaster = self.model.labels_
+            elif metode == 'K-Means (MiniBatch)' and params.get('streaming'):
+                self.label_klaster = prediksi_streaming(
+                    self.model, iter_chunk_matriks(self.matriks_fitur, params.get('chunksize', UKURAN_CHUNK_DEFAULT)))
+            elif metode == 'K-Means (Bisecting)':
+                self.label_klaster = self.model.fit(self.matriks_fitur).atur_k(
+                    min(params.get('n_clusters', 3), self.model.ukuran_pohon)).labels_
+            else:
+                self.label_klaster = self.model.fit_predict(self.matriks_fitur)
+            skor_silhouette = self._terapkan_label(self.label_klaster, params)
+            if kunci_cache:
+                self.cache_hasil.simpan(kunci_cache, self.label_klaster, self.tabel_evaluasi, self.model)
 
             logger.info("Proses clustering selesai.")
             return True, self.data_asli, f"Segmentasi dengan {metode} berhasil.", skor_silhouette
@@ -56,8 +294,185 @@ class Segmenter:
             logger.error(pesan_error)
             return False, None, pesan_error, None
 
-    def dapatkan_detail_klaster(self, id_klaster: int) -> Optional[pd.DataFrame]:
-        """Mendapatkan detail anggota dari sebuah klaster."""
-        if 'Klaster' in self.data_asli.columns:
-            return self.data_asli[self.data_asli['Klaster'] == id_klaster]
-        return None
\ No newline at end of file
+    def _terapkan_label(self, label: np.ndarray, params: dict) -> Optional[float]:
+        """Menyimpan label hasil fit, membangun indeks klaster, dan mengevaluasi kualitas."""
+        self.label_klaster = label
+        self.data_asli['Klaster'] = label
+        # Indeks anggota per klaster dibangun sekali agar tampilan detail tidak memindai semua baris
+        self.indeks_klaster = IndeksKlaster(label)
+        self._profil = None
+        # Evaluasi kualitas: silhouette otomatis memakai sampel terstratifikasi untuk data besar,
+        # params['evaluasi'] dapat berisi metrik, batas_sampel, ukuran_sampel, dan seed
+        self.tabel_evaluasi = evaluasi_klaster(self.matriks_fitur, label, **params.get('evaluasi', {}))
+        # Silhouette score hanya bisa dihitung jika ada lebih dari 1 klaster (None jika tidak)
+        return nilai_metrik(self.tabel_evaluasi, 'Silhouette')
+
+    def _label_lama_per_baris(self, label_lama: pd.Series) -> np.ndarray:
+        """
+        Menyelaraskan label run sebelumnya dengan baris saat ini lewat index (baris yang
+        tidak ada di run sebelumnya bernilai -2). Array tanpa kunci baris ditolak: setelah
+        cleaning ulang, posisi baris tidak lagi menunjuk nasabah yang sama.
+        """
+        if not isinstance(label_lama, pd.Series):
+            raise ValueError("Label sebelumnya tidak memiliki kunci baris; gunakan Series berindeks baris.")
+        indeks = self.data_proses.index if isinstance(self.data_proses, pd.DataFrame) else self.data_asli.index
+        return label_lama.reindex(indeks).fillna(LABEL_BARU).to_numpy(dtype=np.int64)
+
+    def jalankan_inkremental(self, pusat_lama: np.ndarray, label_lama: pd.Series,
+                             params: Optional[dict] = None, ambang_drift: float = AMBANG_DRIFT_DEFAULT
+                             ) -> Tuple[bool, Optional[pd.DataFrame], str, Optional[dict]]:
+        """
+        Segmentasi ulang inkremental dari hasil K-Means sebelumnya.
+        1. Baris baru dilipat ke pusat lama: jumlah & total fitur per klaster dari run
+           sebelumnya ditambah baris baru yang ditugaskan ke pusat terdekat (O(baris baru)).
+        2. K-Means di-warm-start dari pusat tersebut (n_init=1), biasanya konvergen dalam
+           beberapa iterasi.
+        3. Jika drift pusat relatif terhadap sebaran klaster melebihi `ambang_drift`,
+           dilakukan fit ulang penuh dan id klaster dicocokkan ke pusat lama.
+        Mengembalikan laporan berisi mode, drift per pusat, dan jumlah nasabah lama yang pindah segmen.
+        """
+        params = params or {}
+        try:
+            mulai = time.perf_counter()
+            pusat_lama = np.asarray(pusat_lama, dtype=np.float64)
+            k = len(pusat_lama)
+            X = self.matriks_fitur
+            if isinstance(X, pd.DataFrame):
+                X = X.to_numpy(dtype=np.float64)
+            if X.shape[1] != pusat_lama.shape[1]:
+                return False, None, "Jumlah fitur berbeda dengan hasil sebelumnya; lakukan segmentasi penuh.", None
+            label_lama = self._label_lama_per_baris(label_lama)
+            lama = (label_lama >= 0) & (label_lama < k)
+            baru = ~lama
+
+            # 1. Lipat baris baru ke pusat lama (pusat K-Means = rata-rata anggotanya)
+            jumlah = np.bincount(label_lama[lama], minlength=k).astype(np.float64)
+            total = pusat_lama * jumlah[:, None]
+            if baru.any():
+                X_baru = X[np.flatnonzero(baru)]
+                label_baru = np.argmin((pusat_lama ** 2).sum(axis=1) - 2 * np.asarray(X_baru @ pusat_lama.T), axis=1)
+                indikator = sp.csr_matrix((np.ones(len(label_baru)), (label_baru, np.arange(len(label_baru)))),
+                                          shape=(k, len(label_baru)))
+                tambahan = indikator @ X_baru
+                total += tambahan.toarray() if sp.issparse(tambahan) else np.asarray(tambahan)
+                jumlah += np.bincount(label_baru, minlength=k)
+            pusat_awal = np.where(jumlah[:, None] > 0, total / np.maximum(jumlah, 1)[:, None], pusat_lama)
+
+            # 2. K-Means warm start dari pusat hasil pelipatan
+            model = KMeans(n_clusters=k, init=pusat_awal, n_init=1, random_state=42,
+                           max_iter=params.get('max_iter', ITERASI_MAKS_INKREMENTAL)).fit(self.matriks_fitur)
+            mode = 'inkremental'
+            sebaran = np.sqrt(model.inertia_ / X.shape[0]) or 1.0
+            drift = np.linalg.norm(model.cluster_centers_ - pusat_lama, axis=1) / sebaran
+
+            # 3. Fallback: fit ulang penuh jika struktur klaster bergeser terlalu jauh
+            if drift.max() > ambang_drift:
+                logger.info(f"Drift pusat {drift.max():.3f} melebihi ambang {ambang_drift}; fit ulang penuh.")
+                model = KMeans(n_clusters=k, random_state=42, n_init=10).fit(self.matriks_fitur)
+                # Cocokkan id klaster baru dengan pusat lama terdekat agar perpindahan segmen bermakna
+                jarak = np.linalg.norm(pusat_lama[:, None, :] - model.cluster_centers_[None, :, :], axis=2)
+                _, urutan = linear_sum_assignment(jarak)
+                peta = np.empty(k, dtype=np.int64)
+                peta[urutan] = np.arange(k)
+                model.cluster_centers_ = model.cluster_centers_[urutan]
+                model.labels_ = peta[model.labels_].astype(model.labels_.dtype)
+                mode = 'fit ulang penuh'
+                sebaran = np.sqrt(model.inertia_ / X.shape[0]) or 1.0
+                drift = np.linalg.norm(model.cluster_centers_ - pusat_lama, axis=1) / sebaran
+
+            self.model = model
+            skor = self._terapkan_label(model.labels_, params)
+            pindah = int((model.labels_[lama] != label_lama[lama]).sum())
+            laporan = {
+                'mode': mode,
+                'baris_lama': int(lama.sum()),
+                'baris_baru': int(baru.sum()),
+                'iterasi': int(model.n_iter_),
+                'drift': pd.Series(drift, index=pd.Index(range(k), name='Klaster'), name='Drift Relatif'),
+                'drift_maks': float(drift.max()),
+                'pindah_segmen': pindah,
+                'persen_pindah': pindah / max(int(lama.sum()), 1),
+                'silhouette': skor,
+                'waktu': time.perf_counter() - mulai,
+            }
+            logger.info(f"Segmentasi {mode}: {laporan['baris_baru']:,} baris baru, {pindah:,} nasabah lama pindah segmen, "
+                        f"drift maks {laporan['drift_maks']:.3f}, {laporan['waktu']:.2f} detik.")
+            return True, self.data_asli, f"Segmentasi ulang ({mode}) berhasil.", laporan
+
+        except Exception as e:
+            pesan_error = f"Gagal menjalankan segmentasi inkremental: {str(e)}"
+            logger.error(pesan_error)
+            return False, None, pesan_error, None
+
+    def baca_k_dari_pohon(self, k: int, params: Optional[dict] = None) -> Tuple[bool, Optional[pd.DataFrame], str, Optional[float]]:
+        """
+        Mengganti jumlah segmen hasil Bisecting K-Means dengan membaca label tingkat k
+        dari pohon segmen yang sudah dibangun (tanpa fit ulang). Hanya evaluasi yang dihitung ulang.
+        """
+        if not isinstance(self.model, PohonSegmen):
+            return False, None, "Segmentasi Bisecting K-Means belum dijalankan.", None
+        try:
+            # Salinan dangkal: objek pohon di cache tetap pada tingkat k saat disimpan
+            self.model = copy.copy(self.model).atur_k(k)
+            skor_silhouette = self._terapkan_label(self.model.labels_, params or {})
+            self.dari_cache = False
+            return True, self.data_asli, f"Segmentasi dengan {k} segmen dibaca dari pohon.", skor_silhouette
+        except ValueError as e:
+            return False, None, str(e), None
+
+    def rollup_klaster(self, k_kasar: int) -> Optional[pd.DataFrame]:
+        """
+        Tabel penggabungan segmen Bisecting K-Means ke tingkat `k_kasar`: setiap klaster
+        saat ini beserta klaster induknya dan jumlah anggotanya. None untuk metode lain.
+        """
+        if not isinstance(self.model, PohonSegmen) or self.indeks_klaster is None:
+            return None
+        peta = self.model.peta_rollup(self.model.k_aktif, k_kasar)
+        jumlah = self.jumlah_per_klaster()
+        return pd.DataFrame({'Klaster': list(peta.keys()), 'Klaster Induk': list(peta.values()),
+                             'Jumlah': [int(jumlah.get(k, 0)) for k in peta]})
+
+    def bandingkan_kmeans(self, n_clusters: int, batch_size: int = BATCH_SIZE_DEFAULT) -> pd.DataFrame:
+        """Membandingkan K-Means penuh dan MiniBatch pada data segmenter ini."""
+        return bandingkan_kmeans(self.matriks_fitur, n_clusters, batch_size)
+
+    def sweep(self, rentang_k: Optional[Iterable[int]] = None,
+              grid_dbscan: Optional[Iterable[Tuple[float, int]]] = None,
+              n_jobs: Optional[int] = None, warm_start: bool = True,
+              ukuran_sampel: int = UKURAN_SAMPEL_SWEEP) -> pd.DataFrame:
+        """
+        Menjalankan K-Means untuk setiap k dan DBSCAN untuk setiap pasangan (eps, min_samples)
+        secara paralel pada matriks fitur segmenter ini. Hasilnya berupa tabel inersia,
+        silhouette (sampel), dan waktu per konfigurasi untuk grafik elbow.
+        """
+        mulai = time.perf_counter()
+        tabel = jalankan_sweep(self.matriks_fitur, rentang_k, grid_dbscan, n_jobs=n_jobs,
+                               warm_start=warm_start, ukuran_sampel=ukuran_sampel)
+        logger.info(f"Sweep {len(tabel)} konfigurasi selesai dalam {time.perf_counter() - mulai:.2f} detik.")
+        return tabel
+
+    def dapatkan_detail_klaster(self, id_klaster: int, halaman: Optional[int] = None,
+                                ukuran_halaman: int = UKURAN_HALAMAN_DEFAULT) -> Optional[pd.DataFrame]:
+        """
+        Mendapatkan detail anggota dari sebuah klaster melalui indeks klaster.
+        Jika `halaman` diberikan, hanya baris pada halaman tersebut yang dikembalikan.
+        """
+        if self.indeks_klaster is None:
+            if 'Klaster' not in self.data_asli.columns:
+                return None
+            self.indeks_klaster = IndeksKlaster(self.data_asli['Klaster'].to_numpy())
+        if halaman is None:
+            return self.data_asli.iloc[self.indeks_klaster.posisi(id_klaster)]
+        return self.data_asli.iloc[self.indeks_klaster.halaman(id_klaster, halaman, ukuran_halaman)]
+
+    def profil_klaster(self) -> Optional[ProfilKlaster]:
+        """Profil klaster hasil segmentasi terakhir; dihitung sekali lalu dipakai ulang oleh grafik dan laporan."""
+        if self.label_klaster is None:
+            return None
+        if self._profil is None:
+            self._profil = ProfilKlaster(self.data_asli, self.label_klaster)
+        return self._profil
+
+    def jumlah_per_klaster(self) -> Optional[pd.Series]:
+        """Jumlah anggota setiap klaster dari indeks (tanpa value_counts atas seluruh data)."""
+        return None if self.indeks_klaster is None else self.indeks_klaster.jumlah()
\ No newline at end of file
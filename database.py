@@ -1,25 +1,157 @@
 # File: database.py
 # Deskripsi: Modul untuk menangani semua interaksi dengan database SQLite.
 
+import atexit
+import json
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
 import pandas as pd
-import os
+
+from profil import KOLOM_DIABAIKAN
 
 DB_FILE = "bank_segmentation.db"
+# Tabel hasil segmentasi (dengan rekomendasi) yang dibaca halaman laporan
+TABEL_HASIL_SEGMENTASI = "clustered_data"
 
-def get_db_connection():
-    """Membuat dan mengembalikan koneksi ke database."""
-    conn = sqlite3.connect(DB_FILE)
+# Pengaturan koneksi: WAL agar pembaca tidak memblokir penulis (dan sebaliknya),
+# synchronous=NORMAL (aman untuk WAL, fsync hanya saat checkpoint), cache halaman 64 MB,
+# memory-map 256 MB untuk pembacaan, dan tabel sementara di memori.
+PRAGMA_KONEKSI = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Lama menunggu lock database sebelum gagal (detik)
+BATAS_TUNGGU_LOCK = 30.0
+# Jumlah maksimum koneksi per file database; sesi Streamlit meminjam koneksi dari pool
+UKURAN_POOL_DEFAULT = 8
+
+
+def buat_koneksi(db_file: Optional[str] = None, check_same_thread: bool = True,
+                 isolation_level: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Membuat koneksi baru dengan pragma PRAGMA_KONEKSI dan busy timeout.
+    Default-nya mode autocommit (isolation_level=None) untuk pool; transaksi dibuka
+    secara eksplisit, lihat PoolKoneksi.transaksi. Koneksi autocommit jangan diberikan
+    ke DataFrame.to_sql: setiap INSERT akan di-commit sendiri-sendiri.
+    """
+    conn = sqlite3.connect(db_file or DB_FILE, timeout=BATAS_TUNGGU_LOCK,
+                           isolation_level=isolation_level, check_same_thread=check_same_thread)
+    for nama, nilai in PRAGMA_KONEKSI.items():
+        conn.execute(f"PRAGMA {nama} = {nilai}")
     return conn
 
+
+class PoolKoneksi:
+    """
+    Pool koneksi SQLite yang aman untuk banyak thread (satu thread per sesi Streamlit).
+    Koneksi dibuat sesuai kebutuhan hingga `ukuran`, dipakai ulang setelah dikembalikan,
+    dan tidak pernah dipakai dua thread sekaligus. Jika semua koneksi sedang dipinjam,
+    peminjam berikutnya menunggu hingga BATAS_TUNGGU_LOCK detik.
+    """
+    def __init__(self, db_file: str, ukuran: int = UKURAN_POOL_DEFAULT):
+        self.db_file = db_file
+        self.ukuran = ukuran
+        self._bebas: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._semua = []
+        self._kunci = threading.Lock()
+
+    @contextmanager
+    def pinjam(self) -> Iterator[sqlite3.Connection]:
+        """Meminjam koneksi; transaksi yang masih terbuka di-rollback saat dikembalikan."""
+        try:
+            conn = self._bebas.get_nowait()
+        except queue.Empty:
+            with self._kunci:
+                conn = buat_koneksi(self.db_file, check_same_thread=False) if len(self._semua) < self.ukuran else None
+                if conn is not None:
+                    self._semua.append(conn)
+            if conn is None:
+                conn = self._bebas.get(timeout=BATAS_TUNGGU_LOCK)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._bebas.put(conn)
+
+    @contextmanager
+    def transaksi(self) -> Iterator[sqlite3.Connection]:
+        """
+        Meminjam koneksi dalam satu transaksi tulis. BEGIN IMMEDIATE mengambil lock
+        tulis di awal sehingga penulis yang bersaing menunggu (busy timeout) alih-alih
+        gagal saat upgrade dari lock baca. Commit jika sukses, rollback jika error.
+        """
+        with self.pinjam() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            if conn.in_transaction:
+                conn.commit()
+
+    def tutup(self):
+        with self._kunci:
+            for conn in self._semua:
+                conn.close()
+            self._semua.clear()
+            self._bebas = queue.LifoQueue()
+
+
+_pool: Dict[str, PoolKoneksi] = {}
+_kunci_pool = threading.Lock()
+
+
+def pool_koneksi(db_file: Optional[str] = None) -> PoolKoneksi:
+    """Pool koneksi bersama untuk sebuah file database (default DB_FILE)."""
+    path = os.path.abspath(db_file or DB_FILE)
+    with _kunci_pool:
+        if path not in _pool:
+            _pool[path] = PoolKoneksi(path)
+        return _pool[path]
+
+
+@atexit.register
+def tutup_semua_koneksi():
+    """Menutup semua koneksi di semua pool (dipanggil otomatis saat proses berakhir)."""
+    with _kunci_pool:
+        for pool in _pool.values():
+            pool.tutup()
+        _pool.clear()
+
+
+def get_db_connection():
+    """
+    Membuat dan mengembalikan koneksi baru ke database (dengan pragma yang sama seperti pool).
+    Seperti sqlite3.connect biasa, transaksi dibuka otomatis sebelum penulisan dan ditutup
+    dengan commit(), sehingga aman dipakai untuk DataFrame.to_sql.
+    Pemanggil bertanggung jawab menutupnya; fungsi di modul ini memakai pool_koneksi().
+    """
+    return buat_koneksi(isolation_level='DEFERRED')
+
 def init_db():
     """
     Inisialisasi database dan membuat tabel jika belum ada.
     Fungsi ini aman untuk dijalankan setiap kali aplikasi dimulai.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with pool_koneksi().transaksi() as conn:
+        _buat_tabel_awal(conn.cursor())
+        _buat_tabel_run(conn)
+    print("Database berhasil diinisialisasi.")
 
+def _buat_tabel_awal(cursor: sqlite3.Cursor):
     # Tabel untuk menyimpan data yang telah diproses oleh Admin
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS processed_data (
@@ -50,46 +182,551 @@ def init_db():
     )
     """)
 
-    conn.commit()
-    conn.close()
-    print("Database berhasil diinisialisasi.")
+# Jumlah baris per executemany saat menulis DataFrame (membatasi objek Python sementara)
+UKURAN_CHUNK_TULIS = 50_000
+MODE_TULIS = ('replace', 'append', 'upsert')
+
 
-def save_dataframe(df: pd.DataFrame, table_name: str):
+def _kutip(nama: str) -> str:
+    """Mengutip nama tabel/kolom SQLite (aman untuk nama kolom one-hot dengan spasi atau simbol)."""
+    return '"' + str(nama).replace('"', '""') + '"'
+
+
+def _tipe_sqlite(seri: pd.Series) -> str:
+    # BOOLEAN (afinitas NUMERIC, disimpan 0/1) agar ringkasan tetap mengenali kolom bool sebagai kategorikal
+    if pd.api.types.is_bool_dtype(seri):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(seri):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(seri):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _kolom_tabel(conn: sqlite3.Connection, table_name: str) -> list:
+    return [baris[1] for baris in conn.execute(f"PRAGMA table_info({_kutip(table_name)})")]
+
+
+def _nilai_kolom(seri: pd.Series) -> list:
+    """Nilai kolom sebagai objek Python yang dapat di-bind sqlite3 (NaN/NA -> NULL)."""
+    if isinstance(seri.dtype, pd.SparseDtype):
+        # Kolom one-hot sparse dipadatkan per chunk
+        seri = seri.sparse.to_dense()
+    if isinstance(seri.dtype, np.dtype) and seri.dtype.kind in 'biuf':
+        # tolist() menghasilkan int/float Python; NaN float disimpan SQLite sebagai NULL
+        return seri.to_numpy().tolist()
+    if pd.api.types.is_datetime64_any_dtype(seri):
+        return seri.astype(str).where(seri.notna(), None).tolist()
+    return seri.to_numpy(dtype=object, na_value=None).tolist()
+
+
+def _siapkan_tabel(conn: sqlite3.Connection, df: pd.DataFrame, table_name: str, mode: str, kunci: list):
+    """Membuat (atau mengganti) tabel sesuai kolom DataFrame; kolom baru ditambahkan pada mode append/upsert."""
+    if mode == 'replace':
+        conn.execute(f"DROP TABLE IF EXISTS {_kutip(table_name)}")
+    kolom_ada = _kolom_tabel(conn, table_name)
+    if not kolom_ada:
+        definisi = ', '.join(f"{_kutip(c)} {_tipe_sqlite(df[c])}" for c in df.columns)
+        conn.execute(f"CREATE TABLE {_kutip(table_name)} ({definisi})")
+    else:
+        for c in df.columns:
+            if c not in kolom_ada:
+                conn.execute(f"ALTER TABLE {_kutip(table_name)} ADD COLUMN {_kutip(c)} {_tipe_sqlite(df[c])}")
+    if mode == 'upsert':
+        # ON CONFLICT membutuhkan indeks unik pada kolom kunci
+        nama_indeks = _kutip(f"ux_{table_name}_{'_'.join(map(str, kunci))}")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {nama_indeks} ON {_kutip(table_name)} "
+                     f"({', '.join(map(_kutip, kunci))})")
+
+
+def save_dataframe(df: pd.DataFrame, table_name: str, mode: str = 'replace', kunci: Optional[list] = None,
+                   ukuran_chunk: int = UKURAN_CHUNK_TULIS, db_file: Optional[str] = None,
+                   ringkasan: bool = False) -> Optional[Dict]:
     """
-    Menyimpan Pandas DataFrame ke dalam tabel SQLite.
-    if_exists='replace' akan menghapus tabel lama dan menggantinya dengan data baru.
+    Menyimpan Pandas DataFrame ke dalam tabel SQLite dalam satu transaksi, per chunk
+    `ukuran_chunk` baris dengan executemany.
+    - mode='replace': tabel lama dihapus dan diganti dengan data baru (perilaku default).
+    - mode='append': baris ditambahkan; kolom yang belum ada ditambahkan ke tabel.
+    - mode='upsert': baris dengan nilai `kunci` yang sudah ada diperbarui, sisanya ditambahkan,
+      sehingga pembaruan sebagian tidak menulis ulang seluruh tabel.
+    Mengembalikan ringkasan (baris, detik, baris_per_detik) atau None jika gagal.
+    `db_file` default ke DB_FILE. Ringkasan per klaster (lihat perbarui_ringkasan) dihitung ulang
+    dalam transaksi yang sama jika `ringkasan=True`, atau pada mode 'replace' bila tabel
+    ringkasannya sudah ada. Append/upsert tanpa `ringkasan=True` tidak memindai ulang seluruh
+    tabel; ringkasan lama dihapus agar laporan tidak membaca angka yang usang.
     """
-    conn = get_db_connection()
     try:
-        df.to_sql(table_name, conn, if_exists='replace', index=False)
-        print(f"DataFrame berhasil disimpan ke tabel '{table_name}'.")
+        if mode not in MODE_TULIS:
+            raise ValueError(f"Mode tulis tidak dikenal: {mode}")
+        kunci = [kunci] if isinstance(kunci, str) else list(kunci or [])
+        if mode == 'upsert' and (not kunci or any(k not in df.columns for k in kunci)):
+            raise ValueError("Mode upsert membutuhkan kolom kunci yang ada di DataFrame.")
+        mulai = time.perf_counter()
+        kolom = ', '.join(map(_kutip, df.columns))
+        sql = f"INSERT INTO {_kutip(table_name)} ({kolom}) VALUES ({', '.join('?' * len(df.columns))})"
+        if mode == 'upsert':
+            diperbarui = [c for c in df.columns if c not in kunci]
+            sql += f" ON CONFLICT ({', '.join(map(_kutip, kunci))}) " + (
+                f"DO UPDATE SET {', '.join(f'{_kutip(c)} = excluded.{_kutip(c)}' for c in diperbarui)}"
+                if diperbarui else "DO NOTHING")
+        # Satu transaksi untuk drop/create dan seluruh chunk insert
+        with pool_koneksi(db_file).transaksi() as conn:
+            _siapkan_tabel(conn, df, table_name, mode, kunci)
+            _pastikan_indeks(conn, table_name, [c for c in KOLOM_INDEKS_OTOMATIS if c in df.columns])
+            for awal in range(0, len(df), ukuran_chunk):
+                chunk = df.iloc[awal:awal + ukuran_chunk]
+                conn.executemany(sql, zip(*(_nilai_kolom(chunk[c]) for c in chunk.columns)))
+            if _ringkasan_ada(conn, table_name) or ringkasan:
+                if 'Klaster' in _kolom_tabel(conn, table_name) and (ringkasan or mode == 'replace'):
+                    _simpan_ringkasan(conn, table_name, _hitung_ringkasan(conn, table_name))
+                else:
+                    _hapus_ringkasan(conn, table_name)
+        detik = time.perf_counter() - mulai
+        laporan = {'baris': len(df), 'detik': detik, 'baris_per_detik': len(df) / detik if detik > 0 else float('inf')}
+        print(f"DataFrame berhasil disimpan ke tabel '{table_name}' ({mode}): {len(df):,} baris dalam "
+              f"{detik:.2f} detik ({laporan['baris_per_detik']:,.0f} baris/detik).")
+        return laporan
     except Exception as e:
         print(f"Gagal menyimpan DataFrame: {e}")
-    finally:
-        conn.close()
+        return None
+
+# Jumlah baris per chunk saat membaca tabel secara bertahap
+UKURAN_CHUNK_BACA = 50_000
+# Kolom yang selalu diindeks saat tabel disimpan (filter laporan per segmen)
+KOLOM_INDEKS_OTOMATIS = ('Klaster',)
+
+
+def _kolom_tanpa_indeks(conn: sqlite3.Connection, table_name: str, kolom: list) -> list:
+    """Kolom yang belum menjadi kolom pertama indeks mana pun pada tabel (cukup koneksi baca)."""
+    terindeks = set()
+    for indeks in conn.execute(f"PRAGMA index_list({_kutip(table_name)})").fetchall():
+        info = conn.execute(f"PRAGMA index_info({_kutip(indeks[1])})").fetchone()
+        if info is not None:
+            terindeks.add(info[2])
+    return [c for c in kolom if c not in terindeks]
+
+
+def _pastikan_indeks(conn: sqlite3.Connection, table_name: str, kolom: list):
+    """Membuat indeks satu kolom untuk setiap kolom filter yang belum memiliki indeks."""
+    for c in _kolom_tanpa_indeks(conn, table_name, kolom):
+        nama_indeks = f"ix_{table_name}_{c}"
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {_kutip(nama_indeks)} ON {_kutip(table_name)} ({_kutip(c)})")
+
+
+def _siapkan_indeks_filter(pool: PoolKoneksi, table_name: str, kolom: list):
+    """
+    Memastikan kolom filter terindeks sebelum dibaca. Indeks yang ada dicek lewat koneksi
+    baca biasa; transaksi tulis hanya dibuka jika ada indeks yang kurang, sehingga pembacaan
+    tidak menunggu penulis lain. Jika indeks gagal dibuat (database terkunci), pembacaan
+    tetap berjalan tanpa indeks.
+    """
+    with pool.pinjam() as conn:
+        kurang = _kolom_tanpa_indeks(conn, table_name, kolom)
+    if not kurang:
+        return
+    try:
+        with pool.transaksi() as conn:
+            _pastikan_indeks(conn, table_name, kurang)
+    except sqlite3.OperationalError as e:
+        print(f"Indeks untuk kolom {', '.join(kurang)} belum dapat dibuat: {e}")
+
+
+def _klausa_filter(filter_baris: Dict, kolom_ada: list) -> tuple:
+    """
+    Menerjemahkan filter menjadi klausa WHERE berparameter:
+    nilai tunggal -> '=', list/tuple/set -> 'IN', dan dict {'min': a, 'max': b}
+    (salah satu boleh tidak ada) -> rentang inklusif. Nama kolom divalidasi terhadap tabel.
+    """
+    klausa, params = [], []
+    for c, nilai in filter_baris.items():
+        if c not in kolom_ada:
+            raise KeyError(f"Kolom filter '{c}' tidak ada di tabel.")
+        if isinstance(nilai, dict):
+            if nilai.get('min') is not None:
+                klausa.append(f"{_kutip(c)} >= ?"); params.append(nilai['min'])
+            if nilai.get('max') is not None:
+                klausa.append(f"{_kutip(c)} <= ?"); params.append(nilai['max'])
+        elif isinstance(nilai, (list, tuple, set)):
+            nilai = list(nilai)
+            klausa.append(f"{_kutip(c)} IN ({', '.join('?' * len(nilai))})" if nilai else "0")
+            params.extend(nilai)
+        else:
+            klausa.append(f"{_kutip(c)} = ?"); params.append(nilai)
+    params = [v.item() if isinstance(v, np.generic) else v for v in params]
+    return (" WHERE " + " AND ".join(klausa) if klausa else ""), params
+
+
+def iter_dataframe(table_name: str, kolom: Optional[list] = None, filter_baris: Optional[Dict] = None,
+                   ukuran_chunk: int = UKURAN_CHUNK_BACA) -> Iterator[pd.DataFrame]:
+    """
+    Membaca tabel secara bertahap: menghasilkan DataFrame berisi paling banyak
+    `ukuran_chunk` baris, hanya untuk `kolom` yang diminta dan baris yang lolos `filter_baris`
+    (dievaluasi di SQLite, memakai indeks yang dibuat otomatis untuk kolom filter).
+    Koneksi dipinjam dari pool selama iterasi; habiskan atau tutup generator setelah dipakai.
+    Tabel yang tidak ada tidak menghasilkan chunk apa pun.
+    """
+    pool = pool_koneksi()
+    with pool.pinjam() as conn:
+        kolom_ada = _kolom_tabel(conn, table_name)
+    if not kolom_ada:
+        return
+    kolom = list(kolom or kolom_ada)
+    hilang = [c for c in kolom if c not in kolom_ada]
+    if hilang:
+        raise KeyError(f"Kolom tidak ada di tabel: {', '.join(hilang)}")
+    where, params = _klausa_filter(filter_baris or {}, kolom_ada)
+    if filter_baris:
+        _siapkan_indeks_filter(pool, table_name, list(filter_baris))
+    sql = f"SELECT {', '.join(map(_kutip, kolom))} FROM {_kutip(table_name)}{where}"
+    with pool.pinjam() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                baris = cursor.fetchmany(ukuran_chunk)
+                if not baris:
+                    break
+                yield pd.DataFrame.from_records(baris, columns=kolom)
+        finally:
+            cursor.close()
+
 
-def load_dataframe(table_name: str) -> pd.DataFrame:
+def load_dataframe(table_name: str, kolom: Optional[list] = None, filter_baris: Optional[Dict] = None) -> pd.DataFrame:
     """
     Memuat data dari tabel SQLite ke dalam Pandas DataFrame.
+    `kolom` dan `filter_baris` (lihat iter_dataframe) membatasi kolom dan baris yang dibaca,
+    mis. filter_baris={'Klaster': 2, 'age': {'min': 30, 'max': 40}} hanya membaca baris segmen 2.
     """
     if not os.path.exists(DB_FILE):
         return None
 
-    conn = get_db_connection()
     try:
+        with pool_koneksi().pinjam() as conn:
+            kolom_ada = _kolom_tabel(conn, table_name)
         # Cek apakah tabel ada
-        query = f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}';"
-        cursor = conn.cursor()
-        cursor.execute(query)
-        if cursor.fetchone() is None:
+        if not kolom_ada:
             return None
-
-        # Jika ada, muat data
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        print(f"DataFrame berhasil dimuat dari tabel '{table_name}'.")
+        chunks = list(iter_dataframe(table_name, kolom, filter_baris))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=list(kolom or kolom_ada))
+        print(f"DataFrame berhasil dimuat dari tabel '{table_name}' ({len(df):,} baris).")
         return df
     except Exception as e:
         print(f"Gagal memuat DataFrame: {e}")
         return None
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+
+def muat_halaman(table_name: str, halaman: int = 1, ukuran_halaman: int = UKURAN_CHUNK_BACA,
+                 filter_baris: Optional[Dict] = None, db_file: Optional[str] = None) -> pd.DataFrame:
+    """
+    Satu halaman baris (urutan penyimpanan) yang lolos `filter_baris`, dibaca dengan
+    LIMIT/OFFSET lewat indeks kolom filter; dipakai laporan untuk daftar anggota segmen.
+    """
+    pool = pool_koneksi(db_file)
+    with pool.pinjam() as conn:
+        kolom_ada = _kolom_tabel(conn, table_name)
+    if not kolom_ada:
+        raise KeyError(f"Tabel '{table_name}' tidak ada.")
+    where, params = _klausa_filter(filter_baris or {}, kolom_ada)
+    if filter_baris:
+        _siapkan_indeks_filter(pool, table_name, list(filter_baris))
+    with pool.pinjam() as conn:
+        baris = conn.execute(f"SELECT * FROM {_kutip(table_name)}{where} ORDER BY rowid LIMIT ? OFFSET ?",
+                             params + [int(ukuran_halaman), (max(int(halaman), 1) - 1) * int(ukuran_halaman)]).fetchall()
+    return pd.DataFrame.from_records(baris, columns=kolom_ada)
+
+
+# --- Agregasi per klaster di SQLite (ringkasan laporan) ---
+
+# Statistik numerik yang dapat dihitung agregat SQLite dalam satu pemindaian (median tidak)
+STATISTIK_RINGKASAN = ('mean', 'std', 'min', 'max')
+# SQLite membatasi jumlah kolom hasil (default 2000); setiap fitur numerik memakai 6 ekspresi
+KOLOM_NUMERIK_PER_QUERY = 300
+JENIS_RINGKASAN = ('jumlah', 'numerik', 'kategori')
+
+
+def _nama_ringkasan(table_name: str, jenis: str) -> str:
+    return f"ringkasan_{table_name}_{jenis}"
+
+
+def _ringkasan_ada(conn: sqlite3.Connection, table_name: str) -> bool:
+    return bool(_kolom_tabel(conn, _nama_ringkasan(table_name, 'jumlah')))
+
+
+def _kolom_fitur(conn: sqlite3.Connection, table_name: str) -> tuple:
+    """
+    Kolom fitur (tanpa label/identitas) menurut tipe deklarasi: (numerik, kategorikal, boolean).
+    Kolom BOOLEAN termasuk kategorikal, sama seperti ProfilKlaster memperlakukan kolom bool.
+    """
+    numerik, kategorikal, boolean = [], [], []
+    for _, nama, tipe, *_ in conn.execute(f"PRAGMA table_info({_kutip(table_name)})"):
+        if nama in KOLOM_DIABAIKAN:
+            continue
+        (numerik if tipe.upper() in ('INTEGER', 'REAL') else kategorikal).append(nama)
+        if tipe.upper() == 'BOOLEAN':
+            boolean.append(nama)
+    return numerik, kategorikal, boolean
+
+
+def _hitung_ringkasan(conn: sqlite3.Connection, table_name: str) -> Dict[str, pd.DataFrame]:
+    """
+    Menghitung ringkasan per Klaster di SQLite:
+    - jumlah: (Klaster, Jumlah)
+    - numerik: (Klaster, Fitur, Jumlah, mean, std, min, max). Jumlah, mean, min, dan max semua fitur
+      dihitung dalam satu GROUP BY Klaster; std sampel dihitung pada pemindaian kedua dari selisih
+      terhadap mean klasternya (dua pass terkoreksi), bukan AVG(x*x) - AVG(x)^2 yang kehilangan
+      presisi bila mean jauh lebih besar dari std
+    - kategori: (Klaster, Fitur, Kategori, Jumlah) untuk seluruh kategori non-NULL. Tabel dipindai
+      sekali menjadi jumlah per kombinasi (Klaster, semua fitur kategorikal), lalu distribusi
+      setiap fitur dijumlahkan dari kombinasi tersebut (jauh lebih kecil dari tabel). Kategori
+      kolom BOOLEAN ditulis 'True'/'False' seperti pada profil dari DataFrame
+    """
+    numerik, kategorikal, boolean = _kolom_fitur(conn, table_name)
+    tabel = _kutip(table_name)
+    jumlah = pd.DataFrame(conn.execute(f"SELECT Klaster, COUNT(*) FROM {tabel} GROUP BY Klaster").fetchall(),
+                          columns=['Klaster', 'Jumlah'])
+
+    # MATERIALIZED (SQLite >= 3.35) memastikan CTE dihitung sekali
+    materialisasi = 'MATERIALIZED ' if sqlite3.sqlite_version_info >= (3, 35, 0) else ''
+    bagian = []
+    for awal in range(0, len(numerik), KOLOM_NUMERIK_PER_QUERY):
+        kolom = numerik[awal:awal + KOLOM_NUMERIK_PER_QUERY]
+        agregat = ', '.join(f"COUNT({_kutip(c)}) AS n{i}, AVG({_kutip(c)}) AS r{i}, MIN({_kutip(c)}) AS a{i}, "
+                            f"MAX({_kutip(c)}) AS b{i}" for i, c in enumerate(kolom))
+        # Pass kedua: selisih setiap nilai terhadap mean klasternya (hasil GROUP BY pertama)
+        ekspresi = ', '.join(f"m.n{i}, m.r{i}, m.a{i}, m.b{i}, AVG(t.{_kutip(c)} - m.r{i}), "
+                             f"AVG((t.{_kutip(c)} - m.r{i}) * (t.{_kutip(c)} - m.r{i}))" for i, c in enumerate(kolom))
+        sql_numerik = (f"WITH m AS {materialisasi}(SELECT Klaster, {agregat} FROM {tabel} GROUP BY Klaster) "
+                       f"SELECT m.Klaster, {ekspresi} FROM {tabel} AS t JOIN m ON t.Klaster IS m.Klaster "
+                       f"GROUP BY m.Klaster ORDER BY m.Klaster")
+        hasil = np.array(conn.execute(sql_numerik).fetchall(), dtype=np.float64).reshape(-1, 1 + 6 * len(kolom))
+        nilai = hasil[:, 1:].reshape(len(hasil), len(kolom), 6)
+        n, rata, selisih, kuadrat = nilai[:, :, 0], nilai[:, :, 1], nilai[:, :, 4], nilai[:, :, 5]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.maximum(kuadrat - selisih ** 2, 0.0) * n / (n - 1))
+        std[n < 2] = np.nan
+        bagian.append(pd.DataFrame({
+            'Klaster': np.repeat(hasil[:, 0].astype(np.int64), len(kolom)), 'Fitur': np.tile(kolom, len(hasil)),
+            'Jumlah': n.ravel().astype(np.int64), 'mean': rata.ravel(), 'std': std.ravel(),
+            'min': nilai[:, :, 2].ravel(), 'max': nilai[:, :, 3].ravel(),
+        }))
+    kolom_numerik = ['Klaster', 'Fitur', 'Jumlah', *STATISTIK_RINGKASAN]
+    tabel_numerik = pd.concat(bagian, ignore_index=True) if bagian else pd.DataFrame(columns=kolom_numerik)
+
+    baris_kategori = []
+    if kategorikal:
+        daftar = ', '.join(map(_kutip, kategorikal))
+        teks = {c: (f"CASE WHEN {_kutip(c)} THEN 'True' ELSE 'False' END" if c in boolean
+                    else f"CAST({_kutip(c)} AS TEXT)") for c in kategorikal}
+        # Kombinasi dihitung sekali (MATERIALIZED) untuk semua fitur
+        sql_kategori = (f"WITH kombinasi AS {materialisasi}(SELECT Klaster, {daftar}, COUNT(*) AS n FROM {tabel} "
+                        f"GROUP BY Klaster, {daftar}) " + ' UNION ALL '.join(
+                            f"SELECT Klaster, ?, {teks[c]}, SUM(n) FROM kombinasi "
+                            f"WHERE {_kutip(c)} IS NOT NULL GROUP BY Klaster, {_kutip(c)}" for c in kategorikal))
+        baris_kategori = conn.execute(sql_kategori, kategorikal).fetchall()
+    tabel_kategori = pd.DataFrame(baris_kategori, columns=['Klaster', 'Fitur', 'Kategori', 'Jumlah'])
+    return {'jumlah': jumlah, 'numerik': tabel_numerik, 'kategori': tabel_kategori}
+
+
+def _simpan_ringkasan(conn: sqlite3.Connection, table_name: str, ringkasan: Dict[str, pd.DataFrame]):
+    """Menulis ringkasan ke tabel ringkasan_<tabel>_<jenis> (diganti seluruhnya, dalam transaksi pemanggil)."""
+    for jenis in JENIS_RINGKASAN:
+        df, nama = ringkasan[jenis], _nama_ringkasan(table_name, jenis)
+        _siapkan_tabel(conn, df, nama, 'replace', [])
+        conn.executemany(f"INSERT INTO {_kutip(nama)} VALUES ({', '.join('?' * len(df.columns))})",
+                         zip(*(_nilai_kolom(df[c]) for c in df.columns)))
+
+
+def _hapus_ringkasan(conn: sqlite3.Connection, table_name: str):
+    """Menghapus tabel ringkasan yang sudah usang (laporan kembali menghitung langsung dari tabel)."""
+    for jenis in JENIS_RINGKASAN:
+        conn.execute(f"DROP TABLE IF EXISTS {_kutip(_nama_ringkasan(table_name, jenis))}")
+
+
+def perbarui_ringkasan(table_name: str = TABEL_HASIL_SEGMENTASI, db_file: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Menghitung ulang dan mematerialisasi ringkasan per Klaster sebuah tabel. Setelah itu
+    save_dataframe memperbaruinya otomatis pada mode 'replace'; append/upsert tanpa
+    `ringkasan=True` menghapusnya sampai fungsi ini dipanggil lagi.
+    """
+    with pool_koneksi(db_file).transaksi() as conn:
+        if 'Klaster' not in _kolom_tabel(conn, table_name):
+            raise KeyError(f"Tabel '{table_name}' tidak ada atau tidak memiliki kolom 'Klaster'.")
+        _pastikan_indeks(conn, table_name, ['Klaster'])
+        ringkasan = _hitung_ringkasan(conn, table_name)
+        _simpan_ringkasan(conn, table_name, ringkasan)
+    return ringkasan
+
+
+def ringkasan_tersedia(table_name: str = TABEL_HASIL_SEGMENTASI, db_file: Optional[str] = None) -> bool:
+    """True jika ringkasan tabel sudah dimaterialisasi (laporan tidak perlu memindai tabel)."""
+    if not os.path.exists(db_file or DB_FILE):
+        return False
+    with pool_koneksi(db_file).pinjam() as conn:
+        return _ringkasan_ada(conn, table_name)
+
+
+def muat_ringkasan(table_name: str = TABEL_HASIL_SEGMENTASI, db_file: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Ringkasan per Klaster (jumlah, numerik, kategori). Dibaca dari tabel ringkasan bila sudah
+    dimaterialisasi (ukurannya sebanding jumlah klaster x fitur, bukan jumlah nasabah);
+    jika belum, dihitung langsung di SQLite tanpa disimpan.
+    """
+    with pool_koneksi(db_file).pinjam() as conn:
+        if _ringkasan_ada(conn, table_name):
+            return {jenis: pd.read_sql_query(f"SELECT * FROM {_kutip(_nama_ringkasan(table_name, jenis))}", conn)
+                    for jenis in JENIS_RINGKASAN}
+        if 'Klaster' not in _kolom_tabel(conn, table_name):
+            raise KeyError(f"Tabel '{table_name}' tidak ada atau tidak memiliki kolom 'Klaster'.")
+        return _hitung_ringkasan(conn, table_name)
+
+
+# --- Katalog run segmentasi (riwayat hasil, tidak saling menimpa) ---
+
+def _buat_tabel_run(conn: sqlite3.Connection):
+    """
+    run_segmentasi: satu baris per run (metode, parameter & metrik JSON, sidik data).
+    label_run: label per nasabah per run, berkunci (run_id, kunci_nasabah) tanpa rowid
+    sehingga semua label satu run tersimpan berurutan dan dibaca dengan satu range scan.
+    dataset_fitur: matriks fitur per sidik data, disimpan sekali di tabel fitur_<sidik>
+    dengan kolom sesuai hasil transformasi (termasuk kolom one-hot yang dinamis).
+    """
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS run_segmentasi (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dibuat TEXT NOT NULL,
+        metode TEXT NOT NULL,
+        params TEXT,
+        metrik TEXT,
+        sidik_data TEXT,
+        n_baris INTEGER,
+        n_klaster INTEGER,
+        catatan TEXT
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_run_segmentasi_sidik_data ON run_segmentasi (sidik_data)")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS label_run (
+        run_id INTEGER NOT NULL REFERENCES run_segmentasi (run_id) ON DELETE CASCADE,
+        kunci_nasabah NOT NULL,
+        Klaster INTEGER NOT NULL,
+        PRIMARY KEY (run_id, kunci_nasabah)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS dataset_fitur (
+        sidik_data TEXT PRIMARY KEY,
+        nama_tabel TEXT NOT NULL,
+        kolom TEXT NOT NULL,
+        n_baris INTEGER,
+        dibuat TEXT NOT NULL
+    )
+    """)
+
+
+class KatalogRun:
+    """
+    Riwayat run segmentasi di SQLite. Setiap run menyimpan metadata dan label
+    (kunci nasabah -> Klaster); fitur disimpan sekali per sidik data dan dipakai
+    bersama oleh semua run pada data yang sama.
+    """
+    def __init__(self, db_file: Optional[str] = None):
+        self.db_file = db_file
+        with self._pool().transaksi() as conn:
+            _buat_tabel_run(conn)
+
+    def _pool(self) -> PoolKoneksi:
+        return pool_koneksi(self.db_file)
+
+    def simpan_run(self, label, metode: str, params: Optional[Dict] = None, metrik: Optional[Dict] = None,
+                   sidik_data: Optional[str] = None, fitur: Optional[pd.DataFrame] = None,
+                   catatan: Optional[str] = None) -> int:
+        """
+        Menyimpan satu run dan mengembalikan run_id. `label` berupa Series dengan index
+        kunci nasabah (atau array, dengan kunci 0..n-1). `fitur` (opsional) disimpan
+        sekali per `sidik_data` bila belum ada.
+        """
+        label = label if isinstance(label, pd.Series) else pd.Series(np.asarray(label))
+        label = label.sort_index()
+        n_klaster = int(label[label != -1].nunique())
+        with self._pool().transaksi() as conn:
+            run_id = conn.execute(
+                "INSERT INTO run_segmentasi (dibuat, metode, params, metrik, sidik_data, n_baris, n_klaster, catatan) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.strftime('%Y-%m-%d %H:%M:%S'), metode, json.dumps(params or {}, default=str),
+                 json.dumps(metrik or {}, default=str), sidik_data, len(label), n_klaster, catatan)).lastrowid
+            conn.executemany("INSERT INTO label_run (run_id, kunci_nasabah, Klaster) VALUES (?, ?, ?)",
+                             zip([run_id] * len(label), _nilai_kolom(label.index.to_series()), label.astype(np.int64).tolist()))
+        if fitur is not None and sidik_data:
+            self.simpan_fitur(sidik_data, fitur)
+        print(f"Run segmentasi {run_id} disimpan ({len(label):,} label).")
+        return run_id
+
+    def simpan_fitur(self, sidik_data: str, fitur: pd.DataFrame) -> str:
+        """Menyimpan matriks fitur (kolom apa pun) untuk sebuah sidik data jika belum tersimpan."""
+        with self._pool().pinjam() as conn:
+            ada = conn.execute("SELECT nama_tabel FROM dataset_fitur WHERE sidik_data = ?", (sidik_data,)).fetchone()
+        if ada:
+            return ada[0]
+        nama_tabel = f"fitur_{sidik_data[:16]}"
+        data = fitur.reset_index(drop=False).rename(columns={fitur.index.name or 'index': 'kunci_nasabah'})
+        if save_dataframe(data, nama_tabel, db_file=self.db_file) is None:
+            raise RuntimeError(f"Gagal menyimpan fitur ke tabel '{nama_tabel}'.")
+        with self._pool().transaksi() as conn:
+            _pastikan_indeks(conn, nama_tabel, ['kunci_nasabah'])
+            conn.execute("INSERT OR REPLACE INTO dataset_fitur (sidik_data, nama_tabel, kolom, n_baris, dibuat) "
+                         "VALUES (?, ?, ?, ?, ?)", (sidik_data, nama_tabel, json.dumps(list(map(str, fitur.columns))),
+                                                    len(fitur), time.strftime('%Y-%m-%d %H:%M:%S')))
+        return nama_tabel
+
+    def daftar_run(self) -> pd.DataFrame:
+        """Semua run, terbaru lebih dulu (tanpa membaca label)."""
+        with self._pool().pinjam() as conn:
+            return pd.read_sql_query("SELECT run_id, dibuat, metode, n_baris, n_klaster, sidik_data, metrik, params "
+                                     "FROM run_segmentasi ORDER BY run_id DESC", conn)
+
+    def muat_run(self, run_id: int) -> Dict:
+        """Metadata satu run (KeyError jika tidak ada)."""
+        with self._pool().pinjam() as conn:
+            baris = conn.execute("SELECT run_id, dibuat, metode, params, metrik, sidik_data, n_baris, n_klaster, catatan "
+                                 "FROM run_segmentasi WHERE run_id = ?", (int(run_id),)).fetchone()
+        if baris is None:
+            raise KeyError(f"Run {run_id} tidak ditemukan.")
+        meta = dict(zip(['run_id', 'dibuat', 'metode', 'params', 'metrik', 'sidik_data', 'n_baris', 'n_klaster', 'catatan'], baris))
+        meta['params'], meta['metrik'] = json.loads(meta['params'] or '{}'), json.loads(meta['metrik'] or '{}')
+        return meta
+
+    def muat_label(self, run_id: int) -> pd.Series:
+        """Label run sebagai Series (index kunci nasabah, nama 'Klaster') lewat range scan kunci utama."""
+        with self._pool().pinjam() as conn:
+            baris = conn.execute("SELECT kunci_nasabah, Klaster FROM label_run WHERE run_id = ? ORDER BY kunci_nasabah",
+                                 (int(run_id),)).fetchall()
+        if not baris:
+            self.muat_run(run_id)
+        kunci, label = zip(*baris) if baris else ((), ())
+        return pd.Series(np.asarray(label, dtype=np.int64), index=pd.Index(kunci, name='kunci_nasabah'), name='Klaster')
+
+    def muat_fitur(self, sidik_data: str) -> Optional[pd.DataFrame]:
+        """Matriks fitur tersimpan untuk sebuah sidik data (index kunci nasabah), None jika tidak ada."""
+        with self._pool().pinjam() as conn:
+            ada = conn.execute("SELECT nama_tabel FROM dataset_fitur WHERE sidik_data = ?", (sidik_data,)).fetchone()
+            if not ada:
+                return None
+            return pd.read_sql_query(f"SELECT * FROM {_kutip(ada[0])}", conn, index_col='kunci_nasabah')
+
+    def bandingkan_run(self, run_a: int, run_b: int) -> pd.DataFrame:
+        """
+        Tabulasi silang label dua run (baris: Klaster run_a, kolom: Klaster run_b) untuk
+        nasabah yang ada di keduanya; join dihitung di SQLite memakai kunci utama label_run.
+        """
+        with self._pool().pinjam() as conn:
+            tabel = pd.read_sql_query(
+                "SELECT a.Klaster AS klaster_a, b.Klaster AS klaster_b, COUNT(*) AS jumlah "
+                "FROM label_run a JOIN label_run b ON b.run_id = ? AND b.kunci_nasabah = a.kunci_nasabah "
+                "WHERE a.run_id = ? GROUP BY a.Klaster, b.Klaster", conn, params=(int(run_b), int(run_a)))
+        return tabel.pivot(index='klaster_a', columns='klaster_b', values='jumlah').fillna(0).astype(np.int64) \
+            .rename_axis(index=f"Run {run_a}", columns=f"Run {run_b}")
+
+    def hapus_run(self, run_id: int):
+        with self._pool().transaksi() as conn:
+            conn.execute("DELETE FROM label_run WHERE run_id = ?", (int(run_id),))
+            conn.execute("DELETE FROM run_segmentasi WHERE run_id = ?", (int(run_id),))
@@ -1,29 +1,150 @@
+import time
+import tracemalloc
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder
-from typing import Tuple, Optional, List
+from pandas.api.types import union_categoricals
+from typing import Tuple, Optional, List, Dict
+from cache import CacheDataset, kunci_dataset
+from outofcore import ProsesorOutOfCore
+from pipeline import PreprocessingPipeline
+from reduksi import METODE_OTOMATIS, TARGET_VARIANS_DEFAULT, ReduksiDimensi
+from memori import RASIO_KATEGORI_MAKS, downcast_dataframe, tipe_int_terkecil, ukuran_bytes
+
+# Batas ukuran file (MB) di mana mode streaming diaktifkan secara otomatis
+BATAS_STREAMING_MB = 10
+# Jumlah baris per chunk saat membaca CSV secara streaming
+UKURAN_CHUNK_DEFAULT = 100_000
+# Mode perhitungan batas IQR pada clean_data
+MODE_BATAS_SEKUENSIAL = 'Sekuensial (per kolom)'
+MODE_BATAS_ASLI = 'Dari Data Asli'
+
+
+def infer_skema_kompak(chunk: pd.DataFrame) -> Dict[str, str]:
+    """
+    Menentukan skema tipe data hemat memori dari chunk pertama.
+    Kolom teks berulang (job, marital, month, ...) menjadi 'category',
+    kolom integer memakai tipe terkecil, dan kolom desimal menjadi float32.
+    """
+    skema = {}
+    for col in chunk.columns:
+        seri = chunk[col]
+        if pd.api.types.is_bool_dtype(seri):
+            skema[col] = 'bool'
+        elif pd.api.types.is_integer_dtype(seri):
+            skema[col] = tipe_int_terkecil(seri.min(), seri.max()) if len(seri) else 'int64'
+        elif pd.api.types.is_float_dtype(seri):
+            skema[col] = 'float32'
+        elif len(seri) and seri.nunique(dropna=True) / len(seri) <= RASIO_KATEGORI_MAKS:
+            skema[col] = 'category'
+        else:
+            skema[col] = 'object'
+    return skema
+
+
+def _terapkan_skema(chunk: pd.DataFrame, skema: Dict[str, str]) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Menerapkan skema ke sebuah chunk dan memperluas tipe numerik bila perlu
+    (mis. nilai melebihi rentang int8 atau muncul nilai kosong pada kolom integer).
+    Mengembalikan chunk hasil konversi dan daftar catatan validasi.
+    """
+    catatan = []
+    for col, tipe in skema.items():
+        seri = chunk[col]
+        if tipe in ('category', 'object'):
+            chunk[col] = seri.astype(tipe)
+            continue
+        if tipe != 'bool' and not pd.api.types.is_numeric_dtype(seri):
+            # Nilai non-numerik pada kolom numerik diubah menjadi NaN
+            seri_num = pd.to_numeric(seri, errors='coerce')
+            n_invalid = int(seri_num.isna().sum() - seri.isna().sum())
+            if n_invalid:
+                catatan.append(f"{n_invalid} nilai non-numerik pada kolom '{col}' diubah menjadi kosong")
+            seri = seri_num
+        if tipe.startswith('int'):
+            if seri.isna().any():
+                skema[col] = tipe = 'float32' if tipe in ('int8', 'int16') else 'float64'
+                catatan.append(f"kolom '{col}' memiliki nilai kosong, tipe diperluas menjadi {tipe}")
+            elif len(seri):
+                tipe_baru = tipe_int_terkecil(min(seri.min(), np.iinfo(tipe).min), max(seri.max(), np.iinfo(tipe).max))
+                if tipe_baru != tipe:
+                    skema[col] = tipe = tipe_baru
+                    catatan.append(f"rentang kolom '{col}' melebihi skema, tipe diperluas menjadi {tipe}")
+        chunk[col] = seri.astype(tipe)
+    return chunk, catatan
+
+
+def _gabungkan_chunk(chunks: List[pd.DataFrame], skema: Dict[str, str]) -> pd.DataFrame:
+    """Menggabungkan chunk dengan menyatukan kategori agar kolom tetap bertipe 'category'."""
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    kolom = {}
+    for col, tipe in skema.items():
+        if tipe == 'category':
+            kolom[col] = pd.Series(union_categoricals([c[col] for c in chunks]), name=col)
+        else:
+            # astype memastikan chunk awal mengikuti tipe yang mungkin diperluas oleh chunk berikutnya
+            kolom[col] = pd.concat([c[col].astype(tipe) for c in chunks], ignore_index=True)
+    return pd.DataFrame(kolom)
+
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, cache: Optional[CacheDataset] = None, hemat_memori: bool = True):
         self.raw_data = None
         self.processed_data = None
         self.audit_log = []
+        self.cache = cache
+        self.hemat_memori = hemat_memori
+        self.pipeline: Optional[PreprocessingPipeline] = None
+        # Tahap reduksi dimensi opsional; matriks sebelum reduksi disimpan untuk perbandingan kualitas
+        self.reduksi: Optional[ReduksiDimensi] = None
+        self.data_tanpa_reduksi: Optional[pd.DataFrame] = None
 
     def log_step(self, message: str):
         """Menambahkan pesan ke audit log."""
         self.audit_log.append(f"- {message}")
 
-    def load_data(self, uploaded_file) -> Tuple[bool, str]:
-        """Memuat data dari file yang diunggah dan melakukan validasi awal."""
+    def load_data(self, uploaded_file, streaming: Optional[bool] = None,
+                  chunksize: int = UKURAN_CHUNK_DEFAULT) -> Tuple[bool, str]:
+        """
+        Memuat data dari file yang diunggah dan melakukan validasi awal.
+        Jika `streaming` bernilai None, mode streaming aktif otomatis untuk file > 10 MB.
+        """
         try:
             # PD-001-05: Validasi Ukuran File (< 10 MB)
             file_size_mb = uploaded_file.size / (1024 * 1024)
-            if file_size_mb > 10:
+            if streaming is None:
+                streaming = file_size_mb > BATAS_STREAMING_MB
+            if file_size_mb > BATAS_STREAMING_MB and not streaming:
                 self.log_step("PERINGATAN: Ukuran file > 10MB. Performa mungkin menurun.")
 
-            # PD-001-01: Baca file CSV
-            self.raw_data = pd.read_csv(uploaded_file)
-            self.processed_data = self.raw_data.copy()
+            # PD-001-01: Baca file CSV (atau ambil dari cache jika isi file sama)
+            self.raw_data = None
+            if self.cache is not None:
+                kunci = kunci_dataset(uploaded_file, streaming)
+                mulai = time.perf_counter()
+                self.raw_data = self.cache.ambil(kunci)
+                stat = self.cache.statistik()
+                if self.raw_data is not None:
+                    self.log_step(f"Cache dataset HIT: dimuat dalam {time.perf_counter() - mulai:.3f} s "
+                                  f"(hit={stat['hit']}, miss={stat['miss']}).")
+                else:
+                    self.log_step(f"Cache dataset MISS (hit={stat['hit']}, miss={stat['miss']}).")
+
+            if self.raw_data is None:
+                if streaming:
+                    self.raw_data = self._baca_csv_streaming(uploaded_file, chunksize)
+                else:
+                    self.raw_data = pd.read_csv(uploaded_file)
+                    if self.hemat_memori:
+                        ukuran_awal = ukuran_bytes(self.raw_data)
+                        self.raw_data = downcast_dataframe(self.raw_data)
+                        self.log_step(f"Downcast tipe data: {ukuran_awal / (1024 * 1024):.1f} MB -> "
+                                      f"{ukuran_bytes(self.raw_data) / (1024 * 1024):.1f} MB.")
+                if self.cache is not None and not self.raw_data.empty:
+                    self.cache.simpan(kunci, self.raw_data)
+            # Tahap berikutnya selalu membuat frame baru (tidak ada operasi in-place),
+            # sehingga processed_data cukup berbagi buffer dengan raw_data
+            self.processed_data = self.raw_data.copy(deep=False)
 
             # PD-001-03: Validasi CSV Kosong
             if self.processed_data.empty:
@@ -38,45 +159,137 @@ class DataProcessor:
             self.log_step(f"ERROR: Gagal memuat file. Kemungkinan format tidak valid. Detail: {e}")
             return False, "Format tidak valid atau file rusak."
 
-    def clean_data(self, missing_value_method: str, outlier_method: str) -> Tuple[bool, str]:
-        """Membersihkan data berdasarkan metode yang dipilih pengguna."""
+    def _baca_csv_streaming(self, uploaded_file, chunksize: int) -> pd.DataFrame:
+        """
+        Membaca CSV per chunk dengan skema kompak yang ditentukan dari chunk pertama.
+        Setiap chunk divalidasi sebelum digabung; kecepatan (baris/detik) dan
+        puncak memori dicatat di audit log.
+        """
+        sudah_dilacak = tracemalloc.is_tracing()
+        if not sudah_dilacak:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        mulai = time.perf_counter()
+        try:
+            chunks, skema, kolom = [], None, None
+            for i, chunk in enumerate(pd.read_csv(uploaded_file, chunksize=chunksize)):
+                if skema is None:
+                    kolom = chunk.columns.tolist()
+                    skema = infer_skema_kompak(chunk)
+                    self.log_step(f"Skema kompak: {', '.join(f'{k}={v}' for k, v in skema.items())}.")
+                elif chunk.columns.tolist() != kolom:
+                    raise ValueError(f"Kolom chunk {i + 1} tidak sesuai dengan header.")
+                if chunk.empty:
+                    continue
+                chunk, catatan = _terapkan_skema(chunk, skema)
+                for pesan in catatan:
+                    self.log_step(f"Validasi chunk {i + 1}: {pesan}.")
+                chunks.append(chunk)
+
+            if not chunks:
+                return pd.DataFrame(columns=kolom or [])
+            data = _gabungkan_chunk(chunks, skema)
+            durasi = time.perf_counter() - mulai
+            _, puncak = tracemalloc.get_traced_memory()
+        finally:
+            if not sudah_dilacak:
+                tracemalloc.stop()
+
+        kecepatan = len(data) / durasi if durasi > 0 else float('inf')
+        self.log_step(
+            f"Streaming {len(chunks)} chunk: {len(data):,} baris dalam {durasi:.2f} s "
+            f"({kecepatan:,.0f} baris/detik), puncak memori {puncak / (1024 * 1024):.1f} MB, "
+            f"ukuran data {data.memory_usage(deep=True).sum() / (1024 * 1024):.1f} MB."
+        )
+        return data
+
+    def clean_data(self, missing_value_method: str, outlier_method: str,
+                   mode_batas: str = MODE_BATAS_SEKUENSIAL) -> Tuple[bool, str]:
+        """
+        Membersihkan data berdasarkan metode yang dipilih pengguna.
+        Nilai pengisi dan batas IQR dihitung secara tervektorisasi, semua aturan
+        digabung menjadi satu mask boolean, dan hasilnya dimaterialisasi sekali.
+        `mode_batas` menentukan apakah batas IQR tiap kolom dihitung dari data
+        yang tersisa setelah kolom sebelumnya difilter (sekuensial, perilaku lama)
+        atau seluruhnya dari data asli.
+        """
         if self.processed_data is None:
             return False, "Data belum dimuat."
         try:
+            data = self.processed_data
+            mask = np.ones(len(data), dtype=bool)
+            laporan = {}
+
             # PD-002-01: Penanganan Nilai Kosong
             if missing_value_method == 'Hapus Baris':
-                self.processed_data.dropna(inplace=True)
+                mask &= data.notna().all(axis=1).to_numpy()
+                laporan['nilai kosong (hapus baris)'] = int(len(data) - mask.sum())
                 self.log_step("Membersihkan nilai kosong dengan menghapus baris.")
             elif missing_value_method == 'Isi dengan Mean/Modus':
-                for col in self.processed_data.columns:
-                    if self.processed_data[col].dtype == 'object':
-                        # Isi dengan modus untuk kategorikal
-                        self.processed_data[col].fillna(self.processed_data[col].mode()[0], inplace=True)
-                    else:
-                        # Isi dengan mean untuk numerik
-                        self.processed_data[col].fillna(self.processed_data[col].mean(), inplace=True)
+                kolom_kosong = data.columns[data.isna().any()]
+                if len(kolom_kosong):
+                    data = data.fillna(self._nilai_pengisi(data[kolom_kosong]))
                 self.log_step("Membersihkan nilai kosong dengan Mean/Modus.")
 
             # PD-002-02: Penanganan Outlier
             if outlier_method == 'Hapus Outlier (IQR)':
-                numeric_cols = self.processed_data.select_dtypes(include=np.number).columns
-                for col in numeric_cols:
-                    Q1 = self.processed_data[col].quantile(0.25)
-                    Q3 = self.processed_data[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    # Simpan data yang bukan outlier
-                    self.processed_data = self.processed_data[
-                        (self.processed_data[col] >= lower_bound) & (self.processed_data[col] <= upper_bound)
-                    ]
-                self.log_step("Menghapus outlier menggunakan metode IQR.")
+                numeric_cols = data.select_dtypes(include=np.number).columns
+                if len(numeric_cols):
+                    nilai = data[numeric_cols].to_numpy(dtype=np.float64)
+                    gagal = self._mask_outlier_iqr(nilai, mask, mode_batas)
+                    # Atribusikan setiap baris yang dihapus ke kolom pertama yang melanggar batas
+                    gagal_sebelumnya = np.logical_or.accumulate(gagal, axis=1)
+                    gagal_pertama = gagal.copy()
+                    gagal_pertama[:, 1:] &= ~gagal_sebelumnya[:, :-1]
+                    for col, jumlah in zip(numeric_cols, gagal_pertama[mask].sum(axis=0)):
+                        laporan[f"outlier IQR '{col}'"] = int(jumlah)
+                    mask &= ~gagal_sebelumnya[:, -1]
+                self.log_step(f"Menghapus outlier menggunakan metode IQR (batas: {mode_batas}).")
 
+            self.processed_data = data if mask.all() else data.loc[mask]
+            for aturan, jumlah in laporan.items():
+                if jumlah:
+                    self.log_step(f"Aturan {aturan}: {jumlah:,} baris dihapus.")
+            self.log_step(f"Total {len(mask) - int(mask.sum()):,} baris dihapus, {int(mask.sum()):,} baris tersisa.")
             return True, "Data berhasil dibersihkan."
         except Exception as e:
             self.log_step(f"ERROR saat cleaning: {e}")
             return False, f"Gagal membersihkan data: {e}"
 
+    @staticmethod
+    def _nilai_pengisi(data: pd.DataFrame) -> Dict[str, object]:
+        """Menghitung mean untuk kolom numerik dan modus untuk kolom kategorikal sekaligus."""
+        numerik = data.select_dtypes(include=np.number).columns
+        lainnya = data.columns.difference(numerik, sort=False)
+        pengisi = data[numerik].mean().to_dict() if len(numerik) else {}
+        if len(lainnya):
+            modus = data[lainnya].mode(dropna=True)
+            if not modus.empty:
+                pengisi.update(modus.iloc[0].dropna().to_dict())
+        return pengisi
+
+    @staticmethod
+    def _mask_outlier_iqr(nilai: np.ndarray, mask_awal: np.ndarray, mode_batas: str) -> np.ndarray:
+        """
+        Mengembalikan matriks boolean (baris x kolom) yang menandai nilai di luar
+        [Q1 - 1.5*IQR, Q3 + 1.5*IQR]. Nilai kosong dianggap di luar batas,
+        sama seperti perbandingan pada implementasi sebelumnya.
+        """
+        if mode_batas == MODE_BATAS_ASLI:
+            with np.errstate(invalid='ignore'):
+                q1, q3 = np.nanquantile(nilai[mask_awal], [0.25, 0.75], axis=0)
+        else:
+            # Batas kolom ke-j dihitung dari baris yang lolos filter kolom 0..j-1
+            q1, q3 = np.empty(nilai.shape[1]), np.empty(nilai.shape[1])
+            hidup = mask_awal.copy()
+            for j in range(nilai.shape[1]):
+                with np.errstate(invalid='ignore'):
+                    q1[j], q3[j] = np.nanquantile(nilai[hidup, j], [0.25, 0.75])
+                iqr = q3[j] - q1[j]
+                hidup &= (nilai[:, j] >= q1[j] - 1.5 * iqr) & (nilai[:, j] <= q3[j] + 1.5 * iqr)
+        iqr = q3 - q1
+        return ~((nilai >= q1 - 1.5 * iqr) & (nilai <= q3 + 1.5 * iqr))
+
     def select_features(self, selected_features: List[str]) -> Tuple[bool, str]:
         """Memilih fitur sesuai input pengguna."""
         # PD-003: Seluruh fungsionalitas
@@ -90,34 +303,114 @@ class DataProcessor:
         except KeyError:
             return False, "Satu atau lebih fitur yang dipilih tidak valid."
 
-    def transform_data(self, scaler_method: str) -> Tuple[bool, str]:
-        """Melakukan transformasi data (scaling & encoding)."""
+    def proses_out_of_core(self, sumber, selected_features: List[str], missing_value_method: str,
+                           outlier_method: str, scaler_method: str, output_dir: str,
+                           chunksize: int = UKURAN_CHUNK_DEFAULT) -> Tuple[bool, str]:
+        """
+        Menjalankan cleaning, pemilihan fitur, dan transformasi secara out-of-core
+        untuk file yang lebih besar dari RAM. Hasil disimpan di `output_dir` dan
+        `processed_data` menjadi DataFrame yang di-memory-map dari file tersebut;
+        `pipeline` dibangun dari statistik prosesor. Data mentah tidak dimuat, sehingga
+        `raw_data` dikosongkan (None) dan tahap berikutnya memakai data fitur.
+        Batas IQR selalu dihitung dari data asli (mode sekuensial butuh satu pass per kolom).
+        """
+        if not selected_features:
+            return False, "Pilih minimal 1 fitur"
+        try:
+            prosesor = ProsesorOutOfCore(selected_features, missing_value_method, outlier_method,
+                                         scaler_method, chunksize=chunksize)
+            self.processed_data, laporan = prosesor.jalankan(sumber, output_dir)
+            self.pipeline = prosesor.buat_pipeline()
+            self.raw_data = None
+            self.reduksi, self.data_tanpa_reduksi = None, None
+            self.log_step(
+                f"Out-of-core: pass 1 {laporan['waktu_pass1']:.2f} s, pass 2 {laporan['waktu_pass2']:.2f} s, "
+                f"{laporan['baris_ditulis']:,} dari {laporan['baris_dibaca']:,} baris ditulis ke '{output_dir}'."
+            )
+            for col, galat in prosesor.galat_kuantil.items():
+                bawah, atas = prosesor.batas[col]
+                self.log_step(f"Batas IQR aproksimasi '{col}': [{bawah:.4g}, {atas:.4g}], "
+                              f"galat rank kuartil terukur {galat:.4%}.")
+            return True, "Data berhasil diproses secara out-of-core."
+        except Exception as e:
+            self.log_step(f"ERROR saat proses out-of-core: {e}")
+            return False, f"Proses out-of-core gagal: {e}"
+
+    def transform_data(self, scaler_method: str, sparse: bool = False) -> Tuple[bool, str]:
+        """
+        Melakukan transformasi data (scaling & encoding).
+        Parameter hasil fit disimpan di `self.pipeline` agar nasabah baru dapat
+        ditransformasi ke ruang fitur yang sama. Dengan `sparse=True`, blok one-hot
+        disimpan sebagai kolom sparse dan diteruskan ke Segmenter sebagai matriks CSR.
+        """
         # PD-004
         if self.processed_data is None:
             return False, "Tidak ada data untuk ditransformasi."
 
         try:
-            # Pisahkan kolom numerik dan kategorikal
-            numeric_cols = self.processed_data.select_dtypes(include=np.number).columns.tolist()
-            categorical_cols = self.processed_data.select_dtypes(include='object').columns.tolist()
+            # PD-004-03 & PD-002-03: Scaling, PD-004-01: Encoding (One-Hot)
+            pipeline = PreprocessingPipeline().fit(self.processed_data, scaler_method)
+            self.processed_data = pipeline.transform(self.processed_data, sparse=sparse)
+            self.pipeline = pipeline
+            self.reduksi, self.data_tanpa_reduksi = None, None
 
-            # PD-004-03 & PD-002-03: Scaling
             if scaler_method == 'StandardScaler (Z-score)':
-                scaler = StandardScaler()
                 self.log_step("Menerapkan StandardScaler (Z-score).")
             elif scaler_method == 'MinMaxScaler':
-                scaler = MinMaxScaler()
                 self.log_step("Menerapkan MinMaxScaler.")
-
-            if numeric_cols:
-                self.processed_data[numeric_cols] = scaler.fit_transform(self.processed_data[numeric_cols])
-
-            # PD-004-01: Encoding (One-Hot)
-            if categorical_cols:
-                self.processed_data = pd.get_dummies(self.processed_data, columns=categorical_cols, drop_first=True)
+            if pipeline.kolom_kategorikal:
                 self.log_step("Menerapkan One-Hot Encoding pada fitur kategorikal.")
+            if sparse:
+                self._log_memori_sparse()
 
             return True, "Data berhasil ditransformasi dan siap untuk segmentasi."
         except Exception as e:
             self.log_step(f"ERROR saat transformasi: {e}")
-            return False, f"Transformasi gagal, pastikan tidak ada kolom kosong. Detail: {e}"
\ No newline at end of file
+            return False, f"Transformasi gagal, pastikan tidak ada kolom kosong. Detail: {e}"
+
+    def reduksi_dimensi(self, metode: str = METODE_OTOMATIS, n_komponen: Optional[int] = None,
+                        target_varians: float = TARGET_VARIANS_DEFAULT) -> Tuple[bool, str]:
+        """
+        Mereduksi data hasil transformasi (PCA untuk data dense, TruncatedSVD untuk data
+        sparse) dan menambahkan proyeksinya ke pipeline agar nasabah baru ikut direduksi.
+        Dapat dipanggil ulang dengan pengaturan lain; reduksi selalu dihitung dari data sebelum reduksi.
+        Data dengan kurang dari 2 fitur tidak dapat direduksi; tahap ini dilewati.
+        """
+        if self.pipeline is None or self.processed_data is None:
+            return False, "Data belum ditransformasi."
+        try:
+            data = self.data_tanpa_reduksi if self.data_tanpa_reduksi is not None else self.processed_data
+            if data.shape[1] < 2:
+                pesan = f"Reduksi dimensi dilewati: data hanya memiliki {data.shape[1]} fitur."
+                self.log_step(pesan)
+                return True, pesan
+            reduksi = ReduksiDimensi(metode, n_komponen, target_varians).fit(data)
+            kolom = self.pipeline.atur_reduksi(reduksi.metode_terpakai, reduksi.komponen, reduksi.rata_rata)
+            self.processed_data = pd.DataFrame(reduksi.transform(data), index=data.index, columns=kolom)
+            self.data_tanpa_reduksi, self.reduksi = data, reduksi
+            self.log_step(f"Reduksi dimensi {reduksi.metode_terpakai}: {data.shape[1]} -> {len(kolom)} dimensi "
+                          f"(varians terjelaskan {reduksi.rasio_varians.sum():.1%}).")
+            return True, f"Dimensi direduksi dari {data.shape[1]} menjadi {len(kolom)}."
+        except Exception as e:
+            self.log_step(f"ERROR saat reduksi dimensi: {e}")
+            return False, f"Reduksi dimensi gagal: {e}"
+
+    def _log_memori_sparse(self):
+        """Mencatat penghematan memori layout sparse dibandingkan layout dense."""
+        n_baris, n_kolom = self.processed_data.shape
+        # Hanya dummy one-hot yang sparse; kolom numerik dan boolean (int8) tetap dense
+        kolom_sparse = [col for col, tipe in self.processed_data.dtypes.items() if isinstance(tipe, pd.SparseDtype)]
+        n_dense = n_kolom - len(kolom_sparse)
+        nnz = n_baris * n_dense + sum(self.processed_data[col].sparse.npoints for col in kolom_sparse)
+        # DataFrame: dense = float64 + dummy bool, sparse = ukuran aktual
+        frame_dense = n_baris * (n_dense * 8 + len(kolom_sparse))
+        frame_sparse = int(self.processed_data.memory_usage(index=False).sum())
+        # Matriks yang diterima scikit-learn: float64 dense vs CSR (data float64 + indeks int32)
+        matriks_dense = n_baris * n_kolom * 8
+        matriks_sparse = nnz * (8 + 4) + (n_baris + 1) * 4
+        mb = 1024 * 1024
+        self.log_step(
+            f"Layout sparse: DataFrame {frame_sparse / mb:.1f} MB vs dense {frame_dense / mb:.1f} MB; "
+            f"matriks fitur {matriks_sparse / mb:.1f} MB vs dense {matriks_dense / mb:.1f} MB "
+            f"(hemat {1 - matriks_sparse / max(matriks_dense, 1):.0%})."
+        )
@@ -0,0 +1,149 @@
+# File: evaluasi.py
+# Deskripsi: Tahap evaluasi kualitas klaster yang dapat dikonfigurasi.
+# Silhouette (O(n^2)) dihitung pada sampel terstratifikasi di atas ambang jumlah
+# baris, lengkap dengan interval kepercayaan; metrik murah (Calinski-Harabasz,
+# Davies-Bouldin, inersia) dihitung dari satu pass statistik pusat klaster.
+# Waktu komputasi setiap metrik dicatat.
+
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.metrics import silhouette_samples, silhouette_score
+from typing import Dict, Optional, Sequence
+
+# Di atas jumlah baris ini silhouette otomatis dihitung pada sampel
+BATAS_SAMPEL_SILHOUETTE = 20_000
+UKURAN_SAMPEL_SILHOUETTE = 10_000
+METRIK_DEFAULT = ('silhouette', 'calinski_harabasz', 'davies_bouldin', 'inersia')
+# Nilai z untuk interval kepercayaan 95%
+Z_95 = 1.96
+# Jumlah baris per blok saat statistik pusat dihitung dari matriks dense
+UKURAN_BLOK_EVALUASI = 100_000
+
+
+def sampel_terstratifikasi(label: np.ndarray, ukuran: int, seed: int = 42) -> np.ndarray:
+    """
+    Mengambil indeks sampel dengan alokasi proporsional per klaster (minimal 2
+    anggota per klaster bila tersedia) sehingga klaster kecil tetap terwakili.
+    """
+    rng = np.random.default_rng(seed)
+    klaster, jumlah = np.unique(label, return_counts=True)
+    alokasi = np.maximum(np.round(jumlah / len(label) * ukuran).astype(int), np.minimum(jumlah, 2))
+    alokasi = np.minimum(alokasi, jumlah)
+    urutan = np.argsort(label, kind='stable')
+    awal = np.concatenate([[0], np.cumsum(jumlah)[:-1]])
+    indeks = [rng.choice(urutan[a:a + n], size=m, replace=False) for a, n, m in zip(awal, jumlah, alokasi)]
+    return np.sort(np.concatenate(indeks))
+
+
+def _blok_baris(X, ukuran: int = UKURAN_BLOK_EVALUASI):
+    """Potongan baris matriks dense (DataFrame, array, atau memmap) sebagai array float64."""
+    for mulai in range(0, X.shape[0], ukuran):
+        blok = X.iloc[mulai:mulai + ukuran] if isinstance(X, pd.DataFrame) else X[mulai:mulai + ukuran]
+        yield mulai, np.asarray(blok, dtype=np.float64)
+
+
+def _statistik_pusat(X, label: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Menghitung pusat klaster, jumlah anggota, dan jarak setiap baris ke pusatnya
+    (mendukung matriks dense maupun sparse). Matriks dense dibaca per blok baris
+    sehingga data memmap (out-of-core) tidak pernah disalin utuh ke memori.
+    """
+    klaster, kode = np.unique(label, return_inverse=True)
+    n, k = len(label), len(klaster)
+    indikator = sp.csr_matrix((np.ones(n), (np.arange(n), kode)), shape=(n, k))
+    jumlah = np.asarray(indikator.sum(axis=0)).ravel()
+    if sp.issparse(X):
+        jumlah_fitur = indikator.T @ X
+        pusat = jumlah_fitur.toarray() / jumlah[:, None]
+        norma_x = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        # Hasil kali titik per baris dengan pusat klasternya sendiri (tanpa matriks n x k)
+        x_dot_c = np.asarray(X.multiply(pusat[kode]).sum(axis=1)).ravel()
+    else:
+        jumlah_fitur = np.zeros((k, X.shape[1]))
+        norma_x, x_dot_c = np.empty(n), np.empty(n)
+        for mulai, blok in _blok_baris(X):
+            jumlah_fitur += indikator[mulai:mulai + len(blok)].T @ blok
+            norma_x[mulai:mulai + len(blok)] = np.einsum('ij,ij->i', blok, blok)
+        pusat = jumlah_fitur / jumlah[:, None]
+        for mulai, blok in _blok_baris(X):
+            x_dot_c[mulai:mulai + len(blok)] = np.einsum('ij,ij->i', blok, pusat[kode[mulai:mulai + len(blok)]])
+    norma_pusat = np.einsum('ij,ij->i', pusat, pusat)
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, hanya untuk pusat klaster baris tersebut
+    jarak_kuadrat = np.maximum(norma_x - 2 * x_dot_c + norma_pusat[kode], 0.0)
+    return {'kode': kode, 'jumlah': jumlah, 'pusat': pusat, 'jarak_kuadrat': jarak_kuadrat,
+            'mean_global': np.asarray(jumlah_fitur.sum(axis=0)).ravel() / n}
+
+
+def evaluasi_klaster(X, label: np.ndarray, metrik: Sequence[str] = METRIK_DEFAULT,
+                     batas_sampel: int = BATAS_SAMPEL_SILHOUETTE, ukuran_sampel: int = UKURAN_SAMPEL_SILHOUETTE,
+                     seed: int = 42) -> pd.DataFrame:
+    """
+    Mengevaluasi hasil klaster dan mengembalikan tabel dengan kolom
+    Metrik, Nilai, CI Bawah, CI Atas, Waktu (s), dan Keterangan.
+    Label -1 (noise DBSCAN) diperlakukan sebagai satu kelompok, sama seperti
+    pemanggilan silhouette_score sebelumnya.
+    """
+    kolom = ['Metrik', 'Nilai', 'CI Bawah', 'CI Atas', 'Waktu (s)', 'Keterangan']
+    label = np.asarray(label)
+    n = len(label)
+    baris = []
+    if len(np.unique(label)) < 2:
+        return pd.DataFrame([{'Metrik': m, 'Nilai': None, 'CI Bawah': None, 'CI Atas': None, 'Waktu (s)': 0.0,
+                              'Keterangan': 'Butuh minimal 2 klaster'} for m in metrik], columns=kolom)
+
+    if 'silhouette' in metrik:
+        mulai = time.perf_counter()
+        if n > batas_sampel:
+            indeks = sampel_terstratifikasi(label, ukuran_sampel, seed)
+            X_sampel = X[indeks] if not isinstance(X, pd.DataFrame) else X.iloc[indeks]
+            nilai_sampel = silhouette_samples(X_sampel, label[indeks])
+            rata, galat = nilai_sampel.mean(), Z_95 * nilai_sampel.std(ddof=1) / np.sqrt(len(indeks))
+            baris.append({'Metrik': 'Silhouette', 'Nilai': rata, 'CI Bawah': rata - galat, 'CI Atas': rata + galat,
+                          'Keterangan': f"Sampel terstratifikasi {len(indeks):,} dari {n:,} baris (seed={seed})"})
+        else:
+            skor = silhouette_score(X, label)
+            baris.append({'Metrik': 'Silhouette', 'Nilai': skor, 'CI Bawah': None, 'CI Atas': None,
+                          'Keterangan': f"Eksak ({n:,} baris)"})
+        baris[-1]['Waktu (s)'] = time.perf_counter() - mulai
+
+    metrik_pusat = [m for m in metrik if m in ('calinski_harabasz', 'davies_bouldin', 'inersia')]
+    if metrik_pusat:
+        mulai = time.perf_counter()
+        stat = _statistik_pusat(X, label)
+        waktu_pusat = time.perf_counter() - mulai
+        baris.append({'Metrik': 'Statistik pusat klaster', 'Nilai': None, 'CI Bawah': None, 'CI Atas': None,
+                      'Waktu (s)': waktu_pusat, 'Keterangan': 'Pass bersama untuk metrik di bawah'})
+        k = len(stat['jumlah'])
+        wcss = float(stat['jarak_kuadrat'].sum())
+
+        if 'inersia' in metrik:
+            baris.append({'Metrik': 'Inersia (WCSS)', 'Nilai': wcss, 'Waktu (s)': 0.0,
+                          'Keterangan': 'Jumlah kuadrat jarak ke pusat klaster'})
+        if 'calinski_harabasz' in metrik:
+            mulai = time.perf_counter()
+            bcss = float((stat['jumlah'] * ((stat['pusat'] - stat['mean_global']) ** 2).sum(axis=1)).sum())
+            ch = 1.0 if wcss == 0 else bcss * (n - k) / (wcss * (k - 1))
+            baris.append({'Metrik': 'Calinski-Harabasz', 'Nilai': ch, 'Waktu (s)': time.perf_counter() - mulai,
+                          'Keterangan': 'Lebih tinggi lebih baik'})
+        if 'davies_bouldin' in metrik:
+            mulai = time.perf_counter()
+            sebaran = np.bincount(stat['kode'], weights=np.sqrt(stat['jarak_kuadrat']), minlength=k) / stat['jumlah']
+            pusat = stat['pusat']
+            jarak_pusat = np.sqrt(np.maximum(
+                (pusat ** 2).sum(axis=1)[:, None] - 2 * pusat @ pusat.T + (pusat ** 2).sum(axis=1)[None, :], 0.0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rasio = (sebaran[:, None] + sebaran[None, :]) / jarak_pusat
+            rasio[~np.isfinite(rasio)] = 0.0
+            np.fill_diagonal(rasio, 0.0)
+            baris.append({'Metrik': 'Davies-Bouldin', 'Nilai': float(rasio.max(axis=1).mean()),
+                          'Waktu (s)': time.perf_counter() - mulai, 'Keterangan': 'Lebih rendah lebih baik'})
+
+    return pd.DataFrame(baris, columns=kolom)
+
+
+def nilai_metrik(tabel: pd.DataFrame, metrik: str) -> Optional[float]:
+    """Mengambil nilai sebuah metrik dari tabel evaluasi (None jika tidak ada)."""
+    cocok = tabel.loc[tabel['Metrik'] == metrik, 'Nilai']
+    return None if cocok.empty or pd.isna(cocok.iloc[0]) else float(cocok.iloc[0])
@@ -0,0 +1,123 @@
+# File: graf_tetangga.py
+# Deskripsi: Mesin DBSCAN dengan graf tetangga radius yang dibangun sekali per dataset.
+# Graf jarak sparse dihitung pada eps maksimum, lalu dipangkas untuk setiap eps yang
+# lebih kecil dan dipakai ulang untuk min_samples berapa pun, sehingga eksplorasi
+# parameter tidak perlu mengulang pencarian tetangga. Kurva k-jarak membantu memilih eps.
+
+import logging
+import time
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors, sort_graph_by_row_values
+from typing import Optional
+
+from cache import sidik_matriks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jumlah baris sampel untuk kurva k-jarak (kurva diurutkan sehingga sampel sudah representatif)
+UKURAN_SAMPEL_K_JARAK = 10_000
+# Batas perkiraan ukuran graf; di atas ini graf dibangun pada eps yang diminta saja (bukan eps maksimum)
+BATAS_GRAF_MB = 512
+_UKURAN_SAMPEL_ESTIMASI = 1_000
+
+
+class GrafTetangga:
+    """
+    Menyimpan indeks tetangga terdekat dan graf jarak radius (CSR, tiap baris terurut
+    menurut jarak) untuk satu matriks fitur. `jalankan` memangkas graf ke eps yang
+    diminta lalu menjalankan DBSCAN dengan metric='precomputed'; jika eps melebihi
+    eps maksimum, graf dibangun ulang pada eps tersebut.
+    """
+    def __init__(self, X, eps_maks: float = 0.5, eps_minimum: Optional[float] = None, n_jobs: Optional[int] = None):
+        self.X = X
+        self.sidik = sidik_matriks(X)
+        self.n_jobs = n_jobs
+        self.indeks = NearestNeighbors(n_jobs=n_jobs).fit(X)
+        self.eps_maks: Optional[float] = None
+        self.graf: Optional[sp.csr_matrix] = None
+        self.waktu_bangun: Optional[float] = None
+        if eps_minimum is not None and eps_minimum < eps_maks:
+            estimasi = self.estimasi_mb(eps_maks)
+            if estimasi > BATAS_GRAF_MB:
+                logger.warning(f"Perkiraan graf pada eps={eps_maks} sekitar {estimasi:,.0f} MB (> {BATAS_GRAF_MB} MB); "
+                               f"graf dibangun pada eps={eps_minimum}.")
+                eps_maks = eps_minimum
+        self.bangun(eps_maks)
+
+    def cocok(self, X) -> bool:
+        """True jika graf ini dibangun dari matriks dengan isi yang sama."""
+        return X is self.X or sidik_matriks(X) == self.sidik
+
+    def estimasi_mb(self, eps: float, seed: int = 42) -> float:
+        """Memperkirakan ukuran graf (MB) pada eps dari jumlah tetangga sampel baris."""
+        n = self.X.shape[0]
+        indeks = np.sort(np.random.default_rng(seed).choice(n, size=min(_UKURAN_SAMPEL_ESTIMASI, n), replace=False))
+        sampel = self.X.iloc[indeks] if hasattr(self.X, 'iloc') else self.X[indeks]
+        tetangga = self.indeks.radius_neighbors(sampel, radius=eps, return_distance=False)
+        # Per pasangan: jarak float64 + indeks kolom int32
+        return n * np.mean([len(t) for t in tetangga]) * 12 / (1024 * 1024)
+
+    def bangun(self, eps_maks: float):
+        """Membangun graf jarak radius pada `eps_maks` (semua pasangan berjarak <= eps_maks)."""
+        mulai = time.perf_counter()
+        graf = self.indeks.radius_neighbors_graph(self.X, radius=eps_maks, mode='distance', sort_results=True)
+        # Urutan per baris dipastikan agar DBSCAN precomputed tidak mengurutkan ulang
+        self.graf = sort_graph_by_row_values(graf.tocsr(), copy=False, warn_when_not_sorted=False)
+        self.eps_maks = float(eps_maks)
+        self.waktu_bangun = time.perf_counter() - mulai
+        ukuran_mb = (self.graf.data.nbytes + self.graf.indices.nbytes + self.graf.indptr.nbytes) / (1024 * 1024)
+        logger.info(f"Graf tetangga eps={eps_maks} dibangun dalam {self.waktu_bangun:.2f} detik: "
+                    f"{self.graf.nnz:,} pasangan ({self.graf.nnz / self.graf.shape[0]:.1f}/baris, {ukuran_mb:.1f} MB).")
+
+    def graf_eps(self, eps: float) -> sp.csr_matrix:
+        """Mengembalikan subgraf dengan jarak <= eps (tanpa pencarian tetangga ulang)."""
+        if eps > self.eps_maks:
+            logger.info(f"eps={eps} melebihi eps maksimum {self.eps_maks}; graf dibangun ulang.")
+            self.bangun(eps)
+        if eps == self.eps_maks:
+            return self.graf
+        simpan = self.graf.data <= eps
+        baris = np.repeat(np.arange(self.graf.shape[0]), np.diff(self.graf.indptr))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(baris[simpan], minlength=self.graf.shape[0]))])
+        return sp.csr_matrix((self.graf.data[simpan], self.graf.indices[simpan], indptr), shape=self.graf.shape)
+
+    def jalankan(self, eps: float, min_samples: int) -> DBSCAN:
+        """
+        Menjalankan DBSCAN pada graf yang sudah dipangkas. Label identik dengan
+        DBSCAN biasa; `components_` diisi dengan baris fitur asli dari sampel inti
+        (bukan baris graf) agar model dapat dipakai untuk prediksi.
+        """
+        mulai = time.perf_counter()
+        model = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed', n_jobs=self.n_jobs)
+        model.fit(self.graf_eps(eps))
+        model.components_ = self.X[model.core_sample_indices_] if not hasattr(self.X, 'iloc') \
+            else self.X.iloc[model.core_sample_indices_].to_numpy(dtype=np.float64)
+        logger.info(f"DBSCAN dari graf tetangga (eps={eps}, min_samples={min_samples}) "
+                    f"selesai dalam {time.perf_counter() - mulai:.2f} detik.")
+        return model
+
+    def kurva_k_jarak(self, min_samples: int, ukuran_sampel: int = UKURAN_SAMPEL_K_JARAK, seed: int = 42) -> np.ndarray:
+        """
+        Jarak ke tetangga ke-`min_samples` (termasuk titik itu sendiri, sama seperti
+        definisi titik inti DBSCAN) untuk sampel baris, diurutkan menaik.
+        """
+        n = self.X.shape[0]
+        indeks = np.sort(np.random.default_rng(seed).choice(n, size=min(ukuran_sampel, n), replace=False))
+        sampel = self.X.iloc[indeks] if hasattr(self.X, 'iloc') else self.X[indeks]
+        jarak, _ = self.indeks.kneighbors(sampel, n_neighbors=min(min_samples, n))
+        return np.sort(jarak[:, -1])
+
+    def sarankan_eps(self, min_samples: int, kurva: Optional[np.ndarray] = None) -> float:
+        """
+        Menyarankan eps pada 'lutut' kurva k-jarak: titik dengan jarak terjauh dari
+        garis lurus antara ujung-ujung kurva (setelah kedua sumbu dinormalisasi).
+        """
+        kurva = self.kurva_k_jarak(min_samples) if kurva is None else kurva
+        if len(kurva) < 3 or kurva[-1] == kurva[0]:
+            return float(kurva[-1])
+        x = np.linspace(0.0, 1.0, len(kurva))
+        y = (kurva - kurva[0]) / (kurva[-1] - kurva[0])
+        return float(kurva[np.argmax(x - y)])
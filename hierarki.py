@@ -0,0 +1,216 @@
+# File: hierarki.py
+# Deskripsi: Segmentasi hierarkis dengan bisecting K-Means. Klaster dengan SSE
+# terbesar dibelah dua berulang kali hingga jumlah daun yang diminta, dan urutan
+# pembelahan dicatat sebagai pohon segmen. Label untuk k berapa pun (hingga ukuran
+# pohon) dibaca langsung dari pohon tanpa fit ulang, dan relasi induk -> anak
+# dapat dipakai laporan untuk menggabungkan (roll-up) segmen kecil ke segmen induk.
+
+import heapq
+import logging
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jumlah inisialisasi K-Means (k=2) pada setiap pembelahan
+N_INIT_BELAH = 3
+
+
+def turunkan_pohon(X, belah: np.ndarray, pusat_node: np.ndarray) -> np.ndarray:
+    """
+    Menurunkan setiap baris X dari akar mengikuti pembelahan: pada setiap baris
+    `belah` (induk, kiri, kanan), baris di node induk pindah ke anak dengan pusat
+    terdekat. Mengembalikan id node akhir per baris.
+    """
+    X = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else X
+    node = np.zeros(X.shape[0], dtype=np.int64)
+    for induk, kiri, kanan in belah:
+        baris = np.flatnonzero(node == induk)
+        if len(baris) == 0:
+            continue
+        pusat = pusat_node[[kiri, kanan]]
+        # argmin ||x - c||^2 = argmin (||c||^2 - 2 x.c)
+        skor = (pusat ** 2).sum(axis=1) - 2 * np.asarray(X[baris] @ pusat.T)
+        node[baris] = np.where(skor[:, 0] <= skor[:, 1], kiri, kanan)
+    return node
+
+
+class PohonSegmen:
+    """
+    Pohon hasil bisecting K-Means. Node 0 adalah akar (semua baris); pembelahan
+    ke-s (mulai 1) membuat dua node anak. Pada tingkat k, segmen aktif adalah node
+    yang sudah dibuat dalam k-1 pembelahan pertama dan belum dibelah.
+    Setelah fit, `k_aktif` menentukan `cluster_centers_`, `labels_`, dan `predict`
+    sehingga objek ini dapat dipakai seperti model K-Means biasa.
+    """
+    def __init__(self, k_maks: int, random_state: int = 42, n_init: int = N_INIT_BELAH):
+        if k_maks < 2:
+            raise ValueError("Ukuran pohon harus >= 2.")
+        self.k_maks = k_maks
+        self.random_state = random_state
+        self.n_init = n_init
+        # Atribut per node
+        self.induk: List[int] = []
+        self.anak: List[Optional[tuple]] = []
+        self.pusat: List[np.ndarray] = []
+        self.ukuran: List[int] = []
+        self.sse: List[float] = []
+        self.dibuat_pada: List[int] = []
+        self.dibelah_pada: List[float] = []
+        # Node yang dibelah pada pembelahan ke-s ada di urutan_belah[s - 1]
+        self.urutan_belah: List[int] = []
+        self.label_daun: Optional[np.ndarray] = None
+        self.k_aktif: Optional[int] = None
+        self.waktu_fit: Optional[float] = None
+
+    def _tambah_node(self, induk: int, pusat: np.ndarray, ukuran: int, sse: float, langkah: int) -> int:
+        self.induk.append(induk)
+        self.anak.append(None)
+        self.pusat.append(pusat)
+        self.ukuran.append(ukuran)
+        self.sse.append(sse)
+        self.dibuat_pada.append(langkah)
+        self.dibelah_pada.append(np.inf)
+        return len(self.induk) - 1
+
+    @staticmethod
+    def _pusat_dan_sse(X, baris: np.ndarray, norma_x: np.ndarray):
+        pusat = np.asarray(X[baris].mean(axis=0)).ravel()
+        # SSE = sum ||x||^2 - n ||c||^2 (berlaku juga untuk matriks sparse)
+        return pusat, max(float(norma_x[baris].sum() - len(baris) * pusat @ pusat), 0.0)
+
+    def fit(self, X) -> 'PohonSegmen':
+        mulai = time.perf_counter()
+        X = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else X
+        X = X.tocsr() if sp.issparse(X) else np.asarray(X, dtype=np.float64)
+        n = X.shape[0]
+        norma_x = np.asarray(X.multiply(X).sum(axis=1)).ravel() if sp.issparse(X) else np.einsum('ij,ij->i', X, X)
+        label = np.zeros(n, dtype=np.int64)
+        semua = np.arange(n)
+        pusat, sse = self._pusat_dan_sse(X, semua, norma_x)
+        self._tambah_node(-1, pusat, n, sse, 0)
+        anggota = {0: semua}
+        # Heap maksimum menurut SSE: klaster paling tersebar dibelah lebih dulu
+        antrian = [(-sse, 0)]
+        while len(anggota) < self.k_maks and antrian:
+            _, node = heapq.heappop(antrian)
+            baris = anggota[node]
+            if len(baris) < 2 or self.sse[node] == 0.0:
+                continue
+            belah = KMeans(n_clusters=2, n_init=self.n_init, random_state=self.random_state).fit(X[baris])
+            if len(np.unique(belah.labels_)) < 2:
+                continue
+            langkah = len(self.urutan_belah) + 1
+            anak = []
+            for j in (0, 1):
+                baris_anak = baris[belah.labels_ == j]
+                pusat, sse = self._pusat_dan_sse(X, baris_anak, norma_x)
+                id_anak = self._tambah_node(node, pusat, len(baris_anak), sse, langkah)
+                anggota[id_anak] = baris_anak
+                label[baris_anak] = id_anak
+                heapq.heappush(antrian, (-sse, id_anak))
+                anak.append(id_anak)
+            self.anak[node] = tuple(anak)
+            self.dibelah_pada[node] = langkah
+            self.urutan_belah.append(node)
+            del anggota[node]
+
+        self.label_daun = label
+        self.k_aktif = self.ukuran_pohon
+        self.waktu_fit = time.perf_counter() - mulai
+        logger.info(f"Pohon segmen dengan {self.ukuran_pohon} daun dibangun dalam {self.waktu_fit:.2f} detik.")
+        return self
+
+    @property
+    def ukuran_pohon(self) -> int:
+        """Jumlah segmen maksimum yang tersedia (daun pohon)."""
+        return len(self.urutan_belah) + 1
+
+    def _cek_k(self, k: int) -> int:
+        if not 1 <= k <= self.ukuran_pohon:
+            raise ValueError(f"k harus antara 1 dan {self.ukuran_pohon} (ukuran pohon).")
+        return int(k)
+
+    def node_aktif(self, k: int) -> np.ndarray:
+        """Id node yang menjadi segmen pada tingkat k (terurut menurut id node)."""
+        k = self._cek_k(k)
+        dibuat = np.asarray(self.dibuat_pada)
+        dibelah = np.asarray(self.dibelah_pada)
+        return np.flatnonzero((dibuat <= k - 1) & (dibelah > k - 1))
+
+    def peta_node(self, k: int) -> np.ndarray:
+        """Peta setiap node -> label segmen (0..k-1) pada tingkat k; -1 untuk node di atas tingkat k."""
+        aktif = self.node_aktif(k)
+        peta = np.full(len(self.induk), -1, dtype=np.int64)
+        peta[aktif] = np.arange(len(aktif))
+        # Node dibuat berurutan sehingga induk selalu diproses sebelum anaknya
+        for node in range(len(self.induk)):
+            if peta[node] == -1 and self.induk[node] >= 0 and self.dibuat_pada[node] > k - 1:
+                peta[node] = peta[self.induk[node]]
+        return peta
+
+    def label_untuk_k(self, k: int) -> np.ndarray:
+        """Label setiap baris data latih pada tingkat k, tanpa fit ulang."""
+        return self.peta_node(k)[self.label_daun].astype(np.int32)
+
+    def peta_rollup(self, k_halus: int, k_kasar: int) -> Dict[int, int]:
+        """Memetakan label segmen tingkat `k_halus` ke label segmen induknya di tingkat `k_kasar`."""
+        if k_kasar > k_halus:
+            raise ValueError("k_kasar tidak boleh lebih besar dari k_halus.")
+        peta_kasar = self.peta_node(k_kasar)
+        return {int(i): int(peta_kasar[node]) for i, node in enumerate(self.node_aktif(k_halus))}
+
+    def hierarki(self, k: Optional[int] = None) -> pd.DataFrame:
+        """
+        Tabel node pohon hingga tingkat k: id node, induk, urutan pembelahan, ukuran,
+        SSE, dan label segmen pada tingkat k (untuk node yang aktif).
+        """
+        k = self._cek_k(k or self.k_aktif)
+        peta = self.peta_node(k)
+        aktif = set(self.node_aktif(k).tolist())
+        baris = [{'Node': node, 'Induk': self.induk[node] if self.induk[node] >= 0 else None,
+                  'Dibuat Pada Pembelahan': self.dibuat_pada[node],
+                  'Dibelah Pada Pembelahan': self.dibelah_pada[node] if np.isfinite(self.dibelah_pada[node]) and self.dibelah_pada[node] <= k - 1 else None,
+                  'Ukuran': self.ukuran[node], 'SSE': self.sse[node],
+                  'Klaster': int(peta[node]) if node in aktif else None}
+                 for node in range(len(self.induk)) if self.dibuat_pada[node] <= k - 1]
+        return pd.DataFrame(baris).astype({'Induk': 'Int64', 'Dibelah Pada Pembelahan': 'Int64', 'Klaster': 'Int64'})
+
+    def atur_k(self, k: int) -> 'PohonSegmen':
+        """Menentukan tingkat yang dipakai cluster_centers_, labels_, dan predict."""
+        self.k_aktif = self._cek_k(k)
+        return self
+
+    @property
+    def n_clusters(self) -> int:
+        return self.k_aktif
+
+    @property
+    def cluster_centers_(self) -> np.ndarray:
+        return np.vstack([self.pusat[node] for node in self.node_aktif(self.k_aktif)])
+
+    @property
+    def labels_(self) -> np.ndarray:
+        return self.label_untuk_k(self.k_aktif)
+
+    @property
+    def inertia_(self) -> float:
+        return float(sum(self.sse[node] for node in self.node_aktif(self.k_aktif)))
+
+    def tabel_belah(self, k: Optional[int] = None) -> np.ndarray:
+        """Pembelahan hingga tingkat k (default k_aktif) sebagai array (induk, anak kiri, anak kanan)."""
+        k = self._cek_k(k or self.k_aktif)
+        return np.array([(induk, *self.anak[induk]) for induk in self.urutan_belah[:k - 1]], dtype=np.int64).reshape(-1, 3)
+
+    def predict(self, X) -> np.ndarray:
+        """Menurunkan setiap baris dari akar mengikuti pembelahan (pusat anak terdekat) hingga tingkat k_aktif."""
+        node = turunkan_pohon(X, self.tabel_belah(), np.vstack(self.pusat))
+        return self.peta_node(self.k_aktif)[node].astype(np.int32)
+
+    def fit_predict(self, X) -> np.ndarray:
+        return self.fit(X).labels_
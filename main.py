@@ -302,6 +302,7 @@
 # PERBAIKAN: Memperbaiki AttributeError karena kesalahan nama fungsi page_laporan yang sesuai
 
 import streamlit as st
+import os
 import pandas as pd
 import numpy as np
 from typing import Dict
@@ -314,16 +315,34 @@ from sklearn.preprocessing import OneHotEncoder
 # --- Impor Modul Aplikasi ---
 # Anggap semua impor ini sudah benar dan file-nya ada
 from user_management import UserManagement, UserRole
-from dataload import DataProcessor
-from clustering import Segmenter
+from dataload import DataProcessor, MODE_BATAS_SEKUENSIAL, MODE_BATAS_ASLI
+from cache import CacheDataset, CacheSegmentasi
+from memori import laporan_memori
+from reduksi import METODE_OTOMATIS, TARGET_VARIANS_DEFAULT, bandingkan_reduksi
+from clustering import Segmenter, IndeksKlaster, UKURAN_HALAMAN_DEFAULT, AMBANG_DRIFT_DEFAULT, bandingkan_kmeans, ke_matriks_fitur
+from graf_tetangga import GrafTetangga
+from hierarki import PohonSegmen
+from model_segmentasi import ModelSegmentasi, PenyimpananModel
+from database import KatalogRun, TABEL_HASIL_SEGMENTASI, save_dataframe, ringkasan_tersedia, muat_ringkasan, muat_halaman
+from profil import ProfilKlaster
+from evaluasi import BATAS_SAMPEL_SILHOUETTE, UKURAN_SAMPEL_SILHOUETTE, METRIK_DEFAULT
 from visualisasi import VisualisasiData
 from rekomendasi import SistemRekomendasi, RekomendasiIndividual
 
+# Fitur default yang disarankan untuk segmentasi
+RECOMMENDED_CORE_FEATURES = ['age', 'job', 'marital', 'education', 'balance', 'housing', 'loan']
+# Folder keluaran matriks fitur hasil proses out-of-core (di-memory-map saat segmentasi)
+DIR_OUT_OF_CORE = ".data_outofcore"
+
 # --- Inisialisasi State Aplikasi (Tidak ada perubahan) ---
 def initialize_session_state():
     if 'user_mgmt' not in st.session_state: st.session_state.user_mgmt = UserManagement()
     if 'logged_in' not in st.session_state: st.session_state.logged_in = False
-    if 'processor' not in st.session_state: st.session_state.processor = DataProcessor()
+    if 'dataset_cache' not in st.session_state: st.session_state.dataset_cache = CacheDataset()
+    if 'model_store' not in st.session_state: st.session_state.model_store = PenyimpananModel()
+    if 'cache_segmentasi' not in st.session_state: st.session_state.cache_segmentasi = CacheSegmentasi(cache_dir='.cache_segmentasi')
+    if 'katalog_run' not in st.session_state: st.session_state.katalog_run = KatalogRun()
+    if 'processor' not in st.session_state: st.session_state.processor = DataProcessor(cache=st.session_state.dataset_cache)
     if 'processing_step' not in st.session_state: st.session_state.processing_step = '1_upload'
     if 'final_data' not in st.session_state: st.session_state.final_data = None
     if 'clustered_data' not in st.session_state: st.session_state.clustered_data = None
@@ -331,6 +350,37 @@ def initialize_session_state():
     if 'rekomendasi_individual' not in st.session_state: st.session_state.rekomendasi_individual = RekomendasiIndividual()
     if 'last_recommendation' not in st.session_state: st.session_state.last_recommendation = None
 
+def frame_sesi() -> Dict[str, object]:
+    """Mengumpulkan semua frame data yang sedang disimpan di session state."""
+    processor = st.session_state.get('processor')
+    segmenter = st.session_state.get('segmenter_instance')
+    frames = {
+        'processor.raw_data': processor.raw_data if processor else None,
+        'processor.processed_data': processor.processed_data if processor else None,
+        'processor.data_tanpa_reduksi': processor.data_tanpa_reduksi if processor else None,
+        'final_data': st.session_state.get('final_data'),
+        'clustered_data': st.session_state.get('clustered_data'),
+    }
+    if segmenter is not None:
+        frames['segmenter.data_asli'] = segmenter.data_asli
+        if segmenter.matriks_fitur is not segmenter.data_proses:
+            frames['segmenter.matriks_fitur'] = segmenter.matriks_fitur
+    return frames
+
+def data_segmentasi_selaras():
+    """
+    Mengembalikan (data asli, data proses) dengan index yang sama untuk Segmenter,
+    tanpa menyalin frame yang indeksnya sudah sama persis.
+    """
+    raw_data, final_data = st.session_state.processor.raw_data, st.session_state.final_data
+    if raw_data is None:
+        # Proses out-of-core tidak memuat data mentah; hasil segmentasi ditempel ke data fitur
+        return final_data, final_data
+    common_index = raw_data.index.intersection(final_data.index)
+    data_asli_aligned = raw_data if raw_data.index.equals(common_index) else raw_data.loc[common_index]
+    data_proses_aligned = final_data if final_data.index.equals(common_index) else final_data.loc[common_index]
+    return data_asli_aligned, data_proses_aligned
+
 def get_table_download_link(df, filename, text):
     if df is None: return ""
     csv = df.to_csv(index=False).encode('utf-8')
@@ -367,10 +417,20 @@ class MainApplication:
         options = ["Proses Data", "Segmentasi", "Laporan & Rekomendasi Segmen", "Simulasi Rekomendasi", "Manajemen Pengguna"]
 
         choice = st.sidebar.radio("Navigasi", options)
+        with st.sidebar.expander("Laporan Memori"):
+            tabel_memori, total_unik = laporan_memori(frame_sesi())
+            st.dataframe(tabel_memori, hide_index=True)
+            st.caption(f"Total memori unik (buffer bersama dihitung sekali): {total_unik / (1024 * 1024):.2f} MB")
+        with st.sidebar.expander("Cache Segmentasi"):
+            stat = st.session_state.cache_segmentasi.statistik()
+            st.caption(f"Hit: {stat['hit']} (RAM) + {stat['hit_disk']} (disk) | Miss: {stat['miss']}")
+            st.caption(f"Entri: {stat['entri_memori']} di RAM ({stat['ukuran_memori_bytes'] / (1024 * 1024):.2f} MB), {stat['entri_disk']} di disk")
+            if st.button("Kosongkan Cache Segmentasi"):
+                st.session_state.cache_segmentasi.hapus_semua(); st.rerun()
         st.sidebar.markdown("---")
         if st.sidebar.button("Logout"):
             for key in list(st.session_state.keys()):
-                if key != 'user_mgmt': del st.session_state[key]
+                if key not in ('user_mgmt', 'dataset_cache', 'model_store', 'cache_segmentasi', 'katalog_run'): del st.session_state[key]
             initialize_session_state(); st.rerun()
 
         page_map = {
@@ -396,18 +456,47 @@ class MainApplication:
         if st.session_state.processing_step == '1_upload':
             st.subheader("1. Unggah Data")
             uploaded_file = st.file_uploader("Pilih file CSV", type=["csv"])
+            mode_streaming = st.checkbox("Mode streaming (baca per chunk, otomatis aktif untuk file > 10 MB)")
             if uploaded_file and st.button("Proses File"):
-                success, msg = processor.load_data(uploaded_file)
+                success, msg = processor.load_data(uploaded_file, streaming=True if mode_streaming else None)
                 if success: st.success(msg); st.session_state.processing_step = '2_cleaning'; st.rerun()
                 else: st.error(msg)
 
+            with st.expander("Mode out-of-core (file lebih besar dari RAM)"):
+                st.caption("Pembersihan, pemilihan fitur, dan transformasi dijalankan per chunk dalam dua pass; "
+                           "matriks fitur ditulis ke disk dan di-memory-map. Data mentah tidak dimuat ke memori, "
+                           "sehingga laporan segmen menampilkan nilai fitur hasil transformasi.")
+                path_server = st.text_input("Path file CSV di server (opsional, menggantikan file yang diunggah):").strip()
+                sumber = path_server or uploaded_file
+                if path_server and not os.path.isfile(path_server):
+                    st.error(f"File '{path_server}' tidak ditemukan.")
+                elif sumber is not None:
+                    kolom_csv = pd.read_csv(sumber, nrows=0).columns.tolist()
+                    if hasattr(sumber, 'seek'): sumber.seek(0)
+                    fitur_ooc = st.multiselect("Fitur untuk analisis:", options=kolom_csv,
+                                               default=[c for c in RECOMMENDED_CORE_FEATURES if c in kolom_csv], key='fitur_ooc')
+                    col1, col2, col3 = st.columns(3)
+                    missing_ooc = col1.radio("Metode Nilai Kosong:", ['Isi dengan Mean/Modus', 'Hapus Baris'], key='missing_ooc')
+                    outlier_ooc = col2.radio("Metode Outlier:", ['Tidak Ada', 'Hapus Outlier (IQR)'], key='outlier_ooc')
+                    scaler_ooc = col3.radio("Metode Scaling:", ['StandardScaler (Z-score)', 'MinMaxScaler'], key='scaler_ooc')
+                    if st.button("Proses Out-of-Core"):
+                        with st.spinner("Memproses file per chunk..."):
+                            success, msg = processor.proses_out_of_core(sumber, fitur_ooc, missing_ooc, outlier_ooc,
+                                                                        scaler_ooc, DIR_OUT_OF_CORE)
+                        if success:
+                            st.session_state.final_data = processor.processed_data
+                            st.session_state.processing_step = '5_done'
+                            st.rerun()
+                        else: st.error(msg)
+
         elif st.session_state.processing_step == '2_cleaning':
             st.subheader("2. Pembersihan Data"); st.dataframe(processor.raw_data.head())
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
             missing_val = col1.radio("Metode Nilai Kosong:", ['Isi dengan Mean/Modus', 'Hapus Baris'])
             outlier = col2.radio("Metode Outlier:", ['Tidak Ada', 'Hapus Outlier (IQR)'])
+            mode_batas = col3.radio("Batas IQR:", [MODE_BATAS_SEKUENSIAL, MODE_BATAS_ASLI])
             if st.button("Terapkan & Lanjutkan"):
-                success, msg = processor.clean_data(missing_val, outlier)
+                success, msg = processor.clean_data(missing_val, outlier, mode_batas)
                 if success: st.success(msg); st.session_state.processing_step = '3_feature_selection'; st.rerun()
                 else: st.error(msg)
 
@@ -416,7 +505,6 @@ class MainApplication:
             all_cols = processor.processed_data.columns.tolist()
             
             # --- MODIFIKASI: Sarankan fitur default yang direkomendasikan ---
-            RECOMMENDED_CORE_FEATURES = ['age', 'job', 'marital', 'education', 'balance', 'housing', 'loan']
             # Pilih fitur rekomendasi yang ada di dalam kolom data
             default_selection = [col for col in RECOMMENDED_CORE_FEATURES if col in all_cols]
             
@@ -488,9 +576,22 @@ class MainApplication:
             st.markdown("---")
             st.dataframe(processor.processed_data.head()) # Tampilkan data seperti sebelumnya
             scaler = st.radio("Metode Scaling:", ['StandardScaler (Z-score)', 'MinMaxScaler'])
+            gunakan_sparse = st.checkbox("Simpan One-Hot Encoding sebagai matriks sparse (hemat memori)",
+                                         value=total_dimensions > DIMENSION_WARNING_THRESHOLD)
+            gunakan_reduksi = st.checkbox("Reduksi dimensi sebelum segmentasi (PCA / TruncatedSVD)",
+                                          value=total_dimensions > DIMENSION_WARNING_THRESHOLD,
+                                          disabled=total_dimensions < 2, help="Membutuhkan minimal 2 fitur.")
+            if gunakan_reduksi:
+                col1, col2, col3 = st.columns(3)
+                metode_reduksi = col1.radio("Metode Reduksi:", [METODE_OTOMATIS, 'PCA', 'TruncatedSVD'],
+                                            help="Otomatis: TruncatedSVD untuk data sparse, PCA untuk data dense.")
+                target_varians = col2.slider("Target varians terjelaskan:", min_value=0.5, max_value=0.99, value=TARGET_VARIANS_DEFAULT, step=0.01)
+                n_komponen = col3.number_input("Jumlah komponen (0 = ikuti target varians):", min_value=0, max_value=max(total_dimensions - 1, 1), value=0, step=1)
             
             if st.button("Selesaikan Proses"):
-                success, msg = processor.transform_data(scaler)
+                success, msg = processor.transform_data(scaler, sparse=gunakan_sparse)
+                if success and gunakan_reduksi:
+                    success, msg = processor.reduksi_dimensi(metode_reduksi, int(n_komponen) or None, target_varians)
                 if success:
                     st.success(msg)
                     st.session_state.final_data = processor.processed_data
@@ -503,8 +604,27 @@ class MainApplication:
         elif st.session_state.processing_step == '5_done':
             st.header("✅ Proses Data Selesai")
             st.dataframe(st.session_state.final_data.head())
+            if processor.reduksi is not None:
+                with st.expander("Ringkasan Reduksi Dimensi", expanded=True):
+                    reduksi = processor.reduksi
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Metode", reduksi.metode_terpakai)
+                    col2.metric("Dimensi", f"{processor.data_tanpa_reduksi.shape[1]} → {len(reduksi.komponen)}")
+                    col3.metric("Varians Terjelaskan", f"{reduksi.rasio_varians.sum():.1%}")
+                    n_klaster_uji = st.number_input("Jumlah klaster untuk perbandingan:", min_value=2, value=3, step=1)
+                    if st.button("Bandingkan Kualitas vs Tanpa Reduksi"):
+                        with st.spinner("Menjalankan K-Means pada kedua matriks..."):
+                            tabel = bandingkan_reduksi(processor.data_tanpa_reduksi, st.session_state.final_data, int(n_klaster_uji))
+                        st.dataframe(tabel, hide_index=True)
+                        penuh, reduksi_baris = tabel.iloc[0], tabel.iloc[1]
+                        hemat = (penuh['Waktu K-Means (s)'] + penuh['Waktu Silhouette (s)']) - (reduksi_baris['Waktu K-Means (s)'] + reduksi_baris['Waktu Silhouette (s)'])
+                        st.caption(f"Waktu klastering + silhouette yang dihemat: {hemat:.2f} detik. "
+                                   f"Perubahan silhouette (ruang asli): {reduksi_baris['Silhouette (ruang asli)'] - penuh['Silhouette (ruang asli)']:+.4f}.")
+            if processor.pipeline is not None:
+                st.download_button("Unduh Pipeline Praproses (JSON)", data=processor.pipeline.to_json(),
+                                   file_name="pipeline_praproses.json", mime="application/json")
             if st.button("Ulangi Proses"):
-                st.session_state.processor = DataProcessor()
+                st.session_state.processor = DataProcessor(cache=st.session_state.dataset_cache)
                 st.session_state.processing_step = '1_upload'
                 st.session_state.final_data = None
                 st.rerun()
@@ -516,29 +636,146 @@ class MainApplication:
             st.warning("Data belum diproses. Selesaikan di halaman 'Proses Data'."); return
 
         st.subheader("Pengaturan Metode Segmentasi")
-        metode = st.radio("Pilih Metode:", ("K-Means", "DBSCAN"))
+        metode = st.radio("Pilih Metode:", ("K-Means", "K-Means (MiniBatch)", "K-Means (Bisecting)", "DBSCAN"))
 
         params = {}
-        if metode == "K-Means":
+        if metode in ("K-Means", "K-Means (MiniBatch)", "K-Means (Bisecting)"):
             params['n_clusters'] = st.number_input("Jumlah Cluster:", min_value=2, value=3, step=1)
+        if metode == "K-Means (Bisecting)":
+            # Pohon dibangun hingga ukuran ini; jumlah segmen lain dibaca dari pohon tanpa fit ulang
+            params['ukuran_pohon'] = st.number_input("Ukuran pohon segmen (k maksimum):", min_value=2,
+                                                     value=max(int(params['n_clusters']), 20), step=1)
+        if metode == "K-Means (MiniBatch)":
+            col1, col2 = st.columns(2)
+            # Batch lebih kecil dari jumlah klaster tidak dapat menginisialisasi pusat
+            batch_minimum = max(64, int(params['n_clusters']))
+            params['batch_size'] = col1.number_input("Ukuran Batch:", min_value=batch_minimum, value=max(1024, batch_minimum),
+                                                     step=64, help="Minimal sebesar jumlah cluster.")
+            if st.session_state.processor.raw_data is None:
+                # Data out-of-core: matriks fitur di-memory-map, pelatihan dan pelabelan dibaca per chunk dari disk
+                params['streaming'] = col2.checkbox("Latih per chunk dari disk (partial_fit)", value=True)
+            else:
+                col2.caption("Pelatihan per chunk dari disk tersedia untuk data hasil mode out-of-core.")
+        if metode == "DBSCAN":
+            col1, col2, col3 = st.columns(3)
+            params['eps'] = col1.number_input("eps:", min_value=0.01, value=0.5, step=0.05, format="%.3f")
+            params['min_samples'] = col2.number_input("min_samples:", min_value=1, value=5, step=1)
+            # Graf tetangga dibangun sekali pada eps maksimum; eps lebih kecil & min_samples lain memakainya ulang
+            params['eps_maks'] = col3.number_input("eps maksimum (graf tetangga):", min_value=0.01, value=1.0, step=0.1, format="%.3f")
+            if st.button("Tampilkan Kurva k-Jarak"):
+                graf = st.session_state.get('graf_dbscan')
+                matriks = ke_matriks_fitur(st.session_state.final_data)
+                if graf is None or not graf.cocok(matriks):
+                    with st.spinner("Membangun graf tetangga..."):
+                        graf = GrafTetangga(matriks, eps_maks=max(params['eps'], params['eps_maks']), eps_minimum=params['eps'])
+                    st.session_state.graf_dbscan = graf
+                kurva = graf.kurva_k_jarak(int(params['min_samples']))
+                eps_saran = graf.sarankan_eps(int(params['min_samples']), kurva)
+                grafik = VisualisasiData.buat_grafik_k_jarak(kurva, eps_saran)
+                if grafik: st.plotly_chart(grafik, use_container_width=True)
+                st.info(f"eps yang disarankan untuk min_samples={params['min_samples']}: {eps_saran:.3f}")
+
+        with st.expander("Pengaturan Evaluasi Kualitas"):
+            col1, col2 = st.columns(2)
+            params['evaluasi'] = {
+                'batas_sampel': col1.number_input("Silhouette disampel jika baris lebih dari:", min_value=1000, value=BATAS_SAMPEL_SILHOUETTE, step=1000),
+                'ukuran_sampel': col2.number_input("Ukuran sampel silhouette:", min_value=500, value=UKURAN_SAMPEL_SILHOUETTE, step=500),
+                'metrik': st.multiselect("Metrik:", list(METRIK_DEFAULT), default=list(METRIK_DEFAULT)),
+            }
 
         if st.button("Jalankan Segmentasi"):
             # Pastikan data asli dan yg diproses memiliki index yg sama
-            common_index = st.session_state.processor.raw_data.index.intersection(st.session_state.final_data.index)
-            data_asli_aligned = st.session_state.processor.raw_data.loc[common_index]
-            data_proses_aligned = st.session_state.final_data.loc[common_index]
-
-            segmenter = Segmenter(data_asli=data_asli_aligned, data_proses=data_proses_aligned)
+            data_asli_aligned, data_proses_aligned = data_segmentasi_selaras()
+            segmenter = Segmenter(data_asli=data_asli_aligned, data_proses=data_proses_aligned,
+                                  graf_dbscan=st.session_state.get('graf_dbscan'),
+                                  cache_hasil=st.session_state.cache_segmentasi)
             with st.spinner(f"Menjalankan {metode}..."):
                 success, df_result, message, score = segmenter.jalankan_segmentasi(metode, params)
             if success:
                 st.session_state.clustered_data = df_result; st.session_state.segmenter_instance = segmenter
+                if segmenter.graf_dbscan is not None: st.session_state.graf_dbscan = segmenter.graf_dbscan
+                st.session_state.params_segmentasi = (metode, params)
                 st.success(message)
                 if score is not None:
                     st.metric(label="Silhouette Score", value=f"{score:.4f}")
                     if score < 0.3: st.warning("Kualitas segmentasi mungkin kurang optimal (Skor < 0.3).")
+                st.dataframe(segmenter.tabel_evaluasi, hide_index=True)
             else: st.error(f"Gagal: {message}")
 
+        if metode in ("K-Means", "K-Means (MiniBatch)"):
+            with st.expander("Segmentasi Ulang Inkremental (Data Nasabah Bertambah)"):
+                # Acuan: hasil K-Means di sesi ini (dicocokkan lewat index) atau model K-Means tersimpan (baris awal)
+                sumber = {}
+                sebelumnya = st.session_state.get('segmenter_instance')
+                if sebelumnya is not None and hasattr(sebelumnya.model, 'cluster_centers_'):
+                    sumber["Hasil sesi ini"] = sebelumnya
+                daftar_model = st.session_state.model_store.daftar()
+                for id_model in daftar_model.loc[daftar_model['Metode'].str.startswith('K-Means'), 'ID']:
+                    sumber[f"Model tersimpan {id_model}"] = id_model
+                if not sumber:
+                    st.info("Belum ada hasil K-Means sebelumnya sebagai acuan.")
+                else:
+                    pilihan = st.selectbox("Hasil sebelumnya:", list(sumber))
+                    ambang_drift = st.number_input("Ambang drift untuk fit ulang penuh:", min_value=0.01, value=AMBANG_DRIFT_DEFAULT, step=0.05)
+                    if st.button("Jalankan Segmentasi Inkremental"):
+                        acuan = sumber[pilihan]
+                        if isinstance(acuan, str):
+                            model_lama = st.session_state.model_store.muat(acuan)
+                            # Label model dicocokkan lewat kunci baris, bukan posisi (cleaning ulang bisa menggeser baris)
+                            pusat_lama, label_lama = model_lama.pusat, model_lama.label_per_baris()
+                        else:
+                            pusat_lama, label_lama = acuan.model.cluster_centers_, pd.Series(acuan.label_klaster, index=acuan.data_asli.index)
+                        if label_lama is None:
+                            st.error("Model ini disimpan tanpa kunci baris sehingga labelnya tidak dapat dicocokkan dengan data saat ini. Simpan ulang model lalu coba lagi.")
+                        else:
+                            data_asli_aligned, data_proses_aligned = data_segmentasi_selaras()
+                            segmenter = Segmenter(data_asli=data_asli_aligned, data_proses=data_proses_aligned)
+                            with st.spinner("Menjalankan segmentasi inkremental..."):
+                                success, df_result, message, laporan = segmenter.jalankan_inkremental(pusat_lama, label_lama, params, ambang_drift)
+                            if success:
+                                st.session_state.clustered_data = df_result; st.session_state.segmenter_instance = segmenter
+                                st.session_state.params_segmentasi = ("K-Means", {**params, 'n_clusters': len(pusat_lama)})
+                                st.success(message)
+                                col1, col2, col3, col4 = st.columns(4)
+                                col1.metric("Mode", laporan['mode'])
+                                col2.metric("Nasabah Baru", f"{laporan['baris_baru']:,}")
+                                col3.metric("Pindah Segmen", f"{laporan['pindah_segmen']:,}", f"{laporan['persen_pindah']:.2%}", delta_color="off")
+                                col4.metric("Drift Maks", f"{laporan['drift_maks']:.3f}")
+                                st.caption(f"{laporan['iterasi']} iterasi K-Means, {laporan['waktu']:.2f} detik. Drift relatif terhadap sebaran RMS klaster:")
+                                st.dataframe(laporan['drift'])
+                            else: st.error(f"Gagal: {message}")
+
+        if metode == "K-Means (MiniBatch)" and st.button("Bandingkan dengan K-Means Penuh"):
+            with st.spinner("Menjalankan perbandingan..."):
+                st.dataframe(bandingkan_kmeans(st.session_state.final_data, params['n_clusters'], params['batch_size']), hide_index=True)
+
+        with st.expander("Analisis Elbow (Sweep Parameter)"):
+            col1, col2, col3 = st.columns(3)
+            k_min = col1.number_input("k minimum:", min_value=2, value=2, step=1)
+            k_maks = col2.number_input("k maksimum:", min_value=2, value=10, step=1)
+            n_jobs = col3.number_input("Jumlah proses:", min_value=1, value=os.cpu_count() or 1, step=1)
+            sertakan_dbscan = st.checkbox("Sertakan grid DBSCAN")
+            grid_dbscan = []
+            if sertakan_dbscan:
+                col1, col2 = st.columns(2)
+                daftar_eps = col1.text_input("Daftar eps (pisahkan koma):", value="0.3, 0.5, 1.0")
+                daftar_min_samples = col2.text_input("Daftar min_samples (pisahkan koma):", value="5, 10")
+                try:
+                    grid_dbscan = [(float(e), int(m)) for e in daftar_eps.split(',') for m in daftar_min_samples.split(',')]
+                except ValueError:
+                    st.error("Format eps/min_samples tidak valid.")
+            if st.button("Jalankan Sweep"):
+                if k_min > k_maks:
+                    st.error("k minimum tidak boleh lebih besar dari k maksimum.")
+                else:
+                    segmenter = Segmenter(data_asli=st.session_state.final_data, data_proses=st.session_state.final_data)
+                    with st.spinner("Menjalankan sweep parameter..."):
+                        st.session_state.tabel_sweep = segmenter.sweep(range(int(k_min), int(k_maks) + 1), grid_dbscan, n_jobs=int(n_jobs))
+            if st.session_state.get('tabel_sweep') is not None:
+                grafik_elbow = VisualisasiData.buat_grafik_elbow(st.session_state.tabel_sweep)
+                if grafik_elbow: st.plotly_chart(grafik_elbow, use_container_width=True)
+                st.dataframe(st.session_state.tabel_sweep, hide_index=True)
+
         if st.session_state.clustered_data is not None:
             st.subheader("Hasil Segmentasi")
             st.dataframe(st.session_state.clustered_data)
@@ -547,21 +784,83 @@ class MainApplication:
             st.subheader("Lihat Detail Anggota per Segmen")
             segmenter = st.session_state.get('segmenter_instance')
             if segmenter:
-                cluster_ids_choice = [c for c in sorted(st.session_state.clustered_data['Klaster'].unique()) if c != -1]
+                jumlah_klaster = segmenter.jumlah_per_klaster()
+                cluster_ids_choice = [c for c in jumlah_klaster.index if c != -1] if jumlah_klaster is not None else []
                 if cluster_ids_choice:
-                    selected_cluster = st.selectbox("Pilih Klaster:", options=cluster_ids_choice)
-                    detail_df = segmenter.dapatkan_detail_klaster(selected_cluster)
+                    col1, col2 = st.columns(2)
+                    selected_cluster = col1.selectbox("Pilih Klaster:", options=cluster_ids_choice,
+                                                      format_func=lambda c: f"{c} ({jumlah_klaster[c]:,} nasabah)")
+                    total_halaman = segmenter.indeks_klaster.jumlah_halaman(selected_cluster, UKURAN_HALAMAN_DEFAULT)
+                    halaman = col2.number_input(f"Halaman (dari {total_halaman}):", min_value=1, max_value=total_halaman, value=1, step=1)
+                    detail_df = segmenter.dapatkan_detail_klaster(selected_cluster, halaman, UKURAN_HALAMAN_DEFAULT)
                     st.dataframe(detail_df)
+                if isinstance(segmenter.model, PohonSegmen):
+                    with st.expander("Pohon Segmen (Bisecting K-Means)"):
+                        pohon = segmenter.model
+                        k_baru = st.number_input(f"Jumlah segmen (maks. {pohon.ukuran_pohon}, tanpa fit ulang):", min_value=2,
+                                                 max_value=pohon.ukuran_pohon, value=pohon.k_aktif, step=1)
+                        if k_baru != pohon.k_aktif and st.button("Terapkan Jumlah Segmen"):
+                            metode_model, params_model = st.session_state.params_segmentasi
+                            success, df_result, message, score = segmenter.baca_k_dari_pohon(int(k_baru), params_model)
+                            if success:
+                                st.session_state.clustered_data = df_result
+                                st.session_state.params_segmentasi = (metode_model, {**params_model, 'n_clusters': int(k_baru)})
+                                st.rerun()
+                            else: st.error(f"Gagal: {message}")
+                        st.caption(f"Pohon {pohon.ukuran_pohon} daun dibangun dalam {pohon.waktu_fit:.2f} detik. Node dengan 'Klaster' terisi adalah segmen saat ini.")
+                        st.dataframe(pohon.hierarki(), hide_index=True)
+                if st.session_state.get('params_segmentasi') and st.button("Simpan Model Segmentasi"):
+                    metode_model, params_model = st.session_state.params_segmentasi
+                    model = ModelSegmentasi.dari_segmenter(segmenter, metode_model, params_model, st.session_state.processor.pipeline)
+                    st.success(f"Model disimpan dengan id: {st.session_state.model_store.simpan(model)}")
+                if st.session_state.get('params_segmentasi') and st.button("Simpan ke Riwayat Run"):
+                    metode_model, params_model = st.session_state.params_segmentasi
+                    evaluasi = segmenter.tabel_evaluasi
+                    metrik = dict(zip(evaluasi['Metrik'], evaluasi['Nilai'])) if evaluasi is not None else {}
+                    # Fitur disimpan sekali per sidik data; run berikutnya pada data yang sama hanya menyimpan label
+                    fitur = segmenter.data_proses if isinstance(segmenter.data_proses, pd.DataFrame) else None
+                    with st.spinner("Menyimpan run ke riwayat..."):
+                        run_id = st.session_state.katalog_run.simpan_run(
+                            pd.Series(segmenter.label_klaster, index=segmenter.data_asli.index), metode_model,
+                            params_model, metrik, segmenter.sidik, fitur)
+                    st.success(f"Run disimpan ke riwayat dengan id: {run_id}")
+
+        with st.expander("Riwayat Run Segmentasi"):
+            daftar_run = st.session_state.katalog_run.daftar_run()
+            if daftar_run.empty:
+                st.info("Belum ada run tersimpan. Jalankan segmentasi lalu klik 'Simpan ke Riwayat Run'.")
+            else:
+                st.dataframe(daftar_run, hide_index=True)
+                if len(daftar_run) >= 2:
+                    col1, col2 = st.columns(2)
+                    run_a = col1.selectbox("Run A:", daftar_run['run_id'].tolist(), index=1)
+                    run_b = col2.selectbox("Run B:", daftar_run['run_id'].tolist(), index=0)
+                    if st.button("Bandingkan Run"):
+                        st.caption("Jumlah nasabah per pasangan segmen (baris: Run A, kolom: Run B).")
+                        st.dataframe(st.session_state.katalog_run.bandingkan_run(run_a, run_b))
 
-    def page_laporan(self):
-        st.title("Laporan Visual & Rekomendasi per Segmen")
-        if st.session_state.clustered_data is None:
-            st.warning("Data belum disegmentasi. Lakukan di halaman 'Segmentasi'."); return
-
-        df_laporan = st.session_state.clustered_data.copy()
-
+        st.markdown("---")
+        st.subheader("Tugaskan Nasabah Baru ke Segmen")
+        daftar_model = st.session_state.model_store.daftar()
+        if daftar_model.empty:
+            st.info("Belum ada model tersimpan. Jalankan segmentasi lalu klik 'Simpan Model Segmentasi'.")
+        else:
+            st.dataframe(daftar_model, hide_index=True)
+            id_model = st.selectbox("Pilih Model:", options=daftar_model['ID'].tolist())
+            file_baru = st.file_uploader("Unggah data nasabah baru (CSV)", type=["csv"], key="file_nasabah_baru")
+            if file_baru is not None and st.button("Tugaskan ke Segmen"):
+                try:
+                    data_baru = pd.read_csv(file_baru)
+                    with st.spinner("Menugaskan nasabah ke segmen..."):
+                        data_baru['Klaster'] = st.session_state.model_store.muat(id_model).prediksi(data_baru)
+                    st.success(f"{len(data_baru):,} nasabah berhasil ditugaskan.")
+                    st.dataframe(data_baru['Klaster'].value_counts().sort_index().rename('Jumlah'))
+                    st.markdown(get_table_download_link(data_baru, "penugasan_segmen.csv", "Unduh Hasil Penugasan (CSV)"), unsafe_allow_html=True)
+                except (KeyError, ValueError) as e:
+                    st.error(f"Gagal menugaskan nasabah: {e}")
+
+    def _tampilkan_visualisasi(self, visualizer: VisualisasiData):
         st.header("Visualisasi Interaktif")
-        visualizer = VisualisasiData(df_laporan)
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Distribusi Segmen")
@@ -569,13 +868,60 @@ class MainApplication:
             if pie_chart: st.plotly_chart(pie_chart, use_container_width=True)
         with col2:
             st.subheader("Analisis Fitur")
-            fitur_numerik = [f for f in df_laporan.select_dtypes(include=np.number).columns if f not in ['Klaster', 'ID']]
-            fitur_pilihan = st.selectbox("Pilih fitur:", options=fitur_numerik)
+            fitur_pilihan = st.selectbox("Pilih fitur:", options=visualizer.profil.fitur_numerik)
             if fitur_pilihan:
                 bar_chart = visualizer.buat_bar_chart(fitur_pilihan)
                 if bar_chart: st.plotly_chart(bar_chart, use_container_width=True)
         st.info("Arahkan mouse ke grafik untuk detail dan gunakan tombol di pojok kanan atas grafik untuk ekspor.")
 
+    def _laporan_tersimpan(self):
+        # Grafik dan profil dibaca dari ringkasan per segmen di SQLite (ukurannya tidak bergantung
+        # jumlah nasabah); tabel nasabah hanya dibaca per halaman anggota lewat indeks Klaster
+        profil = ProfilKlaster.dari_ringkasan(muat_ringkasan(TABEL_HASIL_SEGMENTASI))
+        self._tampilkan_visualisasi(VisualisasiData(profil=profil))
+
+        st.markdown("---")
+        st.header("Rekomendasi Produk per Segmen")
+        kolom_rekomendasi = ['Produk_Rekomendasi', 'Alasan_Rekomendasi']
+        for cluster_id in [c for c in profil.klaster if c != -1]:
+            teratas = profil.kategori_teratas(cluster_id)
+            # Rekomendasi ditentukan per segmen, jadi kategori teratasnya adalah rekomendasi segmen itu
+            produk = teratas.loc[teratas['Fitur'] == 'Produk_Rekomendasi', 'Kategori']
+            alasan = teratas.loc[teratas['Fitur'] == 'Alasan_Rekomendasi', 'Kategori']
+            judul = f"Segmen {cluster_id} ({profil.jumlah[cluster_id]:,} nasabah)"
+            with st.expander(judul + (f" -> Rekomendasi: {produk.iloc[0]}" if len(produk) else "")):
+                if len(alasan): st.markdown(f"**Alasan:** *{alasan.iloc[0]}*")
+                col1, col2 = st.columns(2)
+                col1.caption("Profil fitur numerik"); col1.dataframe(profil.ringkasan_numerik(cluster_id))
+                col2.caption("Kategori teratas")
+                col2.dataframe(teratas[~teratas['Fitur'].isin(kolom_rekomendasi)], hide_index=True)
+                total_halaman = max(1, -(-int(profil.jumlah[cluster_id]) // UKURAN_HALAMAN_DEFAULT))
+                halaman = st.number_input(f"Halaman (dari {total_halaman}):", min_value=1, max_value=total_halaman,
+                                          value=1, step=1, key=f"halaman_tersimpan_{cluster_id}")
+                st.dataframe(muat_halaman(TABEL_HASIL_SEGMENTASI, halaman, UKURAN_HALAMAN_DEFAULT, {'Klaster': cluster_id}))
+
+    def page_laporan(self):
+        st.title("Laporan Visual & Rekomendasi per Segmen")
+        ada_tersimpan = ringkasan_tersedia(TABEL_HASIL_SEGMENTASI)
+        if st.session_state.clustered_data is None and not ada_tersimpan:
+            st.warning("Data belum disegmentasi. Lakukan di halaman 'Segmentasi'."); return
+        if ada_tersimpan:
+            opsi_sumber = (["Hasil segmentasi sesi ini"] if st.session_state.clustered_data is not None else []) + ["Hasil tersimpan di database"]
+            if st.radio("Sumber laporan:", opsi_sumber, horizontal=True) == "Hasil tersimpan di database":
+                self._laporan_tersimpan(); return
+
+        # Salinan dangkal: rekomendasi hanya menambah kolom baru, data nasabah tidak disalin
+        df_laporan = st.session_state.clustered_data.copy(deep=False)
+
+        # Hasil segmenter (indeks klaster & profil, dihitung sekali per segmentasi) dipakai jika barisnya sama
+        segmenter = st.session_state.get('segmenter_instance')
+        if segmenter is not None and (segmenter.label_klaster is None or len(segmenter.label_klaster) != len(df_laporan)):
+            segmenter = None
+
+        visualizer = VisualisasiData(df_laporan, segmenter.profil_klaster() if segmenter is not None else None)
+        profil = visualizer.profil
+        self._tampilkan_visualisasi(visualizer)
+
         st.markdown("---")
         st.header("Rekomendasi Produk per Segmen")
         if 'Produk_Rekomendasi' not in df_laporan.columns:
@@ -583,13 +929,39 @@ class MainApplication:
             success, df_laporan, _ = recommender.buat_rekomendasi()
             if success: st.session_state.clustered_data = df_laporan
             else: st.error("Gagal membuat rekomendasi."); return
-
-        for cluster_id in sorted([c for c in df_laporan['Klaster'].unique() if c != -1]):
-            data_klaster = df_laporan[df_laporan['Klaster'] == cluster_id]
-            info = data_klaster[['Produk_Rekomendasi', 'Alasan_Rekomendasi']].iloc[0]
-            with st.expander(f"Segmen {cluster_id} ({len(data_klaster)} nasabah) -> Rekomendasi: {info['Produk_Rekomendasi']}"):
+        if st.button("Simpan Hasil & Ringkasan ke Database"):
+            # Ringkasan per segmen dimaterialisasi bersama tabel hasil sehingga laporan berikutnya tidak memindai tabel
+            with st.spinner("Menyimpan hasil segmentasi..."):
+                laporan_simpan = save_dataframe(df_laporan, TABEL_HASIL_SEGMENTASI, ringkasan=True)
+            if laporan_simpan:
+                st.success(f"{laporan_simpan['baris']:,} baris disimpan ke tabel '{TABEL_HASIL_SEGMENTASI}' beserta ringkasan per segmen "
+                           f"({laporan_simpan['detik']:.1f} detik).")
+            else: st.error("Gagal menyimpan hasil ke database.")
+
+        # Indeks klaster -> posisi baris dari segmenter (dibangun sekali saat fitting); baris laporan berurutan sama
+        indeks = segmenter.indeks_klaster if segmenter is not None and segmenter.indeks_klaster is not None \
+            else IndeksKlaster(df_laporan['Klaster'].to_numpy())
+        for cluster_id in [c for c in indeks.klaster if c != -1]:
+            info = df_laporan[['Produk_Rekomendasi', 'Alasan_Rekomendasi']].iloc[indeks.posisi(cluster_id)[0]]
+            with st.expander(f"Segmen {cluster_id} ({profil.jumlah[cluster_id]:,} nasabah) -> Rekomendasi: {info['Produk_Rekomendasi']}"):
                 st.markdown(f"**Alasan:** *{info['Alasan_Rekomendasi']}*")
-                st.dataframe(data_klaster)
+                col1, col2 = st.columns(2)
+                col1.caption("Profil fitur numerik"); col1.dataframe(profil.ringkasan_numerik(cluster_id))
+                col2.caption("Kategori teratas"); col2.dataframe(profil.kategori_teratas(cluster_id), hide_index=True)
+                total_halaman = indeks.jumlah_halaman(cluster_id, UKURAN_HALAMAN_DEFAULT)
+                halaman = st.number_input(f"Halaman (dari {total_halaman}):", min_value=1, max_value=total_halaman,
+                                          value=1, step=1, key=f"halaman_laporan_{cluster_id}")
+                st.dataframe(df_laporan.iloc[indeks.halaman(cluster_id, halaman, UKURAN_HALAMAN_DEFAULT)])
+
+        if segmenter is not None and isinstance(segmenter.model, PohonSegmen) and segmenter.model.k_aktif > 2:
+            st.markdown("---")
+            st.header("Rangkuman Segmen Induk")
+            # Segmen hasil bisecting digabung ke leluhurnya pada tingkat yang lebih kasar
+            k_kasar = st.number_input("Gabungkan ke jumlah segmen:", min_value=2, max_value=segmenter.model.k_aktif - 1,
+                                      value=max(2, segmenter.model.k_aktif // 2), step=1)
+            rollup = segmenter.rollup_klaster(k_kasar)
+            st.dataframe(rollup.groupby('Klaster Induk').agg(
+                Segmen=('Klaster', lambda s: ', '.join(map(str, s))), Jumlah=('Jumlah', 'sum')), use_container_width=True)
 
     def page_simulasi_rekomendasi(self):
         st.title("Simulasi Rekomendasi Individual")
@@ -0,0 +1,111 @@
+# File: memori.py
+# Deskripsi: Utilitas optimasi memori: downcasting tipe data ke bentuk yang lebih
+# ringkas dan laporan pemakaian memori per frame yang disimpan di session state.
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, Iterator, Tuple
+
+# Kolom teks dengan rasio nilai unik di bawah batas ini diubah menjadi 'category'
+RASIO_KATEGORI_MAKS = 0.5
+
+
+def tipe_int_terkecil(nilai_min, nilai_maks) -> str:
+    """Mengembalikan tipe integer terkecil yang dapat menampung rentang nilai."""
+    for tipe in ('int8', 'int16', 'int32'):
+        info = np.iinfo(tipe)
+        if info.min <= nilai_min and nilai_maks <= info.max:
+            return tipe
+    return 'int64'
+
+
+def downcast_dataframe(df: pd.DataFrame, rasio_kategori: float = RASIO_KATEGORI_MAKS) -> pd.DataFrame:
+    """
+    Mengubah tipe kolom ke bentuk paling ringkas tanpa kehilangan informasi:
+    integer ke tipe terkecil, float64 ke float32 hanya jika semua nilai tetap sama
+    setelah konversi, dan teks berulang ke 'category'. Kolom yang tidak berubah
+    tidak disalin.
+    """
+    tipe_baru = {}
+    for col in df.columns:
+        seri = df[col]
+        if pd.api.types.is_bool_dtype(seri) or isinstance(seri.dtype, (pd.CategoricalDtype, pd.SparseDtype)):
+            continue
+        if pd.api.types.is_integer_dtype(seri) and isinstance(seri.dtype, np.dtype):
+            if len(seri):
+                tipe = tipe_int_terkecil(seri.min(), seri.max())
+                if np.dtype(tipe).itemsize < seri.dtype.itemsize:
+                    tipe_baru[col] = tipe
+        elif seri.dtype == np.float64:
+            nilai = seri.to_numpy()
+            with np.errstate(over='ignore'):
+                if np.array_equal(nilai.astype(np.float32).astype(np.float64), nilai, equal_nan=True):
+                    tipe_baru[col] = 'float32'
+        elif not pd.api.types.is_numeric_dtype(seri) and len(seri):
+            if seri.nunique(dropna=True) / len(seri) <= rasio_kategori:
+                tipe_baru[col] = 'category'
+    return df.astype(tipe_baru) if tipe_baru else df
+
+
+def _buffer_kolom(seri: pd.Series) -> Iterator[Tuple[int, int]]:
+    """Menghasilkan pasangan (alamat buffer, ukuran bytes) yang menyusun sebuah kolom."""
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        kode = seri.array.codes
+        yield kode.__array_interface__['data'][0], kode.nbytes
+        yield id(seri.cat.categories), int(seri.cat.categories.memory_usage(deep=True))
+    elif isinstance(seri.dtype, np.dtype):
+        nilai = seri.to_numpy()
+        ukuran = int(seri.memory_usage(index=False, deep=True))
+        yield nilai.__array_interface__['data'][0], ukuran
+    else:
+        # Extension array lain (string, sparse, ...): tidak bisa dideteksi berbagi buffer
+        yield id(seri.array), int(seri.memory_usage(index=False, deep=True))
+
+
+def ukuran_bytes(obj) -> int:
+    """Ukuran memori (deep) sebuah DataFrame, matriks sparse, atau array NumPy."""
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if sp.issparse(obj):
+        obj = obj.tocsr() if not hasattr(obj, 'indptr') else obj
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    return 0
+
+
+def laporan_memori(frames: Dict[str, object]) -> Tuple[pd.DataFrame, int]:
+    """
+    Membuat tabel ukuran per frame (baris, kolom, MB) dan menghitung total memori
+    unik: buffer yang dipakai bersama oleh beberapa frame (view) hanya dihitung sekali.
+    """
+    baris, buffer_unik, total_unik = [], set(), 0
+    # Simpan referensi objek sementara agar id()-nya tidak dipakai ulang selama perhitungan
+    referensi = []
+    for nama, obj in frames.items():
+        if obj is None:
+            continue
+        ukuran = ukuran_bytes(obj)
+        baris.append({
+            'Frame': nama,
+            'Baris': obj.shape[0],
+            'Kolom': obj.shape[1] if len(obj.shape) > 1 else 1,
+            'Ukuran (MB)': round(ukuran / (1024 * 1024), 3),
+        })
+        if isinstance(obj, pd.DataFrame):
+            total_unik += int(obj.index.memory_usage(deep=True)) if id(obj.index) not in buffer_unik else 0
+            buffer_unik.add(id(obj.index))
+            for col in obj.columns:
+                seri = obj[col]
+                referensi.append(seri)
+                for alamat, nbytes in _buffer_kolom(seri):
+                    if alamat not in buffer_unik:
+                        buffer_unik.add(alamat)
+                        total_unik += nbytes
+        elif id(obj) not in buffer_unik:
+            buffer_unik.add(id(obj))
+            total_unik += ukuran
+    return pd.DataFrame(baris, columns=['Frame', 'Baris', 'Kolom', 'Ukuran (MB)']), total_unik
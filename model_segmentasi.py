@@ -0,0 +1,258 @@
+# File: model_segmentasi.py
+# Deskripsi: Model segmentasi yang sudah dilatih dan dapat disimpan ke disk, lalu
+# dimuat ulang berdasarkan id untuk menugaskan nasabah baru ke segmen yang ada
+# tanpa melatih ulang. Model disimpan sebagai file NumPy (.npy) + meta.json
+# (berisi pipeline praproses), bukan pickle.
+
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+from typing import Dict, List, Optional
+
+from cache import sidik_matriks
+from clustering import ke_matriks_fitur
+from hierarki import PohonSegmen, turunkan_pohon
+from pipeline import PreprocessingPipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_DIR_DEFAULT = ".model_segmentasi"
+VERSI_FORMAT = 1
+# Jumlah baris per blok saat prediksi (membatasi matriks jarak sementara)
+UKURAN_BLOK_PREDIKSI = 65_536
+
+
+def _ke_matriks(X):
+    """DataFrame fitur (termasuk kolom sparse) atau matriks menjadi array float64 atau CSR."""
+    X = ke_matriks_fitur(X) if isinstance(X, pd.DataFrame) or sp.issparse(X) else X
+    if sp.issparse(X):
+        return X
+    return X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else np.asarray(X, dtype=np.float64)
+
+
+def _kunci_baris(indeks: pd.Index) -> Optional[np.ndarray]:
+    """Index baris sebagai array bilangan bulat atau teks yang dapat disimpan .npy (None jika tidak bisa)."""
+    kunci = indeks.to_numpy()
+    if kunci.dtype.kind in 'iu':
+        return kunci.astype(np.int64)
+    if kunci.dtype.kind == 'U' or (len(kunci) and all(isinstance(v, str) for v in kunci)):
+        return kunci.astype(str)
+    logger.warning(f"Index baris bertipe {indeks.dtype} tidak disimpan; model tidak dapat menjadi acuan inkremental.")
+    return None
+
+
+class ModelSegmentasi:
+    """
+    Representasi ringkas model hasil fit. K-Means (termasuk MiniBatch) disimpan
+    sebagai pusat klaster; DBSCAN sebagai sampel inti beserta labelnya dan eps.
+    Bisecting K-Means juga menyimpan pembelahan pohon (induk, kiri, kanan), pusat
+    setiap node, dan peta node -> klaster.
+    `prediksi` memberi label pada batch baris baru secara tervektorisasi:
+    pusat terdekat untuk K-Means, penurunan pohon untuk Bisecting K-Means, sampel
+    inti terdekat (dalam radius eps, selain itu noise -1) untuk DBSCAN.
+    """
+    def __init__(self, metode: str, params: Dict, label: np.ndarray, kolom_fitur: List[str],
+                 pusat: Optional[np.ndarray] = None, inti: Optional[np.ndarray] = None,
+                 label_inti: Optional[np.ndarray] = None, pipeline: Optional[PreprocessingPipeline] = None,
+                 sidik: Optional[str] = None, metrik: Optional[Dict] = None, belah: Optional[np.ndarray] = None,
+                 pusat_node: Optional[np.ndarray] = None, peta_node: Optional[np.ndarray] = None,
+                 kunci_baris: Optional[np.ndarray] = None):
+        self.id_model: Optional[str] = None
+        self.metode = metode
+        self.params = params
+        self.label = np.asarray(label)
+        # Index baris data latih (sejajar dengan label) untuk mencocokkan label dengan data yang bertambah
+        self.kunci_baris = kunci_baris
+        self.kolom_fitur = kolom_fitur
+        self.pusat = pusat
+        self.inti = inti
+        self.label_inti = label_inti
+        self.belah = belah
+        self.pusat_node = pusat_node
+        self.peta_node = peta_node
+        self.pipeline = pipeline
+        self.sidik = sidik
+        self.metrik = metrik or {}
+        self.dibuat = time.time()
+        self._indeks_inti: Optional[cKDTree] = None
+
+    @classmethod
+    def dari_segmenter(cls, segmenter, metode: str, params: Dict,
+                       pipeline: Optional[PreprocessingPipeline] = None) -> 'ModelSegmentasi':
+        """Membangun model tersimpan dari Segmenter yang sudah menjalankan segmentasi."""
+        if segmenter.model is None or segmenter.label_klaster is None:
+            raise ValueError("Segmentasi belum dijalankan.")
+        kolom_fitur = list(segmenter.data_proses.columns) if isinstance(segmenter.data_proses, pd.DataFrame) else []
+        # Parameter yang tidak dapat diserialisasi (mis. pengaturan evaluasi) tidak ikut disimpan
+        params_simpan = {k: v for k, v in params.items() if isinstance(v, (int, float, str, bool))}
+        metrik = {} if segmenter.tabel_evaluasi is None else {
+            m: float(v) for m, v in zip(segmenter.tabel_evaluasi['Metrik'], segmenter.tabel_evaluasi['Nilai'])
+            if pd.notna(v)}
+        model = cls(metode, params_simpan, segmenter.label_klaster, kolom_fitur, pipeline=pipeline,
+                    sidik=sidik_matriks(segmenter.matriks_fitur), metrik=metrik,
+                    kunci_baris=_kunci_baris(segmenter.data_asli.index))
+        if hasattr(segmenter.model, 'cluster_centers_'):
+            model.pusat = np.asarray(segmenter.model.cluster_centers_, dtype=np.float64)
+            if isinstance(segmenter.model, PohonSegmen):
+                pohon = segmenter.model
+                model.belah, model.pusat_node = pohon.tabel_belah(), np.vstack(pohon.pusat)
+                model.peta_node = pohon.peta_node(pohon.k_aktif)
+        else:
+            inti = segmenter.model.components_
+            model.inti = inti.toarray() if sp.issparse(inti) else np.asarray(inti, dtype=np.float64)
+            model.label_inti = np.asarray(segmenter.label_klaster)[segmenter.model.core_sample_indices_]
+            model.params['eps'] = float(segmenter.model.eps)
+        return model
+
+    def siapkan_fitur(self, batch: pd.DataFrame):
+        """
+        Mengubah batch menjadi matriks fitur. Data mentah ditransformasi dengan
+        pipeline praproses; data yang sudah berupa fitur diurutkan sesuai kolom latih.
+        """
+        if self.pipeline is not None and set(self.pipeline.kolom_input) <= set(batch.columns):
+            batch = self.pipeline.transform(batch)
+        elif self.kolom_fitur:
+            hilang = [c for c in self.kolom_fitur if c not in batch.columns]
+            if hilang:
+                raise KeyError(f"Kolom fitur tidak ditemukan pada batch: {', '.join(hilang)}")
+            batch = batch[self.kolom_fitur]
+        return _ke_matriks(batch)
+
+    def prediksi(self, batch) -> np.ndarray:
+        """Menugaskan setiap baris batch (data mentah, DataFrame fitur, atau matriks) ke klaster yang ada."""
+        X = self.siapkan_fitur(batch) if isinstance(batch, pd.DataFrame) else _ke_matriks(batch)
+        n_fitur = self.pusat.shape[1] if self.pusat is not None else self.inti.shape[1]
+        if X.shape[1] != n_fitur:
+            raise ValueError(f"Jumlah fitur batch ({X.shape[1]}) berbeda dengan model ({n_fitur}).")
+        hasil = np.empty(X.shape[0], dtype=np.int32)
+        if self.belah is not None:
+            for mulai in range(0, X.shape[0], UKURAN_BLOK_PREDIKSI):
+                blok = X[mulai:mulai + UKURAN_BLOK_PREDIKSI]
+                hasil[mulai:mulai + blok.shape[0]] = self.peta_node[turunkan_pohon(blok, self.belah, self.pusat_node)]
+        elif self.pusat is not None:
+            norma_pusat = np.einsum('ij,ij->i', self.pusat, self.pusat)
+            for mulai in range(0, X.shape[0], UKURAN_BLOK_PREDIKSI):
+                blok = X[mulai:mulai + UKURAN_BLOK_PREDIKSI]
+                # argmin ||x - c||^2 = argmin (||c||^2 - 2 x.c); ||x||^2 konstan per baris
+                hasil[mulai:mulai + blok.shape[0]] = np.argmin(norma_pusat - 2 * np.asarray(blok @ self.pusat.T), axis=1)
+        else:
+            if len(self.inti) == 0:
+                hasil[:] = -1
+                return hasil
+            if self._indeks_inti is None:
+                self._indeks_inti = cKDTree(self.inti)
+            # Pencarian dipangkas pada radius eps (inklusif, seperti DBSCAN); tanpa inti dalam radius -> noise
+            batas = np.nextafter(self.params['eps'], np.inf)
+            label_inti = np.append(self.label_inti, -1)
+            for mulai in range(0, X.shape[0], UKURAN_BLOK_PREDIKSI):
+                blok = X[mulai:mulai + UKURAN_BLOK_PREDIKSI]
+                blok = blok.toarray() if sp.issparse(blok) else blok
+                _, indeks = self._indeks_inti.query(blok, k=1, distance_upper_bound=batas)
+                # Indeks == jumlah inti menandakan tidak ada tetangga dalam radius
+                hasil[mulai:mulai + blok.shape[0]] = label_inti[indeks]
+        return hasil
+
+    def label_per_baris(self) -> Optional[pd.Series]:
+        """Label latih berindeks kunci baris, atau None jika model disimpan tanpa kunci baris."""
+        if self.kunci_baris is None:
+            return None
+        return pd.Series(self.label, index=pd.Index(self.kunci_baris))
+
+    def ringkasan(self) -> Dict:
+        klaster, jumlah = np.unique(self.label, return_counts=True)
+        return {
+            'ID': self.id_model, 'Metode': self.metode,
+            'Dibuat': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.dibuat)),
+            'Baris Latih': len(self.label), 'Jumlah Klaster': int((klaster != -1).sum()),
+            'Silhouette': self.metrik.get('Silhouette'), 'Sidik Data': (self.sidik or '')[:12],
+        }
+
+
+class PenyimpananModel:
+    """
+    Menyimpan dan memuat ModelSegmentasi di disk. Setiap model berada di folder
+    `<model_dir>/<id>` berisi meta.json (metode, parameter, pipeline, sidik data,
+    metrik) dan array NumPy (label latih, pusat atau sampel inti, pohon segmen).
+    """
+    def __init__(self, model_dir: str = MODEL_DIR_DEFAULT):
+        self.model_dir = model_dir
+        os.makedirs(self.model_dir, exist_ok=True)
+
+    def _path(self, id_model: str) -> str:
+        return os.path.join(self.model_dir, id_model)
+
+    def simpan(self, model: ModelSegmentasi) -> str:
+        """Menyimpan model secara atomik dan mengembalikan id-nya."""
+        id_model = model.id_model or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        sementara = os.path.join(self.model_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(sementara)
+        try:
+            array = {'label': model.label, 'pusat': model.pusat, 'inti': model.inti, 'label_inti': model.label_inti,
+                     'belah': model.belah, 'pusat_node': model.pusat_node, 'peta_node': model.peta_node,
+                     'kunci_baris': model.kunci_baris}
+            for nama, arr in array.items():
+                if arr is not None:
+                    np.save(os.path.join(sementara, f"{nama}.npy"), arr)
+            model.id_model = id_model
+            meta = {
+                'versi': VERSI_FORMAT, 'id': id_model, 'metode': model.metode, 'params': model.params,
+                'kolom_fitur': model.kolom_fitur, 'sidik': model.sidik, 'metrik': model.metrik,
+                'dibuat': model.dibuat, 'array': [nama for nama, arr in array.items() if arr is not None],
+                'pipeline': model.pipeline.to_dict() if model.pipeline is not None else None,
+                'ringkasan': model.ringkasan(),
+            }
+            with open(os.path.join(sementara, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, default=str)
+            if os.path.exists(self._path(id_model)):
+                shutil.rmtree(self._path(id_model))
+            os.replace(sementara, self._path(id_model))
+        except Exception:
+            shutil.rmtree(sementara, ignore_errors=True)
+            raise
+        logger.info(f"Model segmentasi disimpan dengan id {id_model}.")
+        return id_model
+
+    def muat(self, id_model: str) -> ModelSegmentasi:
+        """Memuat model berdasarkan id (KeyError jika tidak ada)."""
+        path = self._path(id_model)
+        if not os.path.isfile(os.path.join(path, 'meta.json')):
+            raise KeyError(f"Model dengan id '{id_model}' tidak ditemukan.")
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('versi') != VERSI_FORMAT:
+            raise ValueError(f"Versi format model tidak didukung: {meta.get('versi')}")
+        array = {nama: np.load(os.path.join(path, f"{nama}.npy")) for nama in meta['array']}
+        model = ModelSegmentasi(
+            meta['metode'], meta['params'], array['label'], meta['kolom_fitur'],
+            pusat=array.get('pusat'), inti=array.get('inti'), label_inti=array.get('label_inti'),
+            belah=array.get('belah'), pusat_node=array.get('pusat_node'), peta_node=array.get('peta_node'),
+            kunci_baris=array.get('kunci_baris'), pipeline=PreprocessingPipeline.from_dict(meta['pipeline']) if meta['pipeline'] else None,
+            sidik=meta['sidik'], metrik=meta['metrik'])
+        model.id_model, model.dibuat = meta['id'], meta['dibuat']
+        return model
+
+    def daftar(self) -> pd.DataFrame:
+        """Tabel ringkasan semua model tersimpan (hanya membaca meta.json), terbaru lebih dulu."""
+        baris = []
+        for nama in os.listdir(self.model_dir):
+            path_meta = os.path.join(self._path(nama), 'meta.json')
+            if nama.startswith('.') or not os.path.isfile(path_meta):
+                continue
+            try:
+                with open(path_meta, 'r', encoding='utf-8') as f:
+                    baris.append(json.load(f)['ringkasan'])
+            except (KeyError, ValueError, OSError) as e:
+                logger.warning(f"Model {nama} dilewati: {e}")
+        tabel = pd.DataFrame(baris, columns=['ID', 'Metode', 'Dibuat', 'Baris Latih', 'Jumlah Klaster', 'Silhouette', 'Sidik Data'])
+        return tabel.sort_values('Dibuat', ascending=False, ignore_index=True)
+
+    def hapus(self, id_model: str):
+        shutil.rmtree(self._path(id_model), ignore_errors=True)
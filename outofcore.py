@@ -0,0 +1,332 @@
+# File: outofcore.py
+# Deskripsi: Pra-pemrosesan out-of-core untuk dataset yang lebih besar dari RAM.
+# Pass 1 mengumpulkan statistik streaming (mean/varians, min/maks, frekuensi
+# kategori, kuantil aproksimasi dengan sketch KLL). Pass 2 membersihkan,
+# meng-encode, dan menulis hasil per chunk ke disk; scaling diterapkan
+# langsung pada file biner keluaran sehingga memori tetap terbatas.
+
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from pipeline import PreprocessingPipeline
+
+UKURAN_CHUNK_DEFAULT = 100_000
+# Parameter akurasi sketch KLL; galat rank normalisasi kira-kira O(1/k)
+K_SKETCH_DEFAULT = 200
+
+
+class KLLSketch:
+    """
+    Sketch kuantil KLL sederhana. Setiap level menyimpan item berbobot 2^level;
+    level yang melebihi kapasitas dipadatkan dengan mengurutkan lalu mengambil
+    setiap item kedua (offset acak) ke level di atasnya. Memori O(k).
+    """
+    def __init__(self, k: int = K_SKETCH_DEFAULT, seed: int = 42):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _kapasitas(self, level: int) -> int:
+        kedalaman = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** kedalaman)), 2)
+
+    def update(self, nilai: np.ndarray):
+        """Menambahkan sekumpulan nilai (NaN diabaikan)."""
+        nilai = np.asarray(nilai, dtype=np.float64)
+        nilai = nilai[~np.isnan(nilai)]
+        if not len(nilai):
+            return
+        self.n += len(nilai)
+        self.levels[0] = np.concatenate([self.levels[0], nilai])
+        self._padatkan()
+
+    def _padatkan(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._kapasitas(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                item = np.sort(self.levels[level])
+                # Jika jumlah item ganjil, satu item tetap di level ini
+                sisa, item = (item[-1:], item[:-1]) if len(item) % 2 else (np.empty(0), item)
+                naik = item[self._rng.integers(2)::2]
+                self.levels[level] = sisa
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], naik])
+            level += 1
+
+    def kuantil(self, qs, tambahan: Optional[Tuple[float, int]] = None) -> np.ndarray:
+        """
+        Mengembalikan estimasi kuantil. `tambahan` = (nilai, bobot) menyisipkan
+        nilai berulang, mis. nilai kosong yang akan diisi dengan mean.
+        """
+        nilai = np.concatenate(self.levels)
+        bobot = np.concatenate([np.full(len(lv), 2 ** i, dtype=np.float64) for i, lv in enumerate(self.levels)])
+        if tambahan is not None and tambahan[1] > 0:
+            nilai = np.append(nilai, tambahan[0])
+            bobot = np.append(bobot, tambahan[1])
+        if not len(nilai):
+            return np.full(len(np.atleast_1d(qs)), np.nan)
+        urutan = np.argsort(nilai, kind='stable')
+        nilai, kumulatif = nilai[urutan], np.cumsum(bobot[urutan])
+        target = np.atleast_1d(qs) * kumulatif[-1]
+        return nilai[np.minimum(np.searchsorted(kumulatif, target), len(nilai) - 1)]
+
+    def jumlah_item(self) -> int:
+        return int(sum(len(lv) for lv in self.levels))
+
+
+class StatistikStreaming:
+    """Statistik per kolom numerik yang digabung antar chunk (metode Chan/Welford)."""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_kosong = 0
+
+    def update(self, nilai: np.ndarray):
+        nilai = np.asarray(nilai, dtype=np.float64)
+        kosong = np.isnan(nilai)
+        self.n_kosong += int(kosong.sum())
+        nilai = nilai[~kosong]
+        n_b = len(nilai)
+        if not n_b:
+            return
+        mean_b = float(nilai.mean())
+        m2_b = float(((nilai - mean_b) ** 2).sum())
+        delta = mean_b - self.mean
+        total = self.n + n_b
+        self.mean += delta * n_b / total
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / total
+        self.n = total
+        self.min = min(self.min, float(nilai.min()))
+        self.max = max(self.max, float(nilai.max()))
+
+    @property
+    def std(self) -> float:
+        """Simpangan baku populasi (ddof=0), sama seperti StandardScaler."""
+        return float(np.sqrt(self.m2 / self.n)) if self.n else 0.0
+
+
+def _buka_sumber(sumber):
+    """Mengembalikan sumber CSV yang siap dibaca ulang dari awal (path atau file-like)."""
+    if hasattr(sumber, 'seek'):
+        sumber.seek(0)
+    return sumber
+
+
+def _iter_chunk(sumber, chunksize: int, hapus_kosong: bool):
+    """Membaca CSV per chunk; baris berisi nilai kosong dibuang jika diminta."""
+    for chunk in pd.read_csv(_buka_sumber(sumber), chunksize=chunksize):
+        yield chunk.dropna() if hapus_kosong else chunk
+
+
+class ProsesorOutOfCore:
+    """
+    Menjalankan cleaning, scaling, dan one-hot encoding dalam dua pass atas CSV.
+    Seperti alur in-memory, cleaning memakai semua kolom (nilai kosong dan outlier
+    di kolom mana pun), sedangkan keluaran hanya berisi fitur terpilih. Batas IQR
+    dihitung dari kuantil sketch pada data asli (bukan sekuensial per kolom), dan
+    galat rank aktual dari Q1/Q3 diukur pada pass kedua.
+    """
+    def __init__(self, kolom: List[str], missing_value_method: str, outlier_method: str,
+                 scaler_method: str, chunksize: int = UKURAN_CHUNK_DEFAULT, k_sketch: int = K_SKETCH_DEFAULT):
+        self.kolom = kolom
+        self.missing_value_method = missing_value_method
+        self.outlier_method = outlier_method
+        self.scaler_method = scaler_method
+        self.chunksize = chunksize
+        self.k_sketch = k_sketch
+        self.kolom_numerik_semua: List[str] = []
+        self.kolom_numerik: List[str] = []
+        self.kolom_kategorikal: List[str] = []
+        self.statistik: Dict[str, StatistikStreaming] = {}
+        self.sketch: Dict[str, KLLSketch] = {}
+        self.frekuensi: Dict[str, Dict[str, int]] = {}
+        self.kuartil: Dict[str, Tuple[float, float]] = {}
+        self.batas: Dict[str, Tuple[float, float]] = {}
+        self._pengisi: Optional[Dict[str, object]] = None
+        self.galat_kuantil: Dict[str, float] = {}
+        self.laporan: Dict[str, float] = {}
+        # Hasil pass 2: vocabulary one-hot, urutan kolom keluaran, dan statistik data bersih untuk scaling
+        self.vocab: Dict[str, List] = {}
+        self.kolom_output: List[str] = []
+        self.stat_akhir: Dict[str, StatistikStreaming] = {}
+
+    @property
+    def _hapus_kosong(self) -> bool:
+        return self.missing_value_method == 'Hapus Baris'
+
+    def pass_statistik(self, sumber):
+        """Pass 1: kumpulkan statistik streaming, sketch kuantil, dan frekuensi kategori."""
+        for chunk in _iter_chunk(sumber, self.chunksize, self._hapus_kosong):
+            if not self.statistik and not self.frekuensi:
+                hilang = [c for c in self.kolom if c not in chunk.columns]
+                if hilang:
+                    raise KeyError(f"Fitur tidak ditemukan: {', '.join(hilang)}")
+                self.kolom_numerik_semua = chunk.select_dtypes(include=np.number).columns.tolist()
+                self.kolom_numerik = [c for c in self.kolom if c in self.kolom_numerik_semua]
+                self.kolom_kategorikal = [c for c in self.kolom if c not in self.kolom_numerik_semua]
+                for col in self.kolom_numerik_semua:
+                    self.statistik[col] = StatistikStreaming()
+                    self.sketch[col] = KLLSketch(self.k_sketch)
+                for col in self.kolom_kategorikal:
+                    self.frekuensi[col] = {}
+            for col in self.kolom_numerik_semua:
+                nilai = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64)
+                self.statistik[col].update(nilai)
+                self.sketch[col].update(nilai)
+            for col in self.kolom_kategorikal:
+                for kategori, jumlah in chunk[col].value_counts(dropna=True).items():
+                    self.frekuensi[col][kategori] = self.frekuensi[col].get(kategori, 0) + int(jumlah)
+
+        if self.outlier_method == 'Hapus Outlier (IQR)':
+            isi_mean = self.missing_value_method == 'Isi dengan Mean/Modus'
+            for col in self.kolom_numerik_semua:
+                stat = self.statistik[col]
+                tambahan = (stat.mean, stat.n_kosong) if isi_mean else None
+                q1, q3 = self.sketch[col].kuantil([0.25, 0.75], tambahan)
+                self.kuartil[col] = (q1, q3)
+                iqr = q3 - q1
+                self.batas[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+    def _isi_kosong(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        if self.missing_value_method != 'Isi dengan Mean/Modus':
+            return chunk
+        if self._pengisi is None:
+            self._pengisi = {col: self.statistik[col].mean for col in self.kolom_numerik_semua if self.statistik[col].n}
+            for col in self.kolom_kategorikal:
+                if self.frekuensi[col]:
+                    # Modus; jika seri, pilih kategori terkecil seperti pandas.Series.mode
+                    self._pengisi[col] = min(self.frekuensi[col].items(), key=lambda kv: (-kv[1], str(kv[0])))[0]
+        return chunk.fillna(self._pengisi)
+
+    def pass_transformasi(self, sumber, output_dir: str) -> Tuple[np.memmap, List[str], np.ndarray]:
+        """
+        Pass 2: bersihkan, encode, lalu tulis matriks fitur float32 per chunk ke disk.
+        Scaling diterapkan setelahnya secara in-place pada file keluaran per blok.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        path_fitur = os.path.join(output_dir, 'fitur.f32')
+        path_indeks = os.path.join(output_dir, 'indeks.i64')
+        # Vocabulary tetap dari pass 1; kategori pertama (terurut) dibuang seperti drop_first=True
+        vocab = {col: sorted(self.frekuensi[col], key=str) for col in self.kolom_kategorikal}
+        kolom_output = list(self.kolom_numerik) + [f"{col}_{kat}" for col in self.kolom_kategorikal for kat in vocab[col][1:]]
+        stat_akhir = {col: StatistikStreaming() for col in self.kolom_numerik}
+        self.vocab, self.kolom_output, self.stat_akhir = vocab, kolom_output, stat_akhir
+        # Per kolom: [jumlah < Q1, jumlah <= Q1, jumlah < Q3, jumlah <= Q3, jumlah nilai valid]
+        hitung_rank = {col: np.zeros(5, dtype=np.int64) for col in self.kuartil}
+        n_total, n_tulis = 0, 0
+
+        with open(path_fitur, 'wb') as f_fitur, open(path_indeks, 'wb') as f_indeks:
+            for chunk in _iter_chunk(sumber, self.chunksize, self._hapus_kosong):
+                n_total += len(chunk)
+                indeks = chunk.index.to_numpy(dtype=np.int64)
+                chunk = self._isi_kosong(chunk)
+                numerik = chunk[self.kolom_numerik_semua].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+                mask = np.ones(len(chunk), dtype=bool)
+                for j, col in enumerate(self.kolom_numerik_semua):
+                    if col not in self.batas:
+                        continue
+                    bawah, atas = self.batas[col]
+                    mask &= (numerik[:, j] >= bawah) & (numerik[:, j] <= atas)
+                    # Hitung rank sebenarnya dari Q1/Q3 estimasi untuk mengukur galat sketch
+                    q1, q3 = self.kuartil[col]
+                    x = numerik[:, j]
+                    hitung_rank[col] += [(x < q1).sum(), (x <= q1).sum(), (x < q3).sum(), (x <= q3).sum(),
+                                         (~np.isnan(x)).sum()]
+
+                posisi = [self.kolom_numerik_semua.index(c) for c in self.kolom_numerik]
+                numerik = numerik[mask][:, posisi]
+                for j, col in enumerate(self.kolom_numerik):
+                    stat_akhir[col].update(numerik[:, j])
+                blok = [numerik.astype(np.float32)]
+                for col in self.kolom_kategorikal:
+                    kode = pd.Categorical(chunk[col].to_numpy()[mask], categories=vocab[col]).codes
+                    one_hot = np.zeros((len(kode), len(vocab[col])), dtype=np.float32)
+                    valid = kode >= 0
+                    one_hot[np.flatnonzero(valid), kode[valid]] = 1.0
+                    blok.append(one_hot[:, 1:])
+                f_fitur.write(np.ascontiguousarray(np.hstack(blok), dtype=np.float32).tobytes())
+                f_indeks.write(indeks[mask].tobytes())
+                n_tulis += int(mask.sum())
+
+        matriks = np.memmap(path_fitur, dtype=np.float32, mode='r+', shape=(n_tulis, len(kolom_output)))
+        self._scaling_inplace(matriks, stat_akhir)
+        matriks.flush()
+        indeks_baris = np.fromfile(path_indeks, dtype=np.int64)
+
+        for col, (lt1, le1, lt3, le3, n_col) in hitung_rank.items():
+            if n_col:
+                # Galat rank = jarak target (0.25/0.75) ke interval rank [< q, <= q] dari estimasi sketch
+                galat = [max(target - le / n_col, lt / n_col - target, 0.0)
+                         for target, lt, le in ((0.25, lt1, le1), (0.75, lt3, le3))]
+                self.galat_kuantil[col] = float(max(galat))
+        self.laporan.update(baris_dibaca=n_total, baris_ditulis=n_tulis)
+        with open(os.path.join(output_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'kolom': kolom_output, 'shape': [n_tulis, len(kolom_output)], 'dtype': 'float32'}, f)
+        return np.memmap(path_fitur, dtype=np.float32, mode='r', shape=(n_tulis, len(kolom_output))), kolom_output, indeks_baris
+
+    def _parameter_scaling(self, stat_akhir: Dict[str, StatistikStreaming]) -> Tuple[np.ndarray, np.ndarray]:
+        """(geser, skala) sehingga X_skala = (X - geser) / skala untuk kolom numerik keluaran."""
+        if self.scaler_method == 'MinMaxScaler':
+            geser = np.array([stat_akhir[c].min for c in self.kolom_numerik])
+            skala = np.array([stat_akhir[c].max - stat_akhir[c].min for c in self.kolom_numerik])
+        else:
+            geser = np.array([stat_akhir[c].mean for c in self.kolom_numerik])
+            skala = np.array([stat_akhir[c].std for c in self.kolom_numerik])
+        # Kolom konstan tidak diskalakan, sama seperti scikit-learn
+        return geser, np.where(skala > 0, skala, 1.0)
+
+    def _scaling_inplace(self, matriks: np.memmap, stat_akhir: Dict[str, StatistikStreaming]):
+        """Menerapkan StandardScaler/MinMaxScaler per blok baris dengan parameter dari statistik streaming."""
+        if not self.kolom_numerik:
+            return
+        geser, skala = self._parameter_scaling(stat_akhir)
+        p = len(self.kolom_numerik)
+        for mulai in range(0, matriks.shape[0], self.chunksize):
+            blok = matriks[mulai:mulai + self.chunksize, :p]
+            matriks[mulai:mulai + self.chunksize, :p] = ((blok - geser) / skala).astype(np.float32)
+
+    def buat_pipeline(self) -> PreprocessingPipeline:
+        """
+        PreprocessingPipeline dengan parameter yang sama seperti keluaran pass 2 (pengisi,
+        scaling dari data bersih, vocabulary one-hot), sehingga nasabah baru dan model tersimpan
+        memakai ruang fitur yang sama dengan data out-of-core.
+        """
+        if not self.kolom_output:
+            raise RuntimeError("Pass transformasi belum dijalankan.")
+        pipeline = PreprocessingPipeline()
+        pipeline.scaler_method = self.scaler_method
+        pipeline.kolom_numerik = list(self.kolom_numerik)
+        pipeline.kolom_kategorikal = list(self.kolom_kategorikal)
+        pipeline.vocab = {col: list(kategori) for col, kategori in self.vocab.items()}
+        pipeline.pengisi = {col: self.statistik[col].mean for col in self.kolom_numerik if self.statistik[col].n}
+        pipeline.kolom_output = list(self.kolom_output)
+        if self.kolom_numerik:
+            geser, skala = self._parameter_scaling(self.stat_akhir)
+            if self.scaler_method == 'MinMaxScaler':
+                pipeline.kali, pipeline.tambah = 1.0 / skala, -geser / skala
+            else:
+                pipeline.kurang, pipeline.bagi = geser, skala
+        return pipeline
+
+    def jalankan(self, sumber, output_dir: str) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """Menjalankan kedua pass dan mengembalikan DataFrame yang di-memory-map beserta laporan."""
+        mulai = time.perf_counter()
+        self.pass_statistik(sumber)
+        waktu_pass1 = time.perf_counter() - mulai
+        matriks, kolom_output, indeks = self.pass_transformasi(sumber, output_dir)
+        self.laporan.update(
+            waktu_pass1=waktu_pass1,
+            waktu_pass2=time.perf_counter() - mulai - waktu_pass1,
+            item_sketch=sum(s.jumlah_item() for s in self.sketch.values()),
+        )
+        # copy=False: tanpa ini pandas menyalin memmap ke RAM
+        df = pd.DataFrame(matriks, columns=kolom_output, index=pd.Index(indeks), copy=False)
+        return df, self.laporan
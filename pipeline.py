@@ -0,0 +1,219 @@
+# File: pipeline.py
+# Deskripsi: Pipeline pra-pemrosesan yang sudah di-fit (scaling + one-hot encoding)
+# dan dapat disimpan ke disk, sehingga nasabah baru bisa ditransformasi ke ruang
+# fitur yang sama persis tanpa menjalankan ulang seluruh proses.
+
+import json
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from typing import Dict, List, Optional
+
+VERSI_FORMAT = 1
+
+
+class PreprocessingPipeline:
+    """
+    Menyimpan parameter hasil fit: urutan kolom, nilai pengisi (mean) untuk kolom
+    numerik, parameter scaler, dan vocabulary kategori yang tetap. Kolom boolean
+    diteruskan apa adanya sebagai 0/1 (tanpa scaling), seperti transformasi awal. `transform`
+    menghasilkan kolom yang sama dengan hasil fit meskipun sebuah kategori tidak
+    muncul (atau tidak dikenal) di batch baru.
+    """
+    def __init__(self):
+        self.scaler_method: Optional[str] = None
+        self.kolom_numerik: List[str] = []
+        self.kolom_kategorikal: List[str] = []
+        self.kolom_boolean: List[str] = []
+        self.vocab: Dict[str, List] = {}
+        self.pengisi: Dict[str, float] = {}
+        # StandardScaler: (X - kurang) / bagi; MinMaxScaler: X * kali + tambah (sama dengan scikit-learn)
+        self.kurang: Optional[np.ndarray] = None
+        self.bagi: Optional[np.ndarray] = None
+        self.kali: Optional[np.ndarray] = None
+        self.tambah: Optional[np.ndarray] = None
+        self.kolom_output: List[str] = []
+        # Tahap reduksi dimensi opsional: Z = (X - rata_rata) @ komponen.T (rata_rata None untuk TruncatedSVD)
+        self.metode_reduksi: Optional[str] = None
+        self.proyeksi_komponen: Optional[np.ndarray] = None
+        self.proyeksi_rata_rata: Optional[np.ndarray] = None
+        self.kolom_proyeksi: List[str] = []
+
+    @property
+    def sudah_fit(self) -> bool:
+        return bool(self.kolom_output)
+
+    @property
+    def kolom_input(self) -> List[str]:
+        """Kolom yang harus ada pada batch yang ditransformasi."""
+        return self.kolom_numerik + self.kolom_boolean + self.kolom_kategorikal
+
+    def fit(self, data: pd.DataFrame, scaler_method: str) -> 'PreprocessingPipeline':
+        """Mempelajari parameter scaling dan vocabulary one-hot dari data."""
+        self.scaler_method = scaler_method
+        self.kolom_numerik = data.select_dtypes(include=np.number).columns.tolist()
+        self.kolom_kategorikal = data.select_dtypes(include=['object', 'category']).columns.tolist()
+        self.kolom_boolean = data.select_dtypes(include=['bool', 'boolean']).columns.tolist()
+
+        if self.kolom_numerik:
+            nilai = data[self.kolom_numerik]
+            self.pengisi.update({col: float(v) for col, v in nilai.mean().items()})
+            if scaler_method == 'StandardScaler (Z-score)':
+                scaler = StandardScaler().fit(nilai)
+                self.kurang, self.bagi = scaler.mean_, scaler.scale_
+            elif scaler_method == 'MinMaxScaler':
+                scaler = MinMaxScaler().fit(nilai)
+                self.kali, self.tambah = scaler.scale_, scaler.min_
+            else:
+                raise ValueError(f"Metode scaling tidak dikenal: {scaler_method}")
+
+        for col in self.kolom_kategorikal:
+            seri = data[col]
+            # Urutan kategori mengikuti pd.get_dummies: urutan dtype category atau nilai terurut
+            if isinstance(seri.dtype, pd.CategoricalDtype):
+                # Kategori yang tidak lagi muncul (mis. terhapus saat cleaning) tidak dijadikan kolom
+                self.vocab[col] = seri.cat.remove_unused_categories().cat.categories.tolist()
+            else:
+                self.vocab[col] = sorted(seri.dropna().unique().tolist())
+
+        # Seperti pd.get_dummies(drop_first=True): kolom numerik & boolean tetap di urutan asal,
+        # kolom dummy di belakang dengan kategori pertama sebagai baseline
+        diteruskan = set(self.kolom_numerik) | set(self.kolom_boolean)
+        self.kolom_output = [col for col in data.columns if col in diteruskan] + [
+            f"{col}_{kat}" for col in self.kolom_kategorikal for kat in self.vocab[col][1:]
+        ]
+        return self
+
+    def atur_reduksi(self, metode: str, komponen: np.ndarray, rata_rata: Optional[np.ndarray] = None) -> List[str]:
+        """Menambahkan tahap proyeksi hasil reduksi dimensi (PCA/TruncatedSVD) ke akhir pipeline."""
+        if komponen.shape[1] != len(self.kolom_output):
+            raise ValueError(f"Komponen reduksi ({komponen.shape[1]} fitur) tidak cocok dengan output pipeline ({len(self.kolom_output)}).")
+        self.metode_reduksi = metode
+        self.proyeksi_komponen = np.asarray(komponen, dtype=np.float64)
+        self.proyeksi_rata_rata = None if rata_rata is None else np.asarray(rata_rata, dtype=np.float64)
+        self.kolom_proyeksi = [f"KP{i + 1}" for i in range(len(komponen))]
+        return self.kolom_proyeksi
+
+    def hapus_reduksi(self):
+        self.metode_reduksi, self.proyeksi_komponen, self.proyeksi_rata_rata, self.kolom_proyeksi = None, None, None, []
+
+    def _proyeksikan(self, fitur: pd.DataFrame) -> pd.DataFrame:
+        """Memproyeksikan output fitur (dense atau dengan kolom sparse) ke komponen reduksi."""
+        kolom_sparse = [col for col, tipe in fitur.dtypes.items() if isinstance(tipe, pd.SparseDtype)]
+        if kolom_sparse:
+            kolom_dense = [col for col in fitur.columns if col not in kolom_sparse]
+            X = sp.hstack([sp.csr_matrix(fitur[kolom_dense].to_numpy(dtype=np.float64)),
+                           fitur[kolom_sparse].sparse.to_coo()], format='csr')
+        else:
+            X = fitur.to_numpy(dtype=np.float64)
+        hasil = np.asarray(X @ self.proyeksi_komponen.T)
+        if self.proyeksi_rata_rata is not None:
+            hasil -= self.proyeksi_rata_rata @ self.proyeksi_komponen.T
+        return pd.DataFrame(hasil, index=fitur.index, columns=self.kolom_proyeksi)
+
+    def transform(self, batch: pd.DataFrame, sparse: bool = False, reduksi: bool = True) -> pd.DataFrame:
+        """
+        Mentransformasi batch baris baru ke ruang fitur hasil fit (kolom dan urutan tetap).
+        Jika `sparse=True`, kolom one-hot disimpan sebagai kolom SparseDtype (hanya
+        posisi bernilai True yang disimpan) dan digabung dengan kolom numerik dense.
+        Jika pipeline memiliki tahap reduksi dan `reduksi=True`, hasilnya berupa komponen KP1..KPn.
+        """
+        if not self.sudah_fit:
+            raise RuntimeError("Pipeline belum di-fit.")
+        hilang = [c for c in self.kolom_input if c not in batch.columns]
+        if hilang:
+            raise KeyError(f"Kolom tidak ditemukan pada batch: {', '.join(hilang)}")
+
+        kolom = {}
+        if self.kolom_numerik:
+            nilai = batch[self.kolom_numerik].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+            kosong = np.isnan(nilai)
+            if kosong.any():
+                isi = np.array([self.pengisi[c] for c in self.kolom_numerik])
+                nilai[kosong] = np.broadcast_to(isi, nilai.shape)[kosong]
+            if self.kali is not None:
+                nilai *= self.kali
+                nilai += self.tambah
+            else:
+                nilai -= self.kurang
+                nilai /= self.bagi
+            for j, col in enumerate(self.kolom_numerik):
+                kolom[col] = nilai[:, j]
+        for col in self.kolom_boolean:
+            # Nilai kosong dianggap False
+            kolom[col] = batch[col].fillna(False).to_numpy(dtype=bool).astype(np.int8)
+
+        blok_sparse = []
+        for col in self.kolom_kategorikal:
+            # Kategori tidak dikenal / kosong memiliki kode -1 sehingga semua kolom dummy bernilai False
+            kode = pd.Categorical(batch[col], categories=self.vocab[col]).codes
+            nama_dummy = [f"{col}_{kat}" for kat in self.vocab[col][1:]]
+            if sparse:
+                baris = np.flatnonzero(kode >= 1)
+                matriks = sp.csc_matrix((np.ones(len(baris), dtype=bool), (baris, kode[baris] - 1)),
+                                        shape=(len(kode), len(nama_dummy)))
+                blok_sparse.append(pd.DataFrame.sparse.from_spmatrix(matriks, index=batch.index, columns=nama_dummy))
+            else:
+                for i, nama in enumerate(nama_dummy, start=1):
+                    kolom[nama] = kode == i
+        hasil = pd.DataFrame(kolom, index=batch.index)
+        if blok_sparse:
+            hasil = pd.concat([hasil] + blok_sparse, axis=1)
+        hasil = hasil[self.kolom_output]
+        if reduksi and self.proyeksi_komponen is not None:
+            return self._proyeksikan(hasil)
+        return hasil
+
+    def to_dict(self) -> Dict:
+        def daftar(arr):
+            return None if arr is None else np.asarray(arr, dtype=np.float64).tolist()
+        return {
+            'versi': VERSI_FORMAT,
+            'scaler_method': self.scaler_method,
+            'kolom_numerik': self.kolom_numerik,
+            'kolom_kategorikal': self.kolom_kategorikal,
+            'kolom_boolean': self.kolom_boolean,
+            'vocab': self.vocab,
+            'pengisi': self.pengisi,
+            'kurang': daftar(self.kurang),
+            'bagi': daftar(self.bagi),
+            'kali': daftar(self.kali),
+            'tambah': daftar(self.tambah),
+            'kolom_output': self.kolom_output,
+            'metode_reduksi': self.metode_reduksi,
+            'proyeksi_komponen': daftar(self.proyeksi_komponen),
+            'proyeksi_rata_rata': daftar(self.proyeksi_rata_rata),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PreprocessingPipeline':
+        if data.get('versi') != VERSI_FORMAT:
+            raise ValueError(f"Versi format pipeline tidak didukung: {data.get('versi')}")
+        pipeline = cls()
+        for atribut in ('scaler_method', 'kolom_numerik', 'kolom_kategorikal', 'vocab', 'pengisi', 'kolom_output'):
+            setattr(pipeline, atribut, data[atribut])
+        for atribut in ('kurang', 'bagi', 'kali', 'tambah'):
+            if data[atribut] is not None:
+                setattr(pipeline, atribut, np.asarray(data[atribut], dtype=np.float64))
+        # Spesifikasi lama tidak mencatat kolom boolean
+        pipeline.kolom_boolean = data.get('kolom_boolean', [])
+        # Tahap reduksi bersifat opsional (pipeline lama tidak memilikinya)
+        if data.get('proyeksi_komponen') is not None:
+            rata_rata = data.get('proyeksi_rata_rata')
+            pipeline.atur_reduksi(data['metode_reduksi'], np.asarray(data['proyeksi_komponen'], dtype=np.float64),
+                                  None if rata_rata is None else np.asarray(rata_rata, dtype=np.float64))
+        return pipeline
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+    def save(self, path: str):
+        """Menyimpan pipeline sebagai JSON (kecil dan cepat dimuat ulang)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path: str) -> 'PreprocessingPipeline':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,130 @@
+# File: profil.py
+# Deskripsi: Profil klaster yang dihitung sekali per hasil segmentasi: jumlah anggota,
+# statistik ringkas (mean, median, std, min, max) setiap fitur numerik, dan kategori
+# teratas setiap fitur kategorikal. Grafik dan laporan membaca profil ini alih-alih
+# memindai ulang seluruh tabel nasabah untuk setiap fitur.
+
+import logging
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATISTIK_NUMERIK = ('mean', 'median', 'std', 'min', 'max')
+# Jumlah kategori teratas per fitur kategorikal per klaster
+N_KATEGORI_TERATAS = 3
+# Kolom yang tidak diprofilkan (label dan identitas)
+KOLOM_DIABAIKAN = ('Klaster', 'ID')
+
+
+class ProfilKlaster:
+    """
+    Profil per klaster dari data nasabah dan label klaster.
+    - `jumlah`: Series jumlah anggota per klaster.
+    - `numerik`: DataFrame (indeks klaster) dengan kolom bertingkat (fitur, statistik),
+      dihitung dalam satu groupby atas semua fitur numerik.
+    - `kategori`: tabel panjang (Klaster, Fitur, Kategori, Jumlah, Proporsi, Peringkat)
+      berisi `n_teratas` kategori terbanyak, dihitung dengan bincount atas kode klaster x kategori.
+    """
+    def __init__(self, data: pd.DataFrame, label: Optional[np.ndarray] = None, n_teratas: int = N_KATEGORI_TERATAS):
+        mulai = time.perf_counter()
+        label = data['Klaster'].to_numpy() if label is None else np.asarray(label)
+        if len(label) != len(data):
+            raise ValueError("Panjang label tidak sama dengan jumlah baris data.")
+        self.klaster, kode = np.unique(label, return_inverse=True)
+        n_klaster = len(self.klaster)
+        indeks = pd.Index(self.klaster, name='Klaster')
+        self.jumlah = pd.Series(np.bincount(kode, minlength=n_klaster), index=indeks, name='Jumlah')
+
+        kolom = [c for c in data.columns if c not in KOLOM_DIABAIKAN]
+        numerik = [c for c in kolom if pd.api.types.is_numeric_dtype(data[c]) and not pd.api.types.is_bool_dtype(data[c])]
+        kategorikal = [c for c in kolom if c not in numerik]
+
+        if numerik:
+            self.numerik = data[numerik].groupby(kode).agg(list(STATISTIK_NUMERIK))
+            self.numerik.index = indeks
+        else:
+            self.numerik = pd.DataFrame(index=indeks, columns=pd.MultiIndex.from_product([[], STATISTIK_NUMERIK]))
+
+        bagian = []
+        for fitur in kategorikal:
+            kode_kategori, kategori = pd.factorize(data[fitur], sort=True)
+            valid = kode_kategori >= 0
+            hitungan = np.bincount(kode[valid] * len(kategori) + kode_kategori[valid],
+                                   minlength=n_klaster * len(kategori)).reshape(n_klaster, len(kategori))
+            n = min(n_teratas, len(kategori))
+            # Urutan stabil: kategori dengan jumlah sama diurutkan menurut nilainya
+            teratas = np.argsort(-hitungan, axis=1, kind='stable')[:, :n]
+            jumlah = np.take_along_axis(hitungan, teratas, axis=1)
+            bagian.append(pd.DataFrame({
+                'Klaster': np.repeat(self.klaster, n), 'Fitur': fitur,
+                'Kategori': np.asarray(kategori)[teratas].ravel(), 'Jumlah': jumlah.ravel(),
+                'Proporsi': (jumlah / np.maximum(self.jumlah.to_numpy()[:, None], 1)).ravel(),
+                'Peringkat': np.tile(np.arange(1, n + 1), n_klaster),
+            }))
+        kolom_kategori = ['Klaster', 'Fitur', 'Kategori', 'Jumlah', 'Proporsi', 'Peringkat']
+        self.kategori = pd.concat(bagian, ignore_index=True) if bagian else pd.DataFrame(columns=kolom_kategori)
+        # Hanya kategori yang benar-benar muncul di klaster
+        self.kategori = self.kategori[self.kategori['Jumlah'] > 0].reset_index(drop=True)
+
+        self.waktu = time.perf_counter() - mulai
+        logger.info(f"Profil {n_klaster} klaster ({len(numerik)} fitur numerik, {len(kategorikal)} kategorikal) "
+                    f"dihitung dalam {self.waktu:.2f} detik.")
+
+    @classmethod
+    def dari_ringkasan(cls, ringkasan: Dict[str, pd.DataFrame], n_teratas: int = N_KATEGORI_TERATAS) -> 'ProfilKlaster':
+        """
+        Profil dari ringkasan per klaster yang dihitung di SQLite (database.muat_ringkasan):
+        tabel jumlah, numerik (Klaster, Fitur, statistik...), dan distribusi kategori
+        (Klaster, Fitur, Kategori, Jumlah). Statistik yang tidak ada di ringkasan (median)
+        tidak ditampilkan.
+        """
+        mulai = time.perf_counter()
+        profil = cls.__new__(cls)
+        jumlah = ringkasan['jumlah'].sort_values('Klaster')
+        profil.klaster = jumlah['Klaster'].to_numpy()
+        indeks = pd.Index(profil.klaster, name='Klaster')
+        profil.jumlah = pd.Series(jumlah['Jumlah'].to_numpy(), index=indeks, name='Jumlah')
+
+        numerik = ringkasan['numerik']
+        statistik = [s for s in STATISTIK_NUMERIK if s in numerik.columns]
+        fitur = list(dict.fromkeys(numerik['Fitur']))
+        profil.numerik = numerik.pivot(index='Klaster', columns='Fitur', values=statistik) \
+            .swaplevel(axis=1).reindex(index=indeks, columns=pd.MultiIndex.from_product([fitur, statistik]))
+
+        # Urutan sama seperti perhitungan dari data: jumlah menurun, lalu nilai kategori
+        kategori = ringkasan['kategori'].sort_values(['Klaster', 'Fitur', 'Jumlah', 'Kategori'],
+                                                     ascending=[True, True, False, True], kind='stable')
+        kategori = kategori.assign(Peringkat=kategori.groupby(['Klaster', 'Fitur']).cumcount() + 1)
+        kategori = kategori[kategori['Peringkat'] <= n_teratas]
+        kategori = kategori.assign(Proporsi=kategori['Jumlah'] / kategori['Klaster'].map(profil.jumlah).clip(lower=1))
+        urutan_fitur = {f: i for i, f in enumerate(dict.fromkeys(ringkasan['kategori']['Fitur']))}
+        kategori = kategori.assign(Urutan=kategori['Fitur'].map(urutan_fitur)).sort_values(['Urutan', 'Klaster', 'Peringkat'])
+        profil.kategori = kategori[['Klaster', 'Fitur', 'Kategori', 'Jumlah', 'Proporsi', 'Peringkat']].reset_index(drop=True)
+
+        profil.waktu = time.perf_counter() - mulai
+        return profil
+
+    @property
+    def fitur_numerik(self) -> List[str]:
+        return list(dict.fromkeys(self.numerik.columns.get_level_values(0)))
+
+    @property
+    def fitur_kategorikal(self) -> List[str]:
+        return list(dict.fromkeys(self.kategori['Fitur']))
+
+    def statistik(self, fitur: str, stat: str = 'mean') -> pd.Series:
+        """Nilai satu statistik fitur numerik untuk setiap klaster."""
+        return self.numerik[(fitur, stat)].rename(fitur)
+
+    def ringkasan_numerik(self, id_klaster) -> pd.DataFrame:
+        """Statistik semua fitur numerik untuk satu klaster (baris = fitur)."""
+        ringkasan = self.numerik.loc[id_klaster].unstack()
+        return ringkasan[[s for s in STATISTIK_NUMERIK if s in ringkasan.columns]]
+
+    def kategori_teratas(self, id_klaster) -> pd.DataFrame:
+        """Kategori teratas setiap fitur kategorikal untuk satu klaster."""
+        return self.kategori.loc[self.kategori['Klaster'] == id_klaster, ['Fitur', 'Kategori', 'Jumlah', 'Proporsi']]
@@ -0,0 +1,116 @@
+# File: reduksi.py
+# Deskripsi: Tahap reduksi dimensi opsional antara transformasi data dan segmentasi.
+# PCA (dengan target varians terjelaskan) untuk matriks dense dan TruncatedSVD
+# (randomized) untuk matriks sparse hasil one-hot, serta perbandingan waktu dan
+# kualitas klaster dengan matriks tanpa reduksi.
+
+import logging
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.metrics import adjusted_rand_score
+from typing import Optional
+
+from clustering import ke_matriks_fitur
+from evaluasi import UKURAN_SAMPEL_SILHOUETTE, evaluasi_klaster, nilai_metrik
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METODE_OTOMATIS = 'Otomatis'
+TARGET_VARIANS_DEFAULT = 0.9
+# Batas komponen yang dihitung TruncatedSVD sebelum dipangkas ke target varians
+N_KOMPONEN_MAKS_SVD = 100
+
+
+class ReduksiDimensi:
+    """
+    Mereduksi matriks fitur ke `n_komponen` komponen, atau ke jumlah komponen
+    terkecil yang menjelaskan `target_varians` dari total varians.
+    Metode 'Otomatis' memilih TruncatedSVD untuk input sparse (tanpa centering,
+    sehingga matriks tidak pernah dibuat dense) dan PCA untuk input dense.
+    """
+    def __init__(self, metode: str = METODE_OTOMATIS, n_komponen: Optional[int] = None,
+                 target_varians: float = TARGET_VARIANS_DEFAULT, random_state: int = 42):
+        if metode not in (METODE_OTOMATIS, 'PCA', 'TruncatedSVD'):
+            raise ValueError(f"Metode reduksi tidak dikenal: {metode}")
+        self.metode = metode
+        self.n_komponen = n_komponen
+        self.target_varians = target_varians
+        self.random_state = random_state
+        self.metode_terpakai: Optional[str] = None
+        self.rata_rata: Optional[np.ndarray] = None
+        self.komponen: Optional[np.ndarray] = None
+        self.rasio_varians: Optional[np.ndarray] = None
+        self.waktu_fit: Optional[float] = None
+
+    def fit(self, X) -> 'ReduksiDimensi':
+        X = ke_matriks_fitur(X) if isinstance(X, pd.DataFrame) else X
+        mulai = time.perf_counter()
+        n_fitur = X.shape[1]
+        if n_fitur < 2:
+            raise ValueError(f"Reduksi dimensi membutuhkan minimal 2 fitur, data hanya memiliki {n_fitur}.")
+        self.metode_terpakai = self.metode if self.metode != METODE_OTOMATIS else ('TruncatedSVD' if sp.issparse(X) else 'PCA')
+
+        if self.metode_terpakai == 'PCA':
+            if sp.issparse(X):
+                X = X.toarray()
+            X = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else np.asarray(X, dtype=np.float64)
+            # covariance_eigh: cukup satu matriks kovarians d x d, cepat untuk n >> d
+            model = PCA(n_components=self.n_komponen or self.target_varians, svd_solver='covariance_eigh').fit(X)
+            self.rata_rata = model.mean_
+            self.komponen = model.components_
+            self.rasio_varians = model.explained_variance_ratio_
+        else:
+            n_maks = min(self.n_komponen or N_KOMPONEN_MAKS_SVD, n_fitur - 1)
+            model = TruncatedSVD(n_components=n_maks, algorithm='randomized', random_state=self.random_state).fit(X)
+            rasio = model.explained_variance_ratio_
+            n = self.n_komponen or int(min(np.searchsorted(np.cumsum(rasio), self.target_varians) + 1, len(rasio)))
+            self.rata_rata = None
+            self.komponen = model.components_[:n]
+            self.rasio_varians = rasio[:n]
+
+        self.waktu_fit = time.perf_counter() - mulai
+        logger.info(f"{self.metode_terpakai}: {n_fitur} -> {len(self.komponen)} dimensi, "
+                    f"varians terjelaskan {self.rasio_varians.sum():.1%} ({self.waktu_fit:.2f} detik).")
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        X = ke_matriks_fitur(X) if isinstance(X, pd.DataFrame) else X
+        X = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else X
+        hasil = np.asarray(X @ self.komponen.T)
+        if self.rata_rata is not None:
+            # (X - mean) @ W.T tanpa membuat salinan X yang sudah dikurangi rata-rata
+            hasil -= self.rata_rata @ self.komponen.T
+        return hasil
+
+
+def bandingkan_reduksi(X_penuh, X_reduksi, n_clusters: int, ukuran_sampel: int = UKURAN_SAMPEL_SILHOUETTE,
+                       seed: int = 42) -> pd.DataFrame:
+    """
+    Menjalankan K-Means pada matriks penuh dan tereduksi, lalu membandingkan waktu
+    fit, waktu silhouette (sampel), silhouette di ruang masing-masing maupun di ruang
+    fitur asli, serta kesamaan label (Adjusted Rand Index) terhadap hasil tanpa reduksi.
+    """
+    X_penuh = ke_matriks_fitur(X_penuh) if isinstance(X_penuh, pd.DataFrame) else X_penuh
+    X_reduksi = ke_matriks_fitur(X_reduksi) if isinstance(X_reduksi, pd.DataFrame) else X_reduksi
+    opsi_silhouette = dict(metrik=('silhouette',), batas_sampel=ukuran_sampel, ukuran_sampel=ukuran_sampel, seed=seed)
+    hasil, label_penuh = [], None
+    for nama, X in (('Tanpa reduksi', X_penuh), ('Tereduksi', X_reduksi)):
+        mulai = time.perf_counter()
+        label = KMeans(n_clusters=n_clusters, random_state=seed, n_init=10).fit_predict(X)
+        waktu_fit = time.perf_counter() - mulai
+        mulai = time.perf_counter()
+        silhouette = nilai_metrik(evaluasi_klaster(X, label, **opsi_silhouette), 'Silhouette')
+        waktu_silhouette = time.perf_counter() - mulai
+        if label_penuh is None:
+            label_penuh, silhouette_asli = label, silhouette
+        else:
+            silhouette_asli = nilai_metrik(evaluasi_klaster(X_penuh, label, **opsi_silhouette), 'Silhouette')
+        hasil.append({'Matriks': nama, 'Dimensi': X.shape[1], 'Waktu K-Means (s)': waktu_fit,
+                      'Waktu Silhouette (s)': waktu_silhouette, 'Silhouette': silhouette,
+                      'Silhouette (ruang asli)': silhouette_asli, 'ARI vs Tanpa Reduksi': adjusted_rand_score(label_penuh, label)})
+    return pd.DataFrame(hasil)
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
 from typing import Tuple, Optional, Dict
 
+# Rekomendasi untuk klaster yang tidak ada di konfigurasi (mis. noise DBSCAN, -1)
+REKOMENDASI_DEFAULT = {'produk': 'Tidak Ada', 'alasan': 'Tidak ada rekomendasi spesifik.'}
+
 # --- Kelas untuk Rekomendasi Berbasis Segmen (TETAP ADA) ---
 class SistemRekomendasi:
     # ... (isi kelas ini sama seperti sebelumnya, tidak perlu diubah)
@@ -18,13 +22,23 @@ class SistemRekomendasi:
             3: {'produk': 'Asuransi Jiwa', 'alasan': 'Memiliki tanggungan, butuh proteksi jangka panjang.'}
         }
 
+    def tabel_produk(self) -> pd.DataFrame:
+        """Tabel kecil rekomendasi per klaster yang dikonfigurasi (Klaster, Produk, Alasan)."""
+        return pd.DataFrame([{'Klaster': k, 'Produk': v['produk'], 'Alasan': v['alasan']} for k, v in self.konfig_produk.items()],
+                            columns=['Klaster', 'Produk', 'Alasan'])
+
     def buat_rekomendasi(self) -> Tuple[bool, pd.DataFrame, str]:
         try:
-            def get_rekomendasi(klaster):
-                return self.konfig_produk.get(klaster, {'produk': 'Tidak Ada', 'alasan': 'Tidak ada rekomendasi spesifik.'})
-            rekomendasi = self.data['Klaster'].apply(get_rekomendasi)
-            self.data['Produk_Rekomendasi'] = [item['produk'] for item in rekomendasi]
-            self.data['Alasan_Rekomendasi'] = [item['alasan'] for item in rekomendasi]
+            tabel = self.tabel_produk()
+            # Label -> posisi baris di tabel produk, sekaligus untuk seluruh kolom (lookup hash pandas);
+            # klaster yang tidak dikonfigurasi memakai rekomendasi default di posisi terakhir
+            posisi = pd.Index(tabel['Klaster']).get_indexer(self.data['Klaster'])
+            posisi[posisi < 0] = len(tabel)
+            # Kolom kategori: tiap baris hanya menyimpan kode kecil, teks produk/alasan disimpan sekali
+            for kolom, sumber, default in (('Produk_Rekomendasi', 'Produk', REKOMENDASI_DEFAULT['produk']),
+                                           ('Alasan_Rekomendasi', 'Alasan', REKOMENDASI_DEFAULT['alasan'])):
+                kode, kategori = pd.factorize(np.append(tabel[sumber].to_numpy(dtype=object), default))
+                self.data[kolom] = pd.Categorical.from_codes(kode[posisi], categories=kategori)
             return True, self.data, "Rekomendasi produk berhasil dibuat."
         except Exception as e:
             return False, self.data, f"Gagal membuat rekomendasi: {e}"
@@ -0,0 +1,159 @@
+# File: sweep.py
+# Deskripsi: Mesin sweep parameter (analisis elbow) untuk memilih jumlah klaster.
+# K-Means dijalankan untuk rentang k dan DBSCAN untuk grid eps/min_samples secara
+# paralel dalam process pool. Matriks fitur ditulis sekali ke disk dan di-memory-map
+# read-only oleh setiap worker, sehingga tidak ada salinan data per proses.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.cluster import KMeans, DBSCAN
+from threadpoolctl import threadpool_limits
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from evaluasi import evaluasi_klaster, nilai_metrik
+
+UKURAN_SAMPEL_SWEEP = 5_000
+# Saat warm start, restart dingin pembanding memakai n_init / pembagi ini
+N_INIT_PEMBAGI_WARM = 3
+# Panjang minimum blok k berurutan per tugas saat warm start (k pertama blok selalu dingin)
+PANJANG_BLOK_MIN_WARM = 3
+KOLOM_HASIL = ['Metode', 'k', 'eps', 'min_samples', 'Jumlah Klaster', 'Inersia', 'Silhouette (sampel)',
+               'Calinski-Harabasz', 'Waktu (s)', 'Warm Start']
+
+# Matriks fitur milik proses worker (dimuat sekali per proses oleh initializer)
+_X = None
+
+
+def _simpan_matriks(X, folder: str) -> Dict:
+    """Menulis matriks (dense atau CSR) sebagai file .npy dan mengembalikan spesifikasinya."""
+    if sp.issparse(X):
+        X = X.tocsr()
+        for nama in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(folder, f"{nama}.npy"), getattr(X, nama))
+        return {'folder': folder, 'sparse': True, 'shape': X.shape}
+    np.save(os.path.join(folder, 'X.npy'), np.ascontiguousarray(X, dtype=np.float64))
+    return {'folder': folder, 'sparse': False}
+
+
+def _muat_matriks(spec: Dict):
+    """Memuat matriks sebagai memmap read-only (tanpa menyalin ke memori proses)."""
+    if spec['sparse']:
+        bagian = [np.load(os.path.join(spec['folder'], f"{nama}.npy"), mmap_mode='r')
+                  for nama in ('data', 'indices', 'indptr')]
+        return sp.csr_matrix(tuple(bagian), shape=spec['shape'], copy=False)
+    return np.load(os.path.join(spec['folder'], 'X.npy'), mmap_mode='r')
+
+
+def _init_worker(spec: Dict):
+    global _X
+    # Satu thread BLAS/OpenMP per proses agar worker tidak saling berebut core
+    threadpool_limits(1)
+    _X = _muat_matriks(spec)
+
+
+def _evaluasi(label: np.ndarray, ukuran_sampel: int) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    tabel = evaluasi_klaster(_X, label, metrik=('silhouette', 'inersia', 'calinski_harabasz'),
+                             batas_sampel=ukuran_sampel, ukuran_sampel=ukuran_sampel)
+    return nilai_metrik(tabel, 'Inersia (WCSS)'), nilai_metrik(tabel, 'Silhouette'), nilai_metrik(tabel, 'Calinski-Harabasz')
+
+
+def _pusat_tambahan(model: KMeans, rng: np.random.Generator) -> np.ndarray:
+    """Memilih satu pusat baru dengan sampling D^2 (langkah k-means++) dari solusi k-1."""
+    jarak = model.transform(_X).min(axis=1) ** 2
+    total = jarak.sum()
+    i = rng.choice(len(jarak), p=jarak / total) if total > 0 else rng.integers(len(jarak))
+    baris = _X[i]
+    return baris.toarray() if sp.issparse(baris) else np.asarray(baris).reshape(1, -1)
+
+
+def _tugas_kmeans(daftar_k: Sequence[int], n_init: int, warm_start: bool, seed: int, ukuran_sampel: int) -> List[Dict]:
+    """
+    Menjalankan K-Means untuk blok k berurutan. Jika warm_start, setiap k dimulai dari
+    pusat solusi k-1 ditambah satu pusat baru, dan hasil terbaik dibandingkan dengan
+    restart dingin berjumlah lebih kecil (kolom 'Warm Start' menandai pemenangnya).
+    """
+    rng = np.random.default_rng(seed)
+    hasil, sebelumnya = [], None
+    for k in daftar_k:
+        mulai = time.perf_counter()
+        hangat = warm_start and sebelumnya is not None and sebelumnya.n_clusters == k - 1
+        if hangat:
+            init = np.vstack([sebelumnya.cluster_centers_, _pusat_tambahan(sebelumnya, rng)])
+            model = KMeans(n_clusters=k, init=init, n_init=1, random_state=seed).fit(_X)
+            # Warm start bisa terjebak minimum lokal; bandingkan dengan restart dingin yang lebih sedikit
+            dingin = KMeans(n_clusters=k, n_init=max(1, n_init // N_INIT_PEMBAGI_WARM), random_state=seed).fit(_X)
+            if dingin.inertia_ < model.inertia_:
+                model, hangat = dingin, False
+        else:
+            model = KMeans(n_clusters=k, n_init=n_init, random_state=seed).fit(_X)
+        waktu_fit = time.perf_counter() - mulai
+        _, silhouette, ch = _evaluasi(model.labels_, ukuran_sampel)
+        hasil.append({'Metode': 'K-Means', 'k': k, 'eps': None, 'min_samples': None, 'Jumlah Klaster': k,
+                      'Inersia': float(model.inertia_), 'Silhouette (sampel)': silhouette, 'Calinski-Harabasz': ch,
+                      'Waktu (s)': waktu_fit, 'Warm Start': hangat})
+        sebelumnya = model
+    return hasil
+
+
+def _tugas_dbscan(eps: float, min_samples: int, ukuran_sampel: int) -> List[Dict]:
+    mulai = time.perf_counter()
+    label = DBSCAN(eps=eps, min_samples=min_samples).fit_predict(_X)
+    waktu_fit = time.perf_counter() - mulai
+    n_klaster = len(set(label) - {-1})
+    inersia, silhouette, ch = _evaluasi(label, ukuran_sampel)
+    return [{'Metode': 'DBSCAN', 'k': None, 'eps': eps, 'min_samples': min_samples, 'Jumlah Klaster': n_klaster,
+             'Inersia': inersia, 'Silhouette (sampel)': silhouette, 'Calinski-Harabasz': ch,
+             'Waktu (s)': waktu_fit, 'Warm Start': False}]
+
+
+def jalankan_sweep(X, rentang_k: Optional[Iterable[int]] = None,
+                   grid_dbscan: Optional[Iterable[Tuple[float, int]]] = None,
+                   n_jobs: Optional[int] = None, warm_start: bool = True, n_init: int = 10,
+                   ukuran_sampel: int = UKURAN_SAMPEL_SWEEP, seed: int = 42) -> pd.DataFrame:
+    """
+    Menjalankan sweep K-Means atas `rentang_k` dan DBSCAN atas `grid_dbscan`
+    (pasangan eps, min_samples). Rentang k dibagi menjadi blok berurutan (minimal
+    PANJANG_BLOK_MIN_WARM k per blok saat warm start) yang dibagikan ke worker, agar
+    setiap k kecuali yang pertama di blok dapat di-warm-start dari solusi k-1.
+    Mengembalikan tabel inersia, silhouette sampel, Calinski-Harabasz, dan waktu per konfigurasi.
+    """
+    global _X
+    daftar_k = sorted(set(int(k) for k in rentang_k or []))
+    grid = [(float(e), int(m)) for e, m in grid_dbscan or []]
+    if not daftar_k and not grid:
+        return pd.DataFrame(columns=KOLOM_HASIL)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    # Jumlah blok ditentukan panjang blok minimum, bukan jumlah worker: dengan satu k per blok
+    # tidak pernah ada solusi k-1 untuk warm start
+    n_blok = max(1, len(daftar_k) // PANJANG_BLOK_MIN_WARM) if warm_start else len(daftar_k)
+    blok_k = [list(b) for b in np.array_split(daftar_k, min(n_jobs, n_blok)) if len(b)] if daftar_k else []
+    n_jobs = max(1, min(n_jobs, len(grid) + len(blok_k)))
+
+    folder = tempfile.mkdtemp(prefix='sweep_')
+    try:
+        spec = _simpan_matriks(X, folder)
+        if n_jobs == 1:
+            # Tanpa process pool untuk data kecil / lingkungan tanpa multiprocessing
+            _X = _muat_matriks(spec)
+            hasil = [baris for b in blok_k for baris in _tugas_kmeans(b, n_init, warm_start, seed, ukuran_sampel)]
+            hasil += [baris for e, m in grid for baris in _tugas_dbscan(e, m, ukuran_sampel)]
+            _X = None
+        else:
+            # 'spawn' aman dipakai dari aplikasi yang memiliki banyak thread (mis. Streamlit)
+            konteks = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=konteks,
+                                     initializer=_init_worker, initargs=(spec,)) as pool:
+                futures = [pool.submit(_tugas_kmeans, b, n_init, warm_start, seed, ukuran_sampel) for b in blok_k]
+                futures += [pool.submit(_tugas_dbscan, e, m, ukuran_sampel) for e, m in grid]
+                hasil = [baris for f in futures for baris in f.result()]
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return pd.DataFrame(hasil, columns=KOLOM_HASIL).sort_values(['Metode', 'k', 'eps', 'min_samples'], ignore_index=True)
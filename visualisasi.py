@@ -1,26 +1,38 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Optional
 
+from profil import ProfilKlaster
+
 class VisualisasiData:
     """
     Kelas untuk membuat visualisasi interaktif dari data nasabah yang sudah disegmentasi.
     """
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: Optional[pd.DataFrame] = None, profil: Optional[ProfilKlaster] = None):
         # Memastikan input adalah DataFrame untuk mencegah error
         if not isinstance(df, pd.DataFrame):
             df = pd.DataFrame() # Buat DataFrame kosong jika input tidak valid
         self.df = df
+        # Profil klaster dari hasil segmentasi atau ringkasan SQLite; jika tidak diberikan,
+        # dihitung sekali dari df saat pertama dibutuhkan. Grafik hanya membaca profil.
+        self._profil = profil
 
-        # Inisialisasi peta warna hanya jika kolom 'Klaster' ada
-        if 'Klaster' in self.df.columns and not self.df.empty:
+        # Inisialisasi peta warna hanya jika ada klaster (dari profil atau kolom 'Klaster')
+        if profil is not None or ('Klaster' in self.df.columns and not self.df.empty):
             self.color_discrete_map = {
                 i: color for i, color in enumerate(px.colors.qualitative.Vivid)
             }
         else:
             self.color_discrete_map = {}
 
+    @property
+    def profil(self) -> Optional[ProfilKlaster]:
+        if self._profil is None and not self.df.empty and 'Klaster' in self.df.columns:
+            self._profil = ProfilKlaster(self.df)
+        return self._profil
+
     def buat_pie_chart_klaster(self) -> Optional[go.Figure]:
         """
         Membuat pie chart interaktif untuk menunjukkan distribusi nasabah per segmen.
@@ -28,11 +40,10 @@ class VisualisasiData:
         """
         try:
             # Pengecekan data yang lebih aman untuk mencegah error
-            if self.df.empty or 'Klaster' not in self.df.columns:
+            if self.profil is None:
                 return None
 
-            distribusi = self.df['Klaster'].value_counts().reset_index()
-            distribusi.columns = ['Klaster_ID', 'Jumlah']
+            distribusi = self.profil.jumlah.rename_axis('Klaster_ID').reset_index()
 
             # Jangan buat grafik jika tidak ada data setelah dihitung
             if distribusi.empty:
@@ -60,10 +71,10 @@ class VisualisasiData:
         """
         try:
             # Pengecekan data yang lebih aman
-            if self.df.empty or fitur not in self.df.columns or 'Klaster' not in self.df.columns:
+            if self.profil is None or fitur not in self.profil.fitur_numerik:
                 return None
 
-            rata_rata_fitur = self.df.groupby('Klaster')[fitur].mean().reset_index()
+            rata_rata_fitur = self.profil.statistik(fitur, 'mean').reset_index()
 
             # Jangan buat grafik jika tidak ada data setelah dihitung
             if rata_rata_fitur.empty:
@@ -81,4 +92,48 @@ class VisualisasiData:
             # Tooltip akan muncul secara default saat mouse diarahkan (hover)
             return fig
         except Exception:
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def buat_grafik_elbow(tabel_sweep: pd.DataFrame) -> Optional[go.Figure]:
+        """
+        Membuat grafik elbow dari tabel hasil sweep K-Means: inersia per k
+        dengan silhouette (sampel) pada sumbu kedua.
+        """
+        try:
+            data = tabel_sweep[tabel_sweep['Metode'] == 'K-Means'].sort_values('k')
+            if data.empty:
+                return None
+
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=data['k'], y=data['Inersia'], mode='lines+markers', name='Inersia'))
+            fig.add_trace(go.Scatter(x=data['k'], y=data['Silhouette (sampel)'], mode='lines+markers',
+                                     name='Silhouette (sampel)', yaxis='y2', line=dict(dash='dot')))
+            fig.update_layout(
+                title='<b>Analisis Elbow K-Means</b>',
+                xaxis=dict(title='Jumlah Klaster (k)', dtick=1),
+                yaxis=dict(title='Inersia'),
+                yaxis2=dict(title='Silhouette', overlaying='y', side='right'),
+                legend=dict(orientation='h', y=-0.2)
+            )
+            return fig
+        except Exception:
+            return None
+
+    @staticmethod
+    def buat_grafik_k_jarak(kurva: np.ndarray, eps_saran: Optional[float] = None) -> Optional[go.Figure]:
+        """
+        Membuat grafik kurva k-jarak (jarak ke tetangga ke-k, terurut) untuk memilih
+        eps DBSCAN, dengan garis bantu pada eps yang disarankan.
+        """
+        try:
+            if kurva is None or len(kurva) == 0:
+                return None
+
+            fig = px.line(x=np.arange(len(kurva)), y=kurva, title='<b>Kurva k-Jarak (DBSCAN)</b>',
+                          labels={'x': 'Titik (diurutkan)', 'y': 'Jarak ke tetangga ke-k'})
+            if eps_saran is not None:
+                fig.add_hline(y=eps_saran, line_dash='dash', annotation_text=f'eps disarankan = {eps_saran:.3f}')
+            return fig
+        except Exception:
+            return None